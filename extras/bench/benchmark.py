@@ -0,0 +1,296 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+"""
+Benchmarks the most used views and API endpoints with a generated dataset
+
+A test database is created and filled with the test fixtures and the dummy
+data generator, the real database is not touched. The same goes for the
+cache, the generated PDFs and the uploaded files, a private in-memory cache
+and temporary folders are used instead. Please consult the documentation for
+details.
+"""
+
+import os
+import sys
+import json
+import random
+import argparse
+import shutil
+import tempfile
+import time
+import uuid
+
+import django
+
+BENCH_PATH = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_PATH, '..', '..'))
+sys.path.insert(0, os.path.join(BENCH_PATH, '..', 'dummy_generator'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
+django.setup()
+
+# Must happen after calling django.setup()
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.urlresolvers import reverse
+from django.db import connection
+from django.test import Client
+from django.test.utils import (
+    CaptureQueriesContext,
+    override_settings,
+    setup_test_environment,
+    teardown_test_environment
+)
+
+import generator
+from wger.core.tests.base_testcase import BaseTestCase
+from wger.exercises.models import Exercise
+from wger.gym.models import Gym
+from wger.manager.models import (
+    Day,
+    Workout
+)
+from wger.nutrition.models import (
+    Ingredient,
+    NutritionPlan
+)
+
+
+DATASETS = {
+    'small': {'gyms': 2, 'users': 10, 'workouts': 2, 'logs': 3, 'weight': 30, 'nutrition': 1},
+    'medium': {'gyms': 5, 'users': 50, 'workouts': 3, 'logs': 5, 'weight': 100, 'nutrition': 2},
+    'large': {'gyms': 10, 'users': 200, 'workouts': 5, 'logs': 10, 'weight': 365, 'nutrition': 3},
+}
+'''Arguments for the dummy data generator for each size'''
+
+
+def seed_dataset(size, seed):
+    """
+    Fills the database with the test fixtures and the generated entries
+    """
+    random.seed(seed)
+    call_command('loaddata', *BaseTestCase.fixtures, verbosity=0)
+
+    options = DATASETS[size]
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+    try:
+        generator.create_gyms(options['gyms'])
+        generator.bulk_create_users(options['users'], seed=seed)
+        generator.bulk_create_workouts(options['workouts'], seed=seed)
+        generator.bulk_create_logs(options['logs'], seed=seed)
+        generator.bulk_create_sessions(seed=seed)
+        generator.create_weight_entries(options['weight'])
+        generator.bulk_create_nutrition_plans(options['nutrition'], seed=seed)
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+
+def get_scenarios():
+    """
+    Returns a list of (name, username, url) tuples with the requests to measure
+    """
+    user = User.objects.filter(workout__day__isnull=False,
+                               workoutlog__isnull=False,
+                               nutritionplan__isnull=False,
+                               userprofile__gym__isnull=False) \
+                       .order_by('pk') \
+                       .first()
+    workout = Workout.objects.filter(user=user, day__isnull=False).order_by('pk').first()
+    day = Day.objects.filter(training=workout).order_by('pk').first()
+    plan = NutritionPlan.objects.filter(user=user).order_by('pk').first()
+    gym = Gym.objects.get(pk=user.userprofile.gym_id)
+    exercise_term = Exercise.objects.filter(language_id=2).order_by('pk').first().name[:3]
+    ingredient_term = Ingredient.objects.order_by('pk').first().name[:3]
+    username = user.username
+
+    return [
+        ('dashboard', username, reverse('core:dashboard')),
+        ('calendar', username, reverse('manager:workout:calendar')),
+        ('workout view', username, reverse('manager:workout:view', kwargs={'pk': workout.pk})),
+        ('log detail', username, reverse('manager:log:log', kwargs={'pk': workout.pk})),
+        ('timer', username, reverse('manager:workout:timer', kwargs={'day_pk': day.pk})),
+        ('nutrition plan', username, reverse('nutrition:plan:view', kwargs={'id': plan.pk})),
+        ('exercise search', username,
+         '{0}?term={1}'.format(reverse('exercise-search'), exercise_term)),
+        ('ingredient search', username,
+         '{0}?term={1}'.format(reverse('ingredient-search'), ingredient_term)),
+        ('gym member list', 'admin', reverse('gym:gym:user-list-data', kwargs={'pk': gym.pk})),
+        ('workout pdf', username, reverse('manager:workout:pdf-table', kwargs={'id': workout.pk})),
+        ('workout ical', username, reverse('manager:workout:ical', kwargs={'pk': workout.pk})),
+        ('api workout list', username, '/api/v2/workout/'),
+        ('api log list', username, '/api/v2/workoutlog/?workout={0}'.format(workout.pk)),
+    ]
+
+
+def get_bench_settings(folder):
+    """
+    Returns the settings override that keeps the benchmark away from the
+    configured cache and folders, the keys and files of the test database
+    would collide with the ones of the real objects
+    """
+    return override_settings(
+        CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                            'LOCATION': 'wger-bench-{0}'.format(uuid.uuid4().hex),
+                            'TIMEOUT': settings.CACHES['default'].get('TIMEOUT', 300)}},
+        MEDIA_ROOT=os.path.join(folder, 'media'),
+        WGER_SETTINGS=dict(settings.WGER_SETTINGS, PDF_CACHE_DIR=os.path.join(folder, 'pdf')))
+
+
+def percentile(values, percent):
+    """
+    Returns the percentile of the values (nearest rank)
+    """
+    values = sorted(values)
+    index = max(int(round(percent / 100.0 * len(values) + 0.5)) - 1, 0)
+    return values[min(index, len(values) - 1)]
+
+
+def run_scenarios(scenarios, repeat):
+    """
+    Requests every URL the given number of times, after one warm up request,
+    and returns the timings and query counts
+    """
+    results = {}
+    clients = {}
+    for name, username, url in scenarios:
+        if username not in clients:
+            # Users from the fixtures have the username twice as password,
+            # the generated ones only once
+            password = username * 2 if username == 'admin' else username
+            clients[username] = Client()
+            clients[username].login(username=username, password=password)
+        client = clients[username]
+
+        response = client.get(url)
+        if response.status_code != 200:
+            raise RuntimeError('{0} returned status code {1}'.format(url, response.status_code))
+
+        timings = []
+        queries = []
+        for i in range(repeat):
+            with CaptureQueriesContext(connection) as context:
+                start = time.time()
+                client.get(url)
+                timings.append((time.time() - start) * 1000)
+            queries.append(len(context))
+
+        results[name] = {'url': url,
+                         'p50': round(percentile(timings, 50), 2),
+                         'p95': round(percentile(timings, 95), 2),
+                         'queries': max(queries)}
+    return results
+
+
+def compare(results, baseline, tolerance, min_difference):
+    """
+    Returns a list of messages for the scenarios slower or with more queries
+    than in the baseline
+    """
+    regressions = []
+    for name, result in sorted(results.items()):
+        if name not in baseline:
+            continue
+        old = baseline[name]
+        if result['queries'] > old['queries']:
+            regressions.append('{0}: {1} queries, baseline {2}'.format(name,
+                                                                       result['queries'],
+                                                                       old['queries']))
+        limit = max(old['p95'] * (1 + tolerance), old['p95'] + min_difference)
+        if result['p95'] > limit:
+            regressions.append('{0}: p95 {1} ms, baseline {2} ms'.format(name,
+                                                                         result['p95'],
+                                                                         old['p95']))
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmarks the most used views')
+    parser.add_argument('--size',
+                        action='store',
+                        default='small',
+                        choices=sorted(DATASETS.keys()),
+                        help='Size of the generated dataset. Default: small')
+    parser.add_argument('--repeat',
+                        action='store',
+                        type=int,
+                        default=20,
+                        help='Number of requests per view. Default: 20')
+    parser.add_argument('--seed',
+                        action='store',
+                        type=int,
+                        default=1,
+                        help='Seed for the random data generation. Default: 1')
+    parser.add_argument('--baseline',
+                        action='store',
+                        help='JSON file with the baseline. Default: baseline-<size>.json in '
+                             'this folder')
+    parser.add_argument('--save-baseline',
+                        action='store_true',
+                        help='Save the results as the new baseline')
+    parser.add_argument('--tolerance',
+                        action='store',
+                        type=float,
+                        default=0.25,
+                        help='Allowed relative increase of the p95 latency. Default: 0.25')
+    parser.add_argument('--min-difference',
+                        action='store',
+                        type=float,
+                        default=5,
+                        help='Increases of the p95 latency below this many ms are never '
+                             'reported. Default: 5')
+    args = parser.parse_args()
+    baseline_path = args.baseline or os.path.join(BENCH_PATH, 'baseline-{0}.json'.format(args.size))
+
+    setup_test_environment()
+    bench_folder = tempfile.mkdtemp(prefix='wger-bench-')
+    bench_settings = get_bench_settings(bench_folder)
+    bench_settings.enable()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        print("** Generating the {0} dataset".format(args.size))
+        seed_dataset(args.size, args.seed)
+
+        print("** Running the benchmarks")
+        results = run_scenarios(get_scenarios(), args.repeat)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        bench_settings.disable()
+        teardown_test_environment()
+        shutil.rmtree(bench_folder, ignore_errors=True)
+
+    for name, result in sorted(results.items()):
+        print('   - {name}: p50 {p50} ms, p95 {p95} ms, {queries} queries'
+              .format(name=name, **result))
+
+    if args.save_baseline:
+        with open(baseline_path, 'w') as baseline_file:
+            json.dump({'size': args.size, 'results': results}, baseline_file, indent=4,
+                      sort_keys=True)
+        print("** Saved the baseline to {0}".format(baseline_path))
+
+    elif os.path.exists(baseline_path):
+        with open(baseline_path) as baseline_file:
+            baseline = json.load(baseline_file)['results']
+        regressions = compare(results, baseline, args.tolerance, args.min_difference)
+        if regressions:
+            print("** Regressions compared to {0}:".format(baseline_path))
+            for regression in regressions:
+                print('   - {0}'.format(regression))
+            sys.exit(1)
+        print("** No regressions compared to {0}".format(baseline_path))
@@ -22,8 +22,22 @@ import random
 import django
 import datetime
 import argparse
-
-from django.db import IntegrityError
+import itertools
+import multiprocessing
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import (
+    IntegrityError,
+    connection,
+    connections,
+    transaction
+)
+from django.db.models import (
+    Max,
+    Min,
+    Q
+)
 from django.utils.text import slugify
 
 sys.path.insert(0, os.path.join('..', '..'))
@@ -32,20 +46,27 @@ django.setup()
 
 # Must happen after calling django.setup()
 from django.contrib.auth.models import User
-from wger.core.models import DaysOfWeek
+from wger.core.models import (
+    DaysOfWeek,
+    UserCache,
+    UserProfile
+)
 from wger.exercises.models import Exercise
 from wger.gym.models import (
     GymUserConfig,
     Gym
 )
 from wger.manager.models import (
+    PersonalRecord,
     Workout,
     Day,
     Set,
     Setting,
     Schedule,
     ScheduleStep,
+    WeeklyMuscleVolume,
     WorkoutLog,
+    WorkoutMonthSummary,
     WorkoutSession
 )
 from wger.weight.models import WeightEntry
@@ -62,113 +83,53 @@ from wger.nutrition.models import (
     MealItem
 )
 
-parser = argparse.ArgumentParser(description='Data generator. Please consult the documentation')
-subparsers = parser.add_subparsers(help='The kind of entries you want to generate')
-
-# User options
-user_parser = subparsers.add_parser('users', help='Create users')
-user_parser.add_argument('number_users',
-                         action='store',
-                         help='Number of users to create',
-                         type=int)
-user_parser.add_argument('--add-to-gym',
-                         action='store',
-                         default='auto',
-                         help='Gym to assign the users to. Allowed values: auto, none, <gym_id>. '
-                              'Default: auto')
-user_parser.add_argument('--country',
-                         action='store',
-                         default='germany',
-                         help='What country the generated users should belong to. Default: Germany',
-                         choices=['germany', 'ukraine', 'spain'])
-
-# Workout options
-workouts_parser = subparsers.add_parser('workouts', help='Create workouts')
-workouts_parser.add_argument('number_workouts',
-                             action='store',
-                             help='Number of workouts to create *per user*',
-                             type=int)
-workouts_parser.add_argument('--add-to-user',
-                             action='store',
-                             help='Add to the specified user-ID, not all existing users')
-
-# Gym options
-gym_parser = subparsers.add_parser('gyms', help='Create gyms')
-gym_parser.add_argument('number_gyms',
-                        action='store',
-                        help='Number of gyms to create',
-                        type=int)
-# Log options
-logs_parser = subparsers.add_parser('logs', help='Create logs')
-logs_parser.add_argument('number_logs',
-                         action='store',
-                         help='Number of logs to create per user and workout',
-                         type=int)
-
-# Session options
-session_parser = subparsers.add_parser('sessions', help='Create sessions')
-session_parser.add_argument('impression_sessions',
-                            action='store',
-                            help='Impression for the sessions, default: random',
-                            default='random',
-                            choices=['random', 'good', 'neutral', 'bad'])
-
-# Weight options
-weight_parser = subparsers.add_parser('weight', help='Create weight entries')
-weight_parser.add_argument('number_weight',
-                           action='store',
-                           help='Number of weight entries to create per user',
-                           type=int)
-weight_parser.add_argument('--add-to-user',
-                           action='store',
-                           help='Add to the specified user-ID, not all existing users')
-weight_parser.add_argument('--base-weight',
-                           action='store',
-                           help='Default weight for the entry generation, default = 80',
-                           type=int,
-                           default=80)
-
-# Nutrition options
-nutrition_parser = subparsers.add_parser('nutrition', help='Creates a meal plan')
-nutrition_parser.add_argument('number_nutrition_plans',
-                              action='store',
-                              help='Number of meal plans to create',
-                              type=int)
-nutrition_parser.add_argument('--add-to-user',
-                              action='store',
-                              help='Add to the specified user-ID, not all existing users')
-
-args = parser.parse_args()
-# print(args)
-
-#
-# User generator
-#
-if hasattr(args, 'number_users'):
-    print("** Generating {0} users".format(args.number_users))
+CSV_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'csv')
 
-    try:
-        gym_list = [int(args.add_to_gym)]
-    except ValueError:
-        if args.add_to_gym == 'none':
-            gym_list = []
-        else:
-            gym_list = [i['id'] for i in Gym.objects.all().values()]
 
+def load_names(country):
+    """
+    Returns the lists of first names (with their gender) and last names
+    """
     first_names = []
     last_names = []
 
-    with open(os.path.join('csv', 'first_names_{0}.csv'.format(args.country))) as name_file:
+    with open(os.path.join(CSV_PATH, 'first_names_{0}.csv'.format(country))) as name_file:
         name_reader = csv.reader(name_file)
         for row in name_reader:
             first_names.append(row)
 
-    with open(os.path.join('csv', 'last_names_{0}.csv'.format(args.country))) as name_file:
+    with open(os.path.join(CSV_PATH, 'last_names_{0}.csv'.format(country))) as name_file:
         name_reader = csv.reader(name_file)
         for row in name_reader:
             last_names.append(row[0])
 
-    for i in range(1, args.number_users):
+    return first_names, last_names
+
+
+def get_gym_list(add_to_gym):
+    """
+    Returns the IDs of the gyms new users are assigned to (auto, none or a gym ID)
+    """
+    try:
+        return [int(add_to_gym)]
+    except ValueError:
+        if add_to_gym == 'none':
+            return []
+        else:
+            return [i['id'] for i in Gym.objects.all().values()]
+
+
+def create_users(number_users, add_to_gym='auto', country='germany'):
+    """
+    Creates users and assigns them to the given gym (auto, none or a gym ID)
+    """
+    print("** Generating {0} users".format(number_users))
+
+    gym_list = get_gym_list(add_to_gym)
+
+    first_names, last_names = load_names(country)
+
+    for i in range(1, number_users):
         uid = uuid.uuid4()
         name_data = random.choice(first_names)
         name = name_data[0]
@@ -208,18 +169,19 @@ if hasattr(args, 'number_users'):
 
         print('   - {0}, {1}'.format(name, surname))
 
-#
-# Gym generator
-#
-if hasattr(args, 'number_gyms'):
-    print("** Generating {0} gyms".format(args.number_gyms))
+
+def create_gyms(number_gyms):
+    """
+    Creates gyms
+    """
+    print("** Generating {0} gyms".format(number_gyms))
 
     gym_list = []
 
     names_part1 = []
     names_part2 = []
 
-    with open(os.path.join('csv', 'gym_names.csv')) as name_file:
+    with open(os.path.join(CSV_PATH, 'gym_names.csv')) as name_file:
         name_reader = csv.reader(name_file)
         for row in name_reader:
             if row[0]:
@@ -227,7 +189,7 @@ if hasattr(args, 'number_gyms'):
             if row[1]:
                 names_part2.append(row[1])
 
-    for i in range(1, args.number_gyms):
+    for i in range(1, number_gyms):
         found = False
         while not found:
             part1 = random.choice(names_part1)
@@ -248,14 +210,14 @@ if hasattr(args, 'number_gyms'):
     Gym.objects.bulk_create(gym_list)
 
 
-#
-# Workout generator
-#
-if hasattr(args, 'number_workouts'):
-    print("** Generating {0} workouts per user".format(args.number_workouts))
+def create_workouts(number_workouts, add_to_user=None):
+    """
+    Creates workouts and schedules for the given user-ID or all users
+    """
+    print("** Generating {0} workouts per user".format(number_workouts))
 
-    if args.add_to_user:
-        userlist = [User.objects.get(pk=args.add_to_user)]
+    if add_to_user:
+        userlist = [User.objects.get(pk=add_to_user)]
     else:
         userlist = [i for i in User.objects.all()]
 
@@ -263,7 +225,7 @@ if hasattr(args, 'number_workouts'):
         print('   - generating for {0}'.format(user.username))
 
         # Workouts
-        for i in range(1, args.number_workouts):
+        for i in range(1, number_workouts):
 
             uid = str(uuid.uuid4()).split('-')
             start_date = datetime.date.today() - datetime.timedelta(days=random.randint(0, 100))
@@ -335,11 +297,12 @@ if hasattr(args, 'number_workouts'):
 
                 order += 1
 
-#
-# Log generator
-#
-if hasattr(args, 'number_logs'):
-    print("** Generating {0} logs".format(args.number_logs))
+
+def create_logs(number_logs):
+    """
+    Creates logs for every user, workout and exercise
+    """
+    print("** Generating {0} logs".format(number_logs))
 
     for user in User.objects.all():
         weight_log = []
@@ -350,7 +313,7 @@ if hasattr(args, 'number_logs'):
                 for set in day.set_set.all():
                     for setting in set.setting_set.all():
                         for reps in (8, 10, 12):
-                            for i in range(1, args.number_logs):
+                            for i in range(1, number_logs):
                                 date = datetime.date.today() - datetime.timedelta(weeks=i)
                                 log = WorkoutLog(user=user,
                                                  exercise=setting.exercise,
@@ -362,12 +325,15 @@ if hasattr(args, 'number_logs'):
 
         # Bulk-create the logs
         WorkoutLog.objects.bulk_create(weight_log)
+        WorkoutMonthSummary.objects.rebuild([user.pk])
+        PersonalRecord.objects.rebuild([user.pk])
+        WeeklyMuscleVolume.objects.rebuild([user.pk])
 
 
-#
-# Session generator
-#
-if hasattr(args, 'impression_sessions'):
+def create_sessions(impression_sessions='random'):
+    """
+    Creates workout sessions for the days with logs
+    """
     print("** Generating workout sessions")
 
     for user in User.objects.all():
@@ -392,11 +358,11 @@ if hasattr(args, 'impression_sessions'):
                 session.time_end = end
                 session.workout = workout
 
-                if args.impression_sessions == 'good':
+                if impression_sessions == 'good':
                     session.impression = WorkoutSession.IMPRESSION_GOOD
-                elif args.impression_sessions == 'neutral':
+                elif impression_sessions == 'neutral':
                     session.impression = WorkoutSession.IMPRESSION_NEUTRAL
-                elif args.impression_sessions == 'bad':
+                elif impression_sessions == 'bad':
                     session.impression = WorkoutSession.IMPRESSION_BAD
                 else:
                     session.impression = random.choice([WorkoutSession.IMPRESSION_GOOD,
@@ -407,15 +373,17 @@ if hasattr(args, 'impression_sessions'):
 
         # Bulk-create the sessions
         WorkoutSession.objects.bulk_create(session_list)
+        WorkoutMonthSummary.objects.rebuild([user.pk])
 
-#
-# Weight entry generator
-#
-if hasattr(args, 'number_weight'):
-    print("** Generating {0} weight entries per user".format(args.number_weight))
 
-    if args.add_to_user:
-        userlist = [User.objects.get(pk=args.add_to_user)]
+def create_weight_entries(number_weight, add_to_user=None, base_weight=80):
+    """
+    Creates weight entries for the given user-ID or all users
+    """
+    print("** Generating {0} weight entries per user".format(number_weight))
+
+    if add_to_user:
+        userlist = [User.objects.get(pk=add_to_user)]
     else:
         userlist = [i for i in User.objects.all()]
 
@@ -426,24 +394,27 @@ if hasattr(args, 'number_weight'):
         existing_entries = [i.date for i in WeightEntry.objects.filter(user=user)]
 
         # Weight entries
-        for i in range(1, args.number_weight):
+        for i in range(1, number_weight):
 
             creation_date = datetime.date.today() - datetime.timedelta(days=i)
             if creation_date not in existing_entries:
                 entry = WeightEntry(user=user,
-                                    weight=args.base_weight + 0.5 * i + random.randint(1, 3),
+                                    weight=base_weight + 0.5 * i + random.randint(1, 3),
                                     date=creation_date)
                 new_entries.append(entry)
 
         # Bulk-create the weight entries
         WeightEntry.objects.bulk_create(new_entries)
 
-# Nutrition Generator
-if hasattr(args, 'number_nutrition_plans'):
-    print("** Generating {0} nutrition plan(s) per user".format(args.number_nutrition_plans))
 
-    if args.add_to_user:
-        userlist = [User.objects.get(pk=args.add_to_user)]
+def create_nutrition_plans(number_nutrition_plans, add_to_user=None):
+    """
+    Creates nutrition plans for the given user-ID or all users
+    """
+    print("** Generating {0} nutrition plan(s) per user".format(number_nutrition_plans))
+
+    if add_to_user:
+        userlist = [User.objects.get(pk=add_to_user)]
     else:
         userlist = [i for i in User.objects.all()]
 
@@ -457,7 +428,7 @@ if hasattr(args, 'number_nutrition_plans'):
         print('   - generating for {0}'.format(user.username))
 
         # Add nutrition plan
-        for i in range(0, args.number_nutrition_plans):
+        for i in range(0, number_nutrition_plans):
             uid = str(uuid.uuid4()).split('-')
             start_date = datetime.date.today() - datetime.timedelta(days=random.randint(0, 100))
             nutrition_plan = NutritionPlan(language=Language.objects.all()[1], description='Dummy nutrition plan - {0}'.format(uid[1]),
@@ -477,3 +448,590 @@ if hasattr(args, 'number_nutrition_plans'):
                                          weight_unit=None, order=order, amount=random.randint(10, 250))
                     meal_item.save()
                 order += 1
+
+
+#
+# Bulk mode
+#
+# The data is generated in (optionally parallel) jobs of BULK_CHUNK_SIZE users,
+# the parent process allocates the IDs and inserts every table with one
+# bulk_create. Since bulk_create doesn't send any signals, the user profiles,
+# the last activity cache, the monthly log summaries, the personal records and
+# the weekly volume are filled here directly.
+#
+BULK_CHUNK_SIZE = 100
+'''Number of users generated by one job in bulk mode'''
+
+BULK_BATCH_SIZE = 500
+'''Number of rows inserted with one query in bulk mode'''
+
+
+def get_random(seed, *parts):
+    """
+    Returns the random number generator for one user and kind of entries
+
+    Every user gets its own generator, so the generated data only depends
+    on the seed and not on the number of processes or the job size.
+    """
+    if seed is None:
+        return random.Random()
+    return random.Random('-'.join(str(part) for part in (seed, ) + parts))
+
+
+def run_jobs(function, jobs, processes=1):
+    """
+    Yields the results of the jobs in order, processed in parallel if more
+    than one process is used
+    """
+    if processes <= 1:
+        for job in jobs:
+            yield function(job)
+        return
+
+    # The worker processes only generate data, they must not share the
+    # database connections of the parent
+    connections.close_all()
+    pool = multiprocessing.Pool(processes)
+    try:
+        for result in pool.imap(function, jobs):
+            yield result
+    finally:
+        pool.close()
+        pool.join()
+
+
+def get_chunks(items, size=BULK_CHUNK_SIZE):
+    """
+    Splits the list into chunks of the given size
+    """
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def get_next_id(model):
+    """
+    Returns the first free primary key of the model's table
+    """
+    return (model.objects.aggregate(max_id=Max('id'))['max_id'] or 0) + 1
+
+
+def reset_sequences(*models):
+    """
+    Updates the database sequences after inserting rows with explicit IDs
+    """
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def get_user_ids(add_to_user=None):
+    """
+    Returns the given user-ID or the IDs of all users as a list
+    """
+    if add_to_user:
+        return [User.objects.get(pk=add_to_user).pk]
+    return list(User.objects.order_by('pk').values_list('pk', flat=True))
+
+
+def update_last_activity(last_activity):
+    """
+    Updates the cached last activity of the users, a dictionary of dates
+    by user ID
+    """
+    users_by_date = {}
+    for user_id, date in last_activity.items():
+        users_by_date.setdefault(date, []).append(user_id)
+
+    for date, user_ids in users_by_date.items():
+        for chunk in get_chunks(user_ids, BULK_BATCH_SIZE):
+            UserCache.objects.filter(user_id__in=chunk) \
+                             .filter(Q(last_activity__isnull=True) | Q(last_activity__lt=date)) \
+                             .update(last_activity=date)
+
+
+def generate_users(job):
+    """
+    Generates the data for a range of new users
+    """
+    seed, start, count, first_names, last_names, gym_list = job
+    users = []
+    for i in range(start, start + count):
+        rng = get_random(seed, 'user', i)
+        name, gender = rng.choice(first_names)[:2]
+        surname = rng.choice(last_names)
+        username = slugify('{0}, {1} {2:04x}'.format(name, surname[0], rng.getrandbits(16)))
+
+        users.append({'username': username,
+                      'password': make_password(username),
+                      'first_name': name,
+                      'last_name': surname,
+                      'gender': UserProfile.GENDER_MALE if gender == 'm'
+                      else UserProfile.GENDER_FEMALE,
+                      'age': rng.randint(18, 45),
+                      'gym_id': rng.choice(gym_list) if gym_list else None})
+    return users
+
+
+def bulk_create_users(number_users, add_to_gym='auto', country='germany', seed=None,
+                      processes=1):
+    """
+    Creates users in bulk and assigns them to the given gym (auto, none or a gym ID)
+    """
+    print("** Generating {0} users (bulk mode)".format(number_users))
+
+    gym_list = get_gym_list(add_to_gym)
+    first_names, last_names = load_names(country)
+    jobs = [(seed, start, min(BULK_CHUNK_SIZE, number_users - start), first_names, last_names,
+             gym_list) for start in range(0, number_users, BULK_CHUNK_SIZE)]
+
+    usernames = set(User.objects.values_list('username', flat=True))
+    user_id = get_next_id(User)
+    for result in run_jobs(generate_users, jobs, processes):
+        users = []
+        profiles = []
+        user_caches = []
+        configs = []
+        for data in result:
+
+            # Usernames are not guaranteed to be unique, just skip duplicates
+            if data['username'] in usernames:
+                continue
+            usernames.add(data['username'])
+
+            users.append(User(id=user_id,
+                              username=data['username'],
+                              email='{0}@example.com'.format(data['username']),
+                              password=data['password'],
+                              first_name=data['first_name'],
+                              last_name=data['last_name']))
+            profiles.append(UserProfile(user_id=user_id,
+                                        gym_id=data['gym_id'],
+                                        gender=data['gender'],
+                                        age=data['age']))
+            user_caches.append(UserCache(user_id=user_id))
+            if data['gym_id']:
+                configs.append(GymUserConfig(gym_id=data['gym_id'], user_id=user_id))
+            user_id += 1
+
+        with transaction.atomic():
+            User.objects.bulk_create(users, BULK_BATCH_SIZE)
+            UserProfile.objects.bulk_create(profiles, BULK_BATCH_SIZE)
+            UserCache.objects.bulk_create(user_caches, BULK_BATCH_SIZE)
+            GymUserConfig.objects.bulk_create(configs, BULK_BATCH_SIZE)
+        print('   - {0} users'.format(len(users)))
+
+    reset_sequences(User)
+
+
+def generate_workouts(job):
+    """
+    Generates the workouts and schedules for a list of users
+    """
+    seed, user_ids, number_workouts, exercise_ids = job
+    today = datetime.date.today()
+    result = []
+    for user_id in user_ids:
+        rng = get_random(seed, 'workouts', user_id)
+
+        workouts = []
+        for i in range(number_workouts):
+            days = []
+            for weekday in rng.sample(range(1, 8), rng.randint(1, 5)):
+                exercises = rng.sample(exercise_ids, min(rng.randint(3, 10), len(exercise_ids)))
+                days.append({'weekday': weekday,
+                             'description': 'Dummy day - {0:08x}'.format(rng.getrandbits(32)),
+                             'sets': [(exercise, rng.randint(2, 4),
+                                       rng.choice([1, 3, 5, 8, 10, 12, 15]))
+                                      for exercise in exercises]})
+            workouts.append({'comment': 'Dummy workout - {0:04x}'.format(rng.getrandbits(16)),
+                             'days': days})
+
+        schedules = []
+        for i in range(rng.randint(1, 5) if workouts else 0):
+            steps = [(rng.randrange(len(workouts)), rng.randint(1, 4))
+                     for j in range(rng.randint(1, len(workouts)))]
+            schedules.append({'name': 'Dummy schedule - {0:04x}'.format(rng.getrandbits(16)),
+                              'start_date': today - datetime.timedelta(days=rng.randint(0, 30)),
+                              'steps': steps})
+
+        result.append((user_id, workouts, schedules))
+    return result
+
+
+def bulk_create_workouts(number_workouts, add_to_user=None, seed=None, processes=1):
+    """
+    Creates workouts and schedules in bulk for the given user-ID or all users
+    """
+    print("** Generating {0} workouts per user (bulk mode)".format(number_workouts))
+
+    exercise_ids = list(Exercise.objects.filter(language_id=2)
+                                        .order_by('pk')
+                                        .values_list('pk', flat=True))
+    jobs = [(seed, chunk, number_workouts, exercise_ids)
+            for chunk in get_chunks(get_user_ids(add_to_user))]
+
+    DayOfWeek = Day.day.through
+    SetExercise = Set.exercises.through
+    workout_id = get_next_id(Workout)
+    day_id = get_next_id(Day)
+    set_id = get_next_id(Set)
+    schedule_id = get_next_id(Schedule)
+
+    for result in run_jobs(generate_workouts, jobs, processes):
+        objects = dict((model, []) for model in (Workout, Day, DayOfWeek, Set, SetExercise,
+                                                 Setting, Schedule, ScheduleStep))
+        for user_id, workouts, schedules in result:
+            workout_ids = []
+            for workout in workouts:
+                objects[Workout].append(Workout(id=workout_id,
+                                                user_id=user_id,
+                                                comment=workout['comment']))
+                for day in workout['days']:
+                    objects[Day].append(Day(id=day_id,
+                                            training_id=workout_id,
+                                            description=day['description']))
+                    objects[DayOfWeek].append(DayOfWeek(day_id=day_id,
+                                                        daysofweek_id=day['weekday']))
+
+                    for order, (exercise_id, sets, reps) in enumerate(day['sets'], 1):
+                        objects[Set].append(Set(id=set_id,
+                                                exerciseday_id=day_id,
+                                                sets=sets,
+                                                order=order))
+                        objects[SetExercise].append(SetExercise(set_id=set_id,
+                                                                exercise_id=exercise_id,
+                                                                sort_value=1))
+                        objects[Setting].append(Setting(set_id=set_id,
+                                                        exercise_id=exercise_id,
+                                                        reps=reps,
+                                                        order=order))
+                        set_id += 1
+                    day_id += 1
+                workout_ids.append(workout_id)
+                workout_id += 1
+
+            # Like in Schedule.save(), only the last schedule stays active
+            for index, schedule in enumerate(schedules, 1):
+                objects[Schedule].append(Schedule(id=schedule_id,
+                                                  user_id=user_id,
+                                                  name=schedule['name'],
+                                                  start_date=schedule['start_date'],
+                                                  is_active=index == len(schedules),
+                                                  is_loop=True))
+                for order, (index, duration) in enumerate(schedule['steps'], 1):
+                    objects[ScheduleStep].append(ScheduleStep(schedule_id=schedule_id,
+                                                              workout_id=workout_ids[index],
+                                                              duration=duration,
+                                                              order=order))
+                schedule_id += 1
+
+        with transaction.atomic():
+            user_ids = set(schedule.user_id for schedule in objects[Schedule])
+            for chunk in get_chunks(list(user_ids), BULK_BATCH_SIZE):
+                Schedule.objects.filter(user_id__in=chunk, is_active=True).update(is_active=False)
+
+            for model in (Workout, Day, DayOfWeek, Set, SetExercise, Setting, Schedule,
+                          ScheduleStep):
+                model.objects.bulk_create(objects[model], BULK_BATCH_SIZE)
+        print('   - {0} workouts'.format(len(objects[Workout])))
+
+    reset_sequences(Workout, Day, Set, Schedule)
+
+
+def generate_logs(job):
+    """
+    Generates the logs for a list of users
+    """
+    seed, users, number_logs = job
+    today = datetime.date.today()
+    result = []
+    for user_id, settings in users:
+        rng = get_random(seed, 'logs', user_id)
+        for workout_id, exercise_id in settings:
+            for reps in (8, 10, 12):
+                for i in range(1, number_logs + 1):
+                    result.append((user_id,
+                                   exercise_id,
+                                   workout_id,
+                                   reps,
+                                   50 - reps + rng.randint(1, 10),
+                                   today - datetime.timedelta(weeks=i)))
+    return result
+
+
+def bulk_create_logs(number_logs, seed=None, processes=1):
+    """
+    Creates logs in bulk for every user, workout and exercise
+    """
+    print("** Generating {0} logs (bulk mode)".format(number_logs))
+
+    settings = Setting.objects.order_by('set__exerciseday__training__user_id', 'pk') \
+                              .values_list('set__exerciseday__training__user_id',
+                                           'set__exerciseday__training_id',
+                                           'exercise_id')
+    users = [(user_id, [entry[1:] for entry in entries])
+             for user_id, entries in itertools.groupby(settings, lambda entry: entry[0])]
+    jobs = [(seed, chunk, number_logs) for chunk in get_chunks(users)]
+
+    for result in run_jobs(generate_logs, jobs, processes):
+        logs = []
+        last_activity = {}
+        for user_id, exercise_id, workout_id, reps, weight, date in result:
+            logs.append(WorkoutLog(user_id=user_id,
+                                   exercise_id=exercise_id,
+                                   workout_id=workout_id,
+                                   reps=reps,
+                                   weight=weight,
+                                   date=date))
+            last_activity[user_id] = max(date, last_activity.get(user_id, date))
+
+        with transaction.atomic():
+            WorkoutLog.objects.bulk_create(logs, BULK_BATCH_SIZE)
+            update_last_activity(last_activity)
+            WorkoutMonthSummary.objects.rebuild(sorted(last_activity))
+            PersonalRecord.objects.rebuild(sorted(last_activity))
+            WeeklyMuscleVolume.objects.rebuild(sorted(last_activity))
+        print('   - {0} logs'.format(len(logs)))
+
+
+def generate_sessions(job):
+    """
+    Generates the sessions for a list of users
+    """
+    seed, users, impression_sessions = job
+    impressions = {'good': WorkoutSession.IMPRESSION_GOOD,
+                   'neutral': WorkoutSession.IMPRESSION_NEUTRAL,
+                   'bad': WorkoutSession.IMPRESSION_BAD}
+    result = []
+    for user_id, days in users:
+        rng = get_random(seed, 'sessions', user_id)
+        for date, workout_id in days:
+            start = datetime.datetime.combine(date, datetime.time(hour=rng.randint(8, 20),
+                                                                  minute=rng.randint(0, 59)))
+            end = start + datetime.timedelta(minutes=rng.randint(40, 120))
+            impression = impressions.get(impression_sessions) \
+                or rng.choice(sorted(impressions.values()))
+            result.append((user_id, workout_id, date, start.time(), end.time(), impression))
+    return result
+
+
+def bulk_create_sessions(impression_sessions='random', seed=None, processes=1):
+    """
+    Creates workout sessions in bulk for the days with logs
+    """
+    print("** Generating workout sessions (bulk mode)")
+
+    existing = set(WorkoutSession.objects.values_list('user_id', 'date'))
+    days = WorkoutLog.objects.values('user_id', 'date') \
+                             .annotate(first_workout=Min('workout_id')) \
+                             .order_by('user_id', 'date')
+    users = [(user_id, [(day['date'], day['first_workout']) for day in entries
+                        if (user_id, day['date']) not in existing])
+             for user_id, entries in itertools.groupby(days, lambda day: day['user_id'])]
+    jobs = [(seed, chunk, impression_sessions) for chunk in get_chunks(users)]
+
+    for result in run_jobs(generate_sessions, jobs, processes):
+        sessions = []
+        last_activity = {}
+        for user_id, workout_id, date, time_start, time_end, impression in result:
+            sessions.append(WorkoutSession(user_id=user_id,
+                                           workout_id=workout_id,
+                                           date=date,
+                                           time_start=time_start,
+                                           time_end=time_end,
+                                           impression=impression))
+            last_activity[user_id] = max(date, last_activity.get(user_id, date))
+
+        with transaction.atomic():
+            WorkoutSession.objects.bulk_create(sessions, BULK_BATCH_SIZE)
+            update_last_activity(last_activity)
+            WorkoutMonthSummary.objects.rebuild(sorted(last_activity))
+        print('   - {0} sessions'.format(len(sessions)))
+
+
+def generate_nutrition_plans(job):
+    """
+    Generates the nutrition plans for a list of users
+    """
+    seed, user_ids, number_nutrition_plans, ingredient_ids = job
+    result = []
+    for user_id in user_ids:
+        rng = get_random(seed, 'nutrition', user_id)
+        for i in range(number_nutrition_plans):
+            meals = [[(rng.choice(ingredient_ids), rng.randint(10, 250))
+                      for k in range(rng.randint(1, 5))]
+                     for j in range(4)]
+            result.append((user_id,
+                           'Dummy nutrition plan - {0:04x}'.format(rng.getrandbits(16)),
+                           meals))
+    return result
+
+
+def bulk_create_nutrition_plans(number_nutrition_plans, add_to_user=None, seed=None,
+                                processes=1):
+    """
+    Creates nutrition plans in bulk for the given user-ID or all users
+    """
+    print("** Generating {0} nutrition plan(s) per user (bulk mode)"
+          .format(number_nutrition_plans))
+
+    language_id = Language.objects.all()[1].pk
+    ingredient_ids = list(Ingredient.objects.order_by('pk').values_list('pk', flat=True))
+    jobs = [(seed, chunk, number_nutrition_plans, ingredient_ids)
+            for chunk in get_chunks(get_user_ids(add_to_user))]
+
+    plan_id = get_next_id(NutritionPlan)
+    meal_id = get_next_id(Meal)
+    for result in run_jobs(generate_nutrition_plans, jobs, processes):
+        plans = []
+        meals = []
+        meal_items = []
+        for user_id, description, plan_meals in result:
+            plans.append(NutritionPlan(id=plan_id,
+                                       user_id=user_id,
+                                       language_id=language_id,
+                                       description=description))
+            for order, items in enumerate(plan_meals, 1):
+                meals.append(Meal(id=meal_id, plan_id=plan_id, order=order))
+                for item_order, (ingredient_id, amount) in enumerate(items, 1):
+                    meal_items.append(MealItem(meal_id=meal_id,
+                                               ingredient_id=ingredient_id,
+                                               order=item_order,
+                                               amount=amount))
+                meal_id += 1
+            plan_id += 1
+
+        with transaction.atomic():
+            NutritionPlan.objects.bulk_create(plans, BULK_BATCH_SIZE)
+            Meal.objects.bulk_create(meals, BULK_BATCH_SIZE)
+            MealItem.objects.bulk_create(meal_items, BULK_BATCH_SIZE)
+        print('   - {0} nutrition plans'.format(len(plans)))
+
+    reset_sequences(NutritionPlan, Meal)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Data generator. Please consult the documentation')
+    parser.add_argument('--bulk',
+                        action='store_true',
+                        help='Generate the entries in bulk, this is much faster for large numbers '
+                             'of users')
+    parser.add_argument('--processes',
+                        action='store',
+                        help='Number of processes generating the entries in bulk mode. Default: 1',
+                        type=int,
+                        default=1)
+    parser.add_argument('--seed',
+                        action='store',
+                        help='Seed for the random number generator, to create reproducible data',
+                        type=int)
+    subparsers = parser.add_subparsers(help='The kind of entries you want to generate')
+
+    # User options
+    user_parser = subparsers.add_parser('users', help='Create users')
+    user_parser.add_argument('number_users',
+                             action='store',
+                             help='Number of users to create',
+                             type=int)
+    user_parser.add_argument('--add-to-gym',
+                             action='store',
+                             default='auto',
+                             help='Gym to assign the users to. Allowed values: auto, none, <gym_id>. '
+                                  'Default: auto')
+    user_parser.add_argument('--country',
+                             action='store',
+                             default='germany',
+                             help='What country the generated users should belong to. Default: Germany',
+                             choices=['germany', 'ukraine', 'spain'])
+
+    # Workout options
+    workouts_parser = subparsers.add_parser('workouts', help='Create workouts')
+    workouts_parser.add_argument('number_workouts',
+                                 action='store',
+                                 help='Number of workouts to create *per user*',
+                                 type=int)
+    workouts_parser.add_argument('--add-to-user',
+                                 action='store',
+                                 help='Add to the specified user-ID, not all existing users')
+
+    # Gym options
+    gym_parser = subparsers.add_parser('gyms', help='Create gyms')
+    gym_parser.add_argument('number_gyms',
+                            action='store',
+                            help='Number of gyms to create',
+                            type=int)
+    # Log options
+    logs_parser = subparsers.add_parser('logs', help='Create logs')
+    logs_parser.add_argument('number_logs',
+                             action='store',
+                             help='Number of logs to create per user and workout',
+                             type=int)
+
+    # Session options
+    session_parser = subparsers.add_parser('sessions', help='Create sessions')
+    session_parser.add_argument('impression_sessions',
+                                action='store',
+                                help='Impression for the sessions, default: random',
+                                default='random',
+                                choices=['random', 'good', 'neutral', 'bad'])
+
+    # Weight options
+    weight_parser = subparsers.add_parser('weight', help='Create weight entries')
+    weight_parser.add_argument('number_weight',
+                               action='store',
+                               help='Number of weight entries to create per user',
+                               type=int)
+    weight_parser.add_argument('--add-to-user',
+                               action='store',
+                               help='Add to the specified user-ID, not all existing users')
+    weight_parser.add_argument('--base-weight',
+                               action='store',
+                               help='Default weight for the entry generation, default = 80',
+                               type=int,
+                               default=80)
+
+    # Nutrition options
+    nutrition_parser = subparsers.add_parser('nutrition', help='Creates a meal plan')
+    nutrition_parser.add_argument('number_nutrition_plans',
+                                  action='store',
+                                  help='Number of meal plans to create',
+                                  type=int)
+    nutrition_parser.add_argument('--add-to-user',
+                                  action='store',
+                                  help='Add to the specified user-ID, not all existing users')
+
+    args = parser.parse_args()
+    bulk = {'seed': args.seed, 'processes': args.processes}
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    # Gyms and weight entries are always created in bulk
+    if hasattr(args, 'number_users'):
+        if args.bulk:
+            bulk_create_users(args.number_users, args.add_to_gym, args.country, **bulk)
+        else:
+            create_users(args.number_users, args.add_to_gym, args.country)
+    if hasattr(args, 'number_gyms'):
+        create_gyms(args.number_gyms)
+    if hasattr(args, 'number_workouts'):
+        if args.bulk:
+            bulk_create_workouts(args.number_workouts, args.add_to_user, **bulk)
+        else:
+            create_workouts(args.number_workouts, args.add_to_user)
+    if hasattr(args, 'number_logs'):
+        if args.bulk:
+            bulk_create_logs(args.number_logs, **bulk)
+        else:
+            create_logs(args.number_logs)
+    if hasattr(args, 'impression_sessions'):
+        if args.bulk:
+            bulk_create_sessions(args.impression_sessions, **bulk)
+        else:
+            create_sessions(args.impression_sessions)
+    if hasattr(args, 'number_weight'):
+        create_weight_entries(args.number_weight, args.add_to_user, args.base_weight)
+    if hasattr(args, 'number_nutrition_plans'):
+        if args.bulk:
+            bulk_create_nutrition_plans(args.number_nutrition_plans, args.add_to_user, **bulk)
+        else:
+            create_nutrition_plans(args.number_nutrition_plans, args.add_to_user)
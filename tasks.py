@@ -130,6 +130,8 @@ def create_settings(context, settings_path=None, database_path=None, url=None, d
     dbpath_value = repr(database_path)
 
     media_folder_path = repr(get_user_data_path('wger', 'media'))
+    cache_folder_path = repr(get_user_data_path('wger', 'cache'))
+    pdf_cache_folder_path = repr(get_user_data_path('wger', 'pdf-cache'))
 
     # Use localhost with default django port if no URL given
     if url is None:
@@ -170,7 +172,9 @@ def create_settings(context, settings_path=None, database_path=None, url=None, d
                                                dbport=dbport,
                                                default_key=secret_key,
                                                siteurl=url,
-                                               media_folder_path=media_folder_path)
+                                               media_folder_path=media_folder_path,
+                                               cache_folder_path=cache_folder_path,
+                                               pdf_cache_folder_path=pdf_cache_folder_path)
 
     if not os.path.exists(settings_module):
         os.makedirs(settings_module)
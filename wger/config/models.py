@@ -27,6 +27,7 @@ from wger.gym.models import Gym, GymUserConfig
 
 from wger.utils.cache import delete_template_fragment_cache
 from wger.utils.cache import cache_mapper
+from wger.utils.cache import reset_gym_admin_ids
 
 
 logger = logging.getLogger(__name__)
@@ -133,6 +134,7 @@ class GymConfig(models.Model):
 
             # All users that have no gym set in the profile are edited
             UserProfile.objects.filter(gym=None).update(gym=self.default_gym)
+            reset_gym_admin_ids(self.default_gym_id)
 
             # All users in the gym must have a gym config
             for profile in UserProfile.objects.filter(gym=self.default_gym):
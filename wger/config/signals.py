@@ -15,11 +15,16 @@
 # You should have received a copy of the GNU Affero General Public License
 
 
+from django.core.cache import cache
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
 from wger.config.models import LanguageConfig
 from wger.core.models import Language
+from wger.utils.cache import (
+    cache_mapper,
+    get_template_cache_name
+)
 
 
 @receiver(post_save, sender=Language)
@@ -28,19 +33,26 @@ def init_language_config(sender, instance, created, **kwargs):
     Creates language config entries when new languages are created
     (all combinations of all languages)
     """
-    for language_source in Language.objects.all():
-        for language_target in Language.objects.all():
-            if not LanguageConfig.objects.filter(language=language_source)\
-                                         .filter(language_target=language_target)\
-                                         .exists():
-
-                for item in LanguageConfig.SHOW_ITEM_LIST:
-                    config = LanguageConfig()
-                    config.language = language_source
-                    config.language_target = language_target
-                    config.item = item[0]
-                    if language_source == language_target:
-                        config.show = True
-                    else:
-                        config.show = False
-                    config.save()
+    language_ids = list(Language.objects.values_list('pk', flat=True))
+    existing = set(LanguageConfig.objects.values_list('language_id', 'language_target_id', 'item'))
+
+    configs = [LanguageConfig(language_id=source,
+                              language_target_id=target,
+                              item=item,
+                              show=source == target)
+               for source in language_ids
+               for target in language_ids
+               for item, name in LanguageConfig.SHOW_ITEM_LIST
+               if (source, target, item) not in existing]
+    if not configs:
+        return
+    LanguageConfig.objects.bulk_create(configs)
+
+    # Reset the cached languages and template fragments of the changed languages
+    keys = []
+    for pk in set(config.language_id for config in configs):
+        keys += [cache_mapper.get_language_config_key(pk, item)
+                 for item, name in LanguageConfig.SHOW_ITEM_LIST]
+        keys += [get_template_cache_name('muscle-overview', pk),
+                 get_template_cache_name('exercise-overview', pk)]
+    cache.delete_many(keys)
@@ -15,9 +15,16 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with Workout Manager.  If not, see <http://www.gnu.org/licenses/>.
 
-from wger.config.models import LanguageConfig
+from django.core.cache import cache
 
-from wger.core.tests.base_testcase import WorkoutManagerEditTestCase
+from wger.config.models import LanguageConfig
+from wger.core.models import Language
+from wger.core.tests.base_testcase import (
+    WorkoutManagerEditTestCase,
+    WorkoutManagerTestCase
+)
+from wger.utils.cache import cache_mapper
+from wger.utils.language import load_item_languages
 
 
 class EditLanguageConfigTestCase(WorkoutManagerEditTestCase):
@@ -29,3 +36,47 @@ class EditLanguageConfigTestCase(WorkoutManagerEditTestCase):
     url = 'config:language_config:edit'
     pk = 1
     data = {'show': False}
+
+
+class InitLanguageConfigTestCase(WorkoutManagerTestCase):
+    """
+    Tests creating the language configs for new languages
+    """
+
+    def test_new_language(self):
+        """
+        Test that all the missing configurations are created
+        """
+        language_count = Language.objects.count()
+        config_count = LanguageConfig.objects.count()
+
+        with self.assertNumQueries(4):
+            language = Language.objects.create(short_name='xx', full_name='Testish')
+
+        # Configs from and to the new language plus the one to itself, for all items
+        items = len(LanguageConfig.SHOW_ITEM_LIST)
+        self.assertEqual(LanguageConfig.objects.count(),
+                         config_count + (language_count * 2 + 1) * items)
+        for item, name in LanguageConfig.SHOW_ITEM_LIST:
+            self.assertTrue(LanguageConfig.objects.get(language=language,
+                                                       language_target=language,
+                                                       item=item).show)
+            self.assertFalse(LanguageConfig.objects.get(language=language,
+                                                        language_target_id=1,
+                                                        item=item).show)
+
+        # Saving again doesn't create anything
+        with self.assertNumQueries(3):
+            language.save()
+        self.assertEqual(LanguageConfig.objects.count(),
+                         config_count + (language_count * 2 + 1) * items)
+
+    def test_reset_cache(self):
+        """
+        Test that the cached languages of the changed languages are reset
+        """
+        load_item_languages(LanguageConfig.SHOW_ITEM_EXERCISES, 'de')
+        self.assertTrue(cache.get(cache_mapper.get_language_config_key(1, '1')))
+
+        Language.objects.create(short_name='xx', full_name='Testish')
+        self.assertFalse(cache.get(cache_mapper.get_language_config_key(1, '1')))
@@ -19,19 +19,27 @@ import random
 import datetime
 import uuid
 
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import translation
+from django.utils.timezone import now
 from django.utils.translation import ugettext as _
 
 from wger.weight.models import WeightEntry
 from wger.exercises.models import Exercise
-from wger.core.models import DaysOfWeek
+from wger.core.models import GuestUser
 from wger.manager.models import (
     Workout,
     Day,
     Set,
     Setting,
+    PersonalRecord,
     WorkoutLog,
+    WorkoutMonthSummary,
+    WeeklyMuscleVolume,
     Schedule,
     ScheduleStep
 )
@@ -39,10 +47,14 @@ from wger.nutrition.models import (
     NutritionPlan,
     Meal,
     MealItem,
-    Ingredient,
-    IngredientWeightUnit
+    Ingredient
 )
 
+from wger.utils.cache import (
+    cache_mapper,
+    reset_trainer_summary,
+    reset_weight_chart
+)
 from wger.utils.language import load_language
 
 logger = logging.getLogger(__name__)
@@ -67,351 +79,323 @@ def create_temporary_user():
     return user
 
 
-def create_demo_entries(user):
+def claim_guest_user():
     """
-    Creates some demo data for temporary users
+    Hands out a ready-made guest user from the pool
+
+    A free user is looked up first and then claimed with an UPDATE that only
+    succeeds if it is still free, so concurrent requests never get the same
+    one. If the pool is empty, this is counted as a miss.
+
+    :return: the user, ready to be logged in, or None if the pool is empty
+    """
+    while True:
+        pk = GuestUser.objects.filter(claim_token__isnull=True) \
+            .values_list('pk', flat=True).first()
+        if pk is None:
+            break
+
+        token = uuid.uuid4().hex
+        if GuestUser.objects.filter(pk=pk, claim_token__isnull=True).update(claim_token=token):
+            user = User.objects.get(guestuser__claim_token=token)
+            user.date_joined = now()
+            User.objects.filter(pk=user.pk).update(date_joined=user.date_joined)
+            user.backend = settings.AUTHENTICATION_BACKENDS[0]
+            return user
+
+        # Another request was faster, try the next free one
+
+    logger.warning('No guest user available in the pool')
+    cache.add(cache_mapper.GUEST_USER_POOL_MISSES, 0, None)
+    cache.incr(cache_mapper.GUEST_USER_POOL_MISSES)
+    return None
+
+
+def fill_guest_user_pool(size):
+    """
+    Creates guest users with demo data until the pool has the given size
+
+    :param size: the number of available guest users
+    :return: the number of guest users created
+    """
+    created = 0
+    while GuestUser.objects.filter(claim_token__isnull=True).count() < size:
+        with transaction.atomic():
+            user = create_temporary_user()
+            create_demo_entries(user)
+            GuestUser.objects.create(user=user)
+        created += 1
+    return created
+
+
+def get_guest_user_pool_stats():
+    """
+    Returns the number of available and handed out guest users, as well as
+    the number of times a visitor found the pool empty
+    """
+    return {'available': GuestUser.objects.filter(claim_token__isnull=True).count(),
+            'claimed': GuestUser.objects.filter(claim_token__isnull=False).count(),
+            'misses': cache.get(cache_mapper.GUEST_USER_POOL_MISSES, 0)}
+
+
+DEMO_EXERCISES = {'curls': (26, 81),
+                  'french_press': (25, 84),
+                  'squats': (6, 111),
+                  'crunches': (4, 91),
+                  'leg_raises': (35, 126)}
+'''
+Exercises used in the demo workout, as (German, other languages) PKs
+'''
+
+DEMO_INGREDIENTS = {'oatmeal': ((8197, None, 100), (2126, None, 100)),
+                    'milk': ((8198, None, 100), (154, None, 100)),
+                    'protein_powder': ((8244, None, 30), (196, None, 30)),
+                    'bread': ((8225, None, 80), (5370, 9874, 2)),
+                    'turkey': ((8201, None, 100), (1643, None, 100)),
+                    'cottage_cheese': ((8222, None, 50), (17, None, 50)),
+                    'tomato': ((8217, None, 120), (3208, 5950, 1))}
+'''
+Ingredients used in the demo nutrition plan, as (German, other languages)
+tuples of ingredient PK, weight unit PK and amount
+'''
+
+_demo_snapshots = {}
+
+
+def get_demo_snapshot():
     """
+    Returns the canonical demo data for the current language
 
-    # (this is a bit ugly and long...)
+    The snapshot is built only once per process and language. Dates are stored
+    as offsets from today so they can be shifted when the data is copied to a
+    user.
+    """
     language = load_language()
+    key = translation.get_language()
+    if key not in _demo_snapshots:
+        _demo_snapshots[key] = build_demo_snapshot(language)
+    return _demo_snapshots[key]
+
+
+def build_demo_snapshot(language):
+    """
+    Builds the canonical demo data for a language
+
+    :param language: the language of the exercises and ingredients
+    :return: a dictionary with the rows to create for every table
+    """
+    index = 0 if language.short_name == 'de' else 1
+    exercise = dict((name, pks[index]) for name, pks in DEMO_EXERCISES.items())
+    ingredient = dict((name, values[index]) for name, values in DEMO_INGREDIENTS.items())
+
+    # Make sure all the referenced entries are present
+    if len(Exercise.objects.in_bulk(exercise.values())) != len(exercise):
+        raise Exercise.DoesNotExist('Exercises for the demo data not found')
+    if len(Ingredient.objects.in_bulk([i[0] for i in ingredient.values()])) != len(ingredient):
+        raise Ingredient.DoesNotExist('Ingredients for the demo data not found')
+
+    # Weight log entries, as workout, exercise, reps, weight and weeks ago
+    logs = []
+    for name, reps_list, base_weight, variation in (('curls', (8, 10, 12), 18, 4),
+                                                    ('french_press', (7, 10), 30, 4),
+                                                    ('squats', (5, 10, 12), 110, 10)):
+        for reps in reps_list:
+            for i in range(1, 8):
+                logs.append((0,
+                             exercise[name],
+                             reps,
+                             base_weight - reps + random.randint(1, variation),
+                             i))
+
+    return {
+        'language': language.pk,
+        'workouts': (_('Sample workout'),
+                     _('Placeholder workout nr {0} for schedule').format(1),
+                     _('Placeholder workout nr {0} for schedule').format(2),
+                     _('Placeholder workout nr {0} for schedule').format(3)),
+
+        # Workout, description and day of the week
+        'days': ((0, _('Sample day'), 1),
+                 (0, _('Another sample day'), 3)),
+
+        # Day, number of sets, order and exercises
+        'sets': ((0, 4, 2, (exercise['curls'], )),
+                 (0, 4, 2, (exercise['french_press'], )),
+                 (0, 4, 3, (exercise['squats'], )),
+                 (0, 4, 4, (exercise['crunches'], exercise['leg_raises']))),
+
+        # Set, exercise, reps and order
+        'settings': ((0, exercise['curls'], 8, 1),
+                     (1, exercise['french_press'], 8, 1),
+                     (2, exercise['squats'], 10, 1),
+                     (3, exercise['crunches'], 30, 1),
+                     (3, exercise['crunches'], 99, 2),
+                     (3, exercise['crunches'], 35, 3),
+                     (3, exercise['leg_raises'], 30, 1),
+                     (3, exercise['leg_raises'], 40, 2),
+                     (3, exercise['leg_raises'], 99, 3)),
+        'logs': logs,
+
+        # Body weight and days ago
+        'weight_entries': [(80 + 0.5 * i + random.randint(1, 3), i) for i in range(1, 20)],
+
+        'plan': _('Sample nutrional plan'),
+
+        # Order and time, the lunch is left empty so users can add their own
+        # ingredients
+        'meals': ((1, datetime.time(7, 30)),
+                  (2, datetime.time(11, 0)),
+                  (3, datetime.time(13, 0))),
+
+        # Meal, order and (ingredient, weight unit, amount)
+        'meal_items': ((0, 1, ingredient['oatmeal']),
+                       (0, 2, ingredient['milk']),
+                       (0, 3, ingredient['protein_powder']),
+                       (1, 1, ingredient['bread']),
+                       (1, 2, ingredient['turkey']),
+                       (1, 3, ingredient['cottage_cheese']),
+                       (1, 4, ingredient['tomato'])),
+
+        # Name, weeks ago, active and loop
+        'schedules': ((_('My cool workout schedule'), 4, True, True),
+                      (_('Empty placeholder schedule'), 15, False, False),
+                      (_('Empty placeholder schedule'), 30, False, False)),
+
+        # Schedule, workout, duration and order
+        'steps': ((0, 1, 2, 1),
+                  (0, 0, 4, 2),
+                  (0, 2, 1, 3),
+                  (0, 3, 6, 4),
+                  (1, 1, 2, 1),
+                  (2, 3, 2, 1)),
+    }
+
+
+def bulk_create_with_pks(model, objects, **filters):
+    """
+    Inserts the objects with one query and sets their primary keys, which
+    bulk_create doesn't do on all database backends
+
+    :param model: the model class
+    :param objects: the unsaved objects
+    :param filters: filters that select the newly inserted rows (and at most
+                    rows inserted before them)
+    :return: the objects
+    """
+    model.objects.bulk_create(objects)
+    pks = model.objects.filter(**filters).order_by('-pk').values_list('pk', flat=True)
+    for obj, pk in zip(objects, reversed(pks[:len(objects)])):
+        obj.pk = pk
+    return objects
+
+
+def create_demo_entries(user):
+    """
+    Creates some demo data for temporary users
+
+    The canonical demo data is copied with one bulk insert per table. No model
+    save() methods or signals are run, so the tables derived from the logs are
+    calculated at the end.
+    """
+    snapshot = get_demo_snapshot()
+    today = datetime.date.today()
 
     #
-    # Workout and exercises
+    # Workouts and exercises
     #
-    setting_list = []
-    weight_log = []
-    workout = Workout(user=user, comment=_('Sample workout'))
-    workout.save()
-    monday = DaysOfWeek.objects.get(pk=1)
-    wednesday = DaysOfWeek.objects.get(pk=3)
-    day = Day(training=workout, description=_('Sample day'))
-    day.save()
-    day.day.add(monday)
-
-    day2 = Day(training=workout, description=_('Another sample day'))
-    day2.save()
-    day2.day.add(wednesday)
-
-    # Biceps curls with dumbbell
-    if language.short_name == 'de':
-        exercise = Exercise.objects.get(pk=26)
-    else:
-        exercise = Exercise.objects.get(pk=81)
-    day_set = Set(exerciseday=day, sets=4, order=2)
-    day_set.save()
-    day_set.exercises.add(exercise)
-
-    setting = Setting(set=day_set, exercise=exercise, reps=8, order=1)
-    setting.save()
-
-    # Weight log entries
-    for reps in (8, 10, 12):
-        for i in range(1, 8):
-            log = WorkoutLog(user=user,
-                             exercise=exercise,
-                             workout=workout,
-                             reps=reps,
-                             weight=18 - reps + random.randint(1, 4),
-                             date=datetime.date.today() - datetime.timedelta(weeks=i))
-            weight_log.append(log)
-
-    # French press
-    if language.short_name == 'de':
-        exercise = Exercise.objects.get(pk=25)
-    else:
-        exercise = Exercise.objects.get(pk=84)
-    day_set = Set(exerciseday=day, sets=4, order=2)
-    day_set.save()
-    day_set.exercises.add(exercise)
-
-    setting_list.append(Setting(set=day_set, exercise=exercise, reps=8, order=1))
-
-    # Weight log entries
-    for reps in (7, 10):
-        for i in range(1, 8):
-            log = WorkoutLog(user=user,
-                             exercise=exercise,
-                             workout=workout,
-                             reps=reps,
-                             weight=30 - reps + random.randint(1, 4),
-                             date=datetime.date.today() - datetime.timedelta(weeks=i))
-            weight_log.append(log)
-
-    # Squats
-    if language.short_name == 'de':
-        exercise = Exercise.objects.get(pk=6)
-    else:
-        exercise = Exercise.objects.get(pk=111)
-    day_set = Set(exerciseday=day, sets=4, order=3)
-    day_set.save()
-    day_set.exercises.add(exercise)
-
-    setting_list.append(Setting(set=day_set, exercise=exercise, reps=10, order=1))
-
-    # Weight log entries
-    for reps in (5, 10, 12):
-        for i in range(1, 8):
-            log = WorkoutLog(user=user,
-                             exercise=exercise,
-                             workout=workout,
-                             reps=reps,
-                             weight=110 - reps + random.randint(1, 10),
-                             date=datetime.date.today() - datetime.timedelta(weeks=i))
-            weight_log.append(log)
-
-    # Crunches
-    if language.short_name == 'de':
-        exercise = Exercise.objects.get(pk=4)
-    else:
-        exercise = Exercise.objects.get(pk=91)
-    day_set = Set(exerciseday=day, sets=4, order=4)
-    day_set.save()
-    day_set.exercises.add(exercise)
-
-    setting_list.append(Setting(set=day_set, exercise=exercise, reps=30, order=1))
-    setting_list.append(Setting(set=day_set, exercise=exercise, reps=99, order=2))
-    setting_list.append(Setting(set=day_set, exercise=exercise, reps=35, order=3))
-
-    # Leg raises, supersets with crunches
-    if language.short_name == 'de':
-        exercise = Exercise.objects.get(pk=35)
-    else:
-        exercise = Exercise.objects.get(pk=126)
-    day_set.exercises.add(exercise)
-
-    setting_list.append(Setting(set=day_set, exercise=exercise, reps=30, order=1))
-    setting_list.append(Setting(set=day_set, exercise=exercise, reps=40, order=2))
-    setting_list.append(Setting(set=day_set, exercise=exercise, reps=99, order=3))
-
-    Setting.objects.bulk_create(setting_list)
-
-    # Save all the log entries
-    WorkoutLog.objects.bulk_create(weight_log)
+    workouts = bulk_create_with_pks(Workout,
+                                    [Workout(user=user, comment=comment)
+                                     for comment in snapshot['workouts']],
+                                    user=user)
+    days = bulk_create_with_pks(Day,
+                                [Day(training=workouts[workout], description=description)
+                                 for workout, description, dow in snapshot['days']],
+                                training__user=user)
+    Day.day.through.objects.bulk_create([Day.day.through(day_id=day.pk,
+                                                         daysofweek_id=values[2])
+                                         for day, values in zip(days, snapshot['days'])])
+
+    sets = bulk_create_with_pks(Set,
+                                [Set(exerciseday=days[day], sets=sets, order=order)
+                                 for day, sets, order, exercises in snapshot['sets']],
+                                exerciseday__training__user=user)
+    Set.exercises.through.objects.bulk_create([Set.exercises.through(set_id=day_set.pk,
+                                                                     exercise_id=exercise,
+                                                                     sort_value=sort_value)
+                                               for day_set, values in zip(sets, snapshot['sets'])
+                                               for sort_value, exercise in enumerate(values[3])])
+    Setting.objects.bulk_create([Setting(set=sets[day_set], exercise_id=exercise, reps=reps,
+                                         order=order)
+                                 for day_set, exercise, reps, order in snapshot['settings']])
+
+    WorkoutLog.objects.bulk_create([WorkoutLog(user=user,
+                                               exercise_id=exercise,
+                                               workout=workouts[workout],
+                                               reps=reps,
+                                               weight=weight,
+                                               date=today - datetime.timedelta(weeks=weeks))
+                                    for workout, exercise, reps, weight, weeks
+                                    in snapshot['logs']])
 
     #
     # (Body) weight entries
     #
-    temp = []
-    existing_entries = [i.date for i in WeightEntry.objects.filter(user=user)]
-    for i in range(1, 20):
-        creation_date = datetime.date.today() - datetime.timedelta(days=i)
-        if creation_date not in existing_entries:
-            entry = WeightEntry(user=user,
-                                weight=80 + 0.5 * i + random.randint(1, 3),
-                                date=creation_date)
-            temp.append(entry)
-    WeightEntry.objects.bulk_create(temp)
+    existing_entries = set(WeightEntry.objects.filter(user=user).values_list('date', flat=True))
+    WeightEntry.objects.bulk_create([WeightEntry(user=user,
+                                                 weight=weight,
+                                                 date=today - datetime.timedelta(days=days_ago))
+                                     for weight, days_ago in snapshot['weight_entries']
+                                     if today - datetime.timedelta(days=days_ago)
+                                     not in existing_entries])
 
     #
     # Nutritional plan
     #
-    plan = NutritionPlan()
-    plan.user = user
-    plan.language = language
-    plan.description = _('Sample nutrional plan')
-    plan.save()
-
-    # Breakfast
-    meal = Meal()
-    meal.plan = plan
-    meal.order = 1
-    meal.time = datetime.time(7, 30)
-    meal.save()
-
-    # Oatmeal
-    if language.short_name == 'de':
-        ingredient = Ingredient.objects.get(pk=8197)
-    else:
-        ingredient = Ingredient.objects.get(pk=2126)
-
-    mealitem = MealItem()
-    mealitem.meal = meal
-    mealitem.ingredient = ingredient
-    mealitem.order = 1
-    mealitem.amount = 100
-    mealitem.save()
-
-    # Milk
-    if language.short_name == 'de':
-        ingredient = Ingredient.objects.get(pk=8198)
-    else:
-        ingredient = Ingredient.objects.get(pk=154)
-
-    mealitem = MealItem()
-    mealitem.meal = meal
-    mealitem.ingredient = ingredient
-    mealitem.order = 2
-    mealitem.amount = 100
-    mealitem.save()
-
-    # Protein powder
-    if language.short_name == 'de':
-        ingredient = Ingredient.objects.get(pk=8244)
-    else:
-        ingredient = Ingredient.objects.get(pk=196)
-
-    mealitem = MealItem()
-    mealitem.meal = meal
-    mealitem.ingredient = ingredient
-    mealitem.order = 3
-    mealitem.amount = 30
-    mealitem.save()
-
-    #
-    # 11 o'clock meal
-    meal = Meal()
-    meal.plan = plan
-    meal.order = 2
-    meal.time = datetime.time(11, 0)
-    meal.save()
-
-    # Bread, in slices
-    if language.short_name == 'de':
-        ingredient = Ingredient.objects.get(pk=8225)
-        unit = None
-        amount = 80
-    else:
-        ingredient = Ingredient.objects.get(pk=5370)
-        unit = IngredientWeightUnit.objects.get(pk=9874)
-        amount = 2
-
-    mealitem = MealItem()
-    mealitem.meal = meal
-    mealitem.ingredient = ingredient
-    mealitem.weight_unit = unit
-    mealitem.order = 1
-    mealitem.amount = amount
-    mealitem.save()
-
-    # Turkey
-    if language.short_name == 'de':
-        ingredient = Ingredient.objects.get(pk=8201)
-    else:
-        ingredient = Ingredient.objects.get(pk=1643)
-
-    mealitem = MealItem()
-    mealitem.meal = meal
-    mealitem.order = 2
-    mealitem.ingredient = ingredient
-    mealitem.amount = 100
-    mealitem.save()
-
-    # Cottage cheese
-    if language.short_name == 'de':
-        ingredient = Ingredient.objects.get(pk=8222)  # TODO: check this!
-    else:
-        ingredient = Ingredient.objects.get(pk=17)
-
-    mealitem = MealItem()
-    mealitem.meal = meal
-    mealitem.ingredient = ingredient
-    mealitem.order = 3
-    mealitem.amount = 50
-    mealitem.save()
-
-    # Tomato, one
-    if language.short_name == 'de':
-        ingredient = Ingredient.objects.get(pk=8217)
-        unit = None
-        amount = 120
-    else:
-        ingredient = Ingredient.objects.get(pk=3208)
-        unit = IngredientWeightUnit.objects.get(pk=5950)
-        amount = 1
-
-    mealitem = MealItem()
-    mealitem.meal = meal
-    mealitem.weight_unit = unit
-    mealitem.ingredient = ingredient
-    mealitem.order = 4
-    mealitem.amount = amount
-    mealitem.save()
-
-    #
-    # Lunch (leave empty so users can add their own ingredients)
-    meal = Meal()
-    meal.plan = plan
-    meal.order = 3
-    meal.time = datetime.time(13, 0)
-    meal.save()
+    plan = bulk_create_with_pks(NutritionPlan,
+                                [NutritionPlan(user=user,
+                                               language_id=snapshot['language'],
+                                               description=snapshot['plan'])],
+                                user=user)[0]
+    meals = bulk_create_with_pks(Meal,
+                                 [Meal(plan=plan, order=order, time=time)
+                                  for order, time in snapshot['meals']],
+                                 plan=plan)
+    MealItem.objects.bulk_create([MealItem(meal=meals[meal],
+                                           order=order,
+                                           ingredient_id=ingredient,
+                                           weight_unit_id=unit,
+                                           amount=amount)
+                                  for meal, order, (ingredient, unit, amount)
+                                  in snapshot['meal_items']])
 
     #
     # Workout schedules
     #
 
-    # create some empty workouts to fill the list
-    workout2 = Workout(user=user, comment=_('Placeholder workout nr {0} for schedule').format(1))
-    workout2.save()
-    workout3 = Workout(user=user, comment=_('Placeholder workout nr {0} for schedule').format(2))
-    workout3.save()
-    workout4 = Workout(user=user, comment=_('Placeholder workout nr {0} for schedule').format(3))
-    workout4.save()
-
-    schedule = Schedule()
-    schedule.user = user
-    schedule.name = _('My cool workout schedule')
-    schedule.start_date = datetime.date.today() - datetime.timedelta(weeks=4)
-    schedule.is_active = True
-    schedule.is_loop = True
-    schedule.save()
-
-    # Add the workouts
-    step = ScheduleStep()
-    step.schedule = schedule
-    step.workout = workout2
-    step.duration = 2
-    step.order = 1
-    step.save()
-
-    step = ScheduleStep()
-    step.schedule = schedule
-    step.workout = workout
-    step.duration = 4
-    step.order = 2
-    step.save()
-
-    step = ScheduleStep()
-    step.schedule = schedule
-    step.workout = workout3
-    step.duration = 1
-    step.order = 3
-    step.save()
-
-    step = ScheduleStep()
-    step.schedule = schedule
-    step.workout = workout4
-    step.duration = 6
-    step.order = 4
-    step.save()
-
-    #
-    # Add two more schedules, to make the overview more interesting
-    schedule = Schedule()
-    schedule.user = user
-    schedule.name = _('Empty placeholder schedule')
-    schedule.start_date = datetime.date.today() - datetime.timedelta(weeks=15)
-    schedule.is_active = False
-    schedule.is_loop = False
-    schedule.save()
-
-    step = ScheduleStep()
-    step.schedule = schedule
-    step.workout = workout2
-    step.duration = 2
-    step.order = 1
-    step.save()
-
-    schedule = Schedule()
-    schedule.user = user
-    schedule.name = _('Empty placeholder schedule')
-    schedule.start_date = datetime.date.today() - datetime.timedelta(weeks=30)
-    schedule.is_active = False
-    schedule.is_loop = False
-    schedule.save()
-
-    step = ScheduleStep()
-    step.schedule = schedule
-    step.workout = workout4
-    step.duration = 2
-    step.order = 1
-    step.save()
+    # Only one schedule can be active at a time
+    Schedule.objects.filter(user=user).update(is_active=False)
+    schedules = bulk_create_with_pks(Schedule,
+                                     [Schedule(user=user,
+                                               name=name,
+                                               start_date=today - datetime.timedelta(weeks=weeks),
+                                               is_active=is_active,
+                                               is_loop=is_loop)
+                                      for name, weeks, is_active, is_loop
+                                      in snapshot['schedules']],
+                                     user=user)
+    ScheduleStep.objects.bulk_create([ScheduleStep(schedule=schedules[schedule],
+                                                   workout=workouts[workout],
+                                                   duration=duration,
+                                                   order=order)
+                                      for schedule, workout, duration, order
+                                      in snapshot['steps']])
+
+    # The trainer overview and the weight chart of the user might have been
+    # cached already
+    reset_trainer_summary(user.pk)
+    reset_weight_chart(user.pk)
+
+    # The tables derived from the logs are not maintained by bulk_create
+    WorkoutMonthSummary.objects.rebuild([user.pk])
+    PersonalRecord.objects.rebuild([user.pk])
+    WeeklyMuscleVolume.objects.rebuild([user.pk])
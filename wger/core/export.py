@@ -0,0 +1,358 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+"""
+PDF and CSV exports created in the background
+
+The views only queue an ExportJob, the files are created by the
+process-export-jobs command (e.g. called by cron), which distributes the
+PDFs of all queued jobs over a pool of worker processes. Exports for a whole
+gym are split in one task per member, so they are rendered in parallel too.
+The member lists of the gyms are written as CSV file in a single task.
+"""
+
+import datetime
+import io
+import logging
+import multiprocessing
+import tempfile
+import zipfile
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.files.base import (
+    ContentFile,
+    File
+)
+from django.core.urlresolvers import reverse
+from django.db import connections
+from django.db.models import (
+    F,
+    Q
+)
+from django.template.loader import render_to_string
+from django.utils import translation
+from django.utils.encoding import force_bytes
+from django.utils.six.moves.urllib.parse import urljoin
+from django.utils.timezone import now
+from django.utils.translation import ugettext as _
+
+from wger.core.models import ExportJob
+from wger.gym.helpers import get_member_export_csv
+from wger.gym.models import Gym
+from wger.manager.models import (
+    Schedule,
+    Workout
+)
+from wger.manager.views.pdf import render_workout_pdf
+from wger.manager.views.schedule import render_schedule_pdf
+from wger.nutrition.models import NutritionPlan
+from wger.nutrition.views.plan import render_plan_pdf
+
+
+logger = logging.getLogger(__name__)
+
+TASK_MEMBER = 'member'
+'''Kind of the tasks that render the current plans of a gym member'''
+
+
+def get_export_options(data):
+    """
+    Reads the PDF options from the submitted form data, named like the fields
+    of the PDF download popups
+    """
+    return {'images': bool(data.get('images')),
+            'comments': bool(data.get('comments')),
+            'only_table': data.get('pdf_type') == 'table'}
+
+
+def queue_export_job(request, kind, object_id, images=False, comments=False, only_table=False,
+                     columns=()):
+    """
+    Queues a new export for the current user, in the current language
+    """
+    return ExportJob.objects.create(user=request.user,
+                                    kind=kind,
+                                    object_id=object_id,
+                                    images=images,
+                                    comments=comments,
+                                    only_table=only_table,
+                                    columns=','.join(columns),
+                                    language=translation.get_language(),
+                                    base_url=request.build_absolute_uri('/'))
+
+
+def get_tasks(job):
+    """
+    Returns the PDFs to render for a job, as list of (job ID, kind, object ID)
+    tuples
+    """
+    if job.kind == ExportJob.KIND_GYM:
+        members = Gym.objects.get_members(job.object_id).order_by('username')
+        return [(job.pk, TASK_MEMBER, pk) for pk in members.values_list('pk', flat=True)]
+    return [(job.pk, job.kind, job.object_id)]
+
+
+def render_pdf(job, kind, obj, username):
+    """
+    Renders the PDF of a workout, schedule or nutrition plan with the options
+    of the job and returns its content
+    """
+    output = io.BytesIO()
+    url = urljoin(job.base_url, obj.get_absolute_url())
+    options = {'images': job.images, 'comments': job.comments, 'only_table': job.only_table}
+    if kind == ExportJob.KIND_WORKOUT:
+        render_workout_pdf(output, obj, username, url, **options)
+    elif kind == ExportJob.KIND_SCHEDULE:
+        render_schedule_pdf(output, obj, username, url, **options)
+    else:
+        render_plan_pdf(output, obj, username, url)
+    return output.getvalue()
+
+
+def get_member_files(job, member):
+    """
+    Renders the current workout and the newest nutrition plan of a gym member
+
+    :return: a list of (filename, content) tuples
+    """
+    files = []
+    workout, schedule = Schedule.objects.get_current_workout(member)
+    if workout:
+        files.append((u'{0}/Workout-{1}.pdf'.format(member.username, workout.pk),
+                      render_pdf(job, ExportJob.KIND_WORKOUT, workout, member.username)))
+
+    plan = NutritionPlan.objects.filter(user=member).order_by('-creation_date', '-pk').first()
+    if plan:
+        files.append((u'{0}/Nutrition-plan-{1}.pdf'.format(member.username, plan.pk),
+                      render_pdf(job, ExportJob.KIND_NUTRITION_PLAN, plan, member.username)))
+    return files
+
+
+def get_member_list_file(job):
+    """
+    Writes the CSV export of the members of a gym
+
+    :return: a (filename, content) tuple
+    """
+    today = datetime.date.today()
+    filename = u'User-data-gym-{gym}-{t.year}-{t.month:02d}-{t.day:02d}.csv'\
+        .format(t=today, gym=job.object_id)
+    content = ''.join(get_member_export_csv(Gym.objects.get(pk=job.object_id),
+                                            job.columns.split(',')))
+    return filename, force_bytes(content)
+
+
+def render_task(task):
+    """
+    Renders the PDFs of one task, this is called in the worker processes
+
+    :return: a (job ID, files) tuple, files is a list of (filename, content)
+             tuples or None if the PDFs could not be rendered
+    """
+    job_pk, kind, object_id = task
+    try:
+        job = ExportJob.objects.select_related('user').get(pk=job_pk)
+        with translation.override(job.language):
+            if kind == TASK_MEMBER:
+                files = get_member_files(job, User.objects.get(pk=object_id))
+            elif kind == ExportJob.KIND_GYM_MEMBERS:
+                files = [get_member_list_file(job)]
+            else:
+                model = {ExportJob.KIND_WORKOUT: Workout,
+                         ExportJob.KIND_SCHEDULE: Schedule,
+                         ExportJob.KIND_NUTRITION_PLAN: NutritionPlan}[kind]
+                obj = model.objects.get(pk=object_id, user=job.user)
+                filename = u'{0}-{1}.pdf'.format(kind.capitalize(), obj.pk)
+                files = [(filename, render_pdf(job, kind, obj, job.user.username))]
+    except Exception:
+        logger.exception('Could not render the PDFs of export job %s', job_pk)
+        return job_pk, None
+    return job_pk, files
+
+
+def run_tasks(tasks, processes):
+    """
+    Generator with the results of the tasks, in the order they are finished
+
+    With more than one process the tasks are distributed over a pool of
+    worker processes. The database connections are closed first, the forked
+    processes must not share them.
+    """
+    if processes > 1 and len(tasks) > 1:
+        connections.close_all()
+        pool = multiprocessing.Pool(processes)
+        try:
+            for result in pool.imap_unordered(render_task, tasks):
+                yield result
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        for task in tasks:
+            yield render_task(task)
+
+
+def start_job(job):
+    """
+    Returns the state of a running job
+
+    The PDFs of a gym are written to a temporary ZIP file as they arrive, so
+    they are not all kept in memory until the last member is rendered.
+    """
+    state = {'job': job, 'remaining': job.total, 'files': [], 'failed': False,
+             'output': None, 'zip_file': None}
+    if job.kind == ExportJob.KIND_GYM:
+        state['output'] = tempfile.TemporaryFile()
+        state['zip_file'] = zipfile.ZipFile(state['output'], 'w', zipfile.ZIP_DEFLATED)
+    return state
+
+
+def add_files(state, files):
+    """
+    Adds the result of a task to the state of its job
+
+    :param files: a list of (filename, content) tuples or None if the task
+                  failed
+    """
+    state['remaining'] -= 1
+    if files is None:
+        state['failed'] = True
+    elif state['zip_file']:
+        for filename, content in files:
+            state['zip_file'].writestr(filename, content)
+    else:
+        state['files'] += files
+
+
+def finish_job(state):
+    """
+    Saves the result of a job, a single file or the ZIP file with all PDFs
+    of a gym
+    """
+    job = state['job']
+    output = state['output']
+    if state['zip_file']:
+        state['zip_file'].close()
+
+    if state['failed']:
+        job.status = ExportJob.STATUS_FAILED
+    else:
+        if output:
+            today = datetime.date.today()
+            filename = 'Plans-gym-{gym}-{t.year}-{t.month:02d}-{t.day:02d}.zip'\
+                .format(t=today, gym=job.object_id)
+            output.seek(0)
+            job.result.save(filename, File(output), save=False)
+        else:
+            filename, content = state['files'][0]
+            job.result.save(filename, ContentFile(content), save=False)
+        job.status = ExportJob.STATUS_DONE
+    if output:
+        output.close()
+    job.progress = job.total
+    job.save()
+
+    if job.kind == ExportJob.KIND_GYM_MEMBERS and job.status == ExportJob.STATUS_DONE:
+        notify_member_export(job)
+
+
+def notify_member_export(job):
+    """
+    Sends the link to the download of a member export to the administrator
+    that requested it
+
+    The link leads to the download view, which checks the permissions again,
+    the file itself is not public.
+    """
+    if not job.user.email:
+        return
+
+    download_url = urljoin(job.base_url, reverse('core:export:download', kwargs={'pk': job.pk}))
+    with translation.override(job.language):
+        context = {'gym': Gym.objects.get(pk=job.object_id), 'download_url': download_url}
+        mail.send_mail(_('Member export ready'),
+                       render_to_string('gym/email_member_export.html', context),
+                       settings.WGER_SETTINGS['EMAIL_FROM'],
+                       [job.user.email],
+                       fail_silently=True)
+
+
+def process_export_jobs(processes=1):
+    """
+    Renders the PDFs of all queued jobs
+
+    :param processes: number of worker processes
+    :return: the number of processed jobs
+    """
+    jobs = {}
+    tasks = []
+    for job in ExportJob.objects.filter(status=ExportJob.STATUS_QUEUED).select_related('user'):
+
+        # Another worker might have been faster
+        start_date = now()
+        if not ExportJob.objects.filter(pk=job.pk, status=ExportJob.STATUS_QUEUED)\
+                .update(status=ExportJob.STATUS_RUNNING, start_date=start_date):
+            continue
+
+        job.status = ExportJob.STATUS_RUNNING
+        job.start_date = start_date
+        job_tasks = get_tasks(job)
+        job.total = len(job_tasks)
+        ExportJob.objects.filter(pk=job.pk).update(total=job.total)
+        jobs[job.pk] = start_job(job)
+        tasks += job_tasks
+
+        # e.g. a gym without members
+        if not job_tasks:
+            finish_job(jobs[job.pk])
+
+    for job_pk, files in run_tasks(tasks, processes):
+        state = jobs[job_pk]
+        add_files(state, files)
+        ExportJob.objects.filter(pk=job_pk).update(progress=F('progress') + 1)
+
+        if not state['remaining']:
+            finish_job(state)
+    return len(jobs)
+
+
+def fail_stale_export_jobs(minutes):
+    """
+    Marks the jobs as failed that are running for longer than the given
+    number of minutes, e.g. because the process rendering them died
+
+    :return: the number of failed jobs
+    """
+    limit = now() - datetime.timedelta(minutes=minutes)
+    return ExportJob.objects.filter(status=ExportJob.STATUS_RUNNING)\
+        .filter(Q(start_date__lt=limit) | Q(start_date__isnull=True, creation_date__lt=limit))\
+        .update(status=ExportJob.STATUS_FAILED)
+
+
+def delete_old_export_jobs(days):
+    """
+    Deletes the jobs and files older than the given number of days
+
+    :return: the number of deleted jobs
+    """
+    jobs = ExportJob.objects.filter(creation_date__lt=now() - datetime.timedelta(days=days))
+    count = 0
+    for job in jobs:
+        job.delete()
+        count += 1
+    return count
@@ -23,6 +23,7 @@ from django.core.cache import cache
 from wger.core.models import Language
 from wger.manager.models import Workout, WorkoutLog
 from wger.exercises.models import Exercise
+from wger.utils import pdf_cache
 from wger.utils.cache import (
     reset_workout_canonical_form,
     reset_workout_log,
@@ -48,6 +49,12 @@ class Command(BaseCommand):
                     default=False,
                     help='Clear only the workout canonical view'),
 
+        make_option('--clear-pdf',
+                    action='store_true',
+                    dest='clear_pdf',
+                    default=False,
+                    help='Clear only the generated PDFs'),
+
         make_option('--clear-all',
                     action='store_true',
                     dest='clear_all',
@@ -65,6 +72,7 @@ class Command(BaseCommand):
 
         if (not options['clear_template']
                 and not options['clear_workout']
+                and not options['clear_pdf']
                 and not options['clear_all']):
             raise CommandError('Please select what cache you need to delete, see help')
 
@@ -106,6 +114,10 @@ class Command(BaseCommand):
             for w in Workout.objects.all():
                 reset_workout_canonical_form(w.pk)
 
+        # Generated PDFs
+        if options['clear_pdf'] or options['clear_all']:
+            pdf_cache.clear()
+
         # Nuclear option, clear all
         if options['clear_all']:
             cache.clear()
@@ -14,11 +14,59 @@
 #
 # You should have received a copy of the GNU Affero General Public License
 
+import collections
 import datetime
+import time
+from optparse import make_option
 
-from django.utils.timezone import now
+from django.contrib.auth.models import User
 from django.core.management.base import BaseCommand
-from wger.core.models import UserProfile
+from django.db import (
+    models,
+    transaction
+)
+from django.utils.timezone import now
+
+
+def get_purge_plan(model, lookup='pk', parents=()):
+    """
+    Returns the steps needed to delete rows of the given model together with
+    everything that references them, ordered so that referencing rows are
+    handled first.
+
+    Every step is a tuple (action, model, field, lookup) where action is either
+    'delete' or 'null' (field is the foreign key to set to NULL) and lookup
+    filters the affected rows by the PKs of the deleted users.
+    """
+    plan = []
+    parents = parents + (model, )
+
+    # Intermediate tables of the model's many-to-many fields
+    for field in model._meta.many_to_many:
+        if field.remote_field.through._meta.auto_created:
+            plan.append(('delete',
+                         field.remote_field.through,
+                         None,
+                         '{0}__{1}'.format(field.m2m_field_name(), lookup)))
+
+    for rel in model._meta.related_objects:
+        related_model = rel.related_model
+        if rel.many_to_many:
+            if rel.through._meta.auto_created:
+                plan.append(('delete',
+                             rel.through,
+                             None,
+                             '{0}__{1}'.format(rel.field.m2m_reverse_field_name(), lookup)))
+            continue
+
+        related_lookup = '{0}__{1}'.format(rel.field.name, lookup)
+        if rel.on_delete == models.CASCADE and related_model not in parents:
+            plan.extend(get_purge_plan(related_model, related_lookup, parents))
+        elif rel.on_delete == models.SET_NULL:
+            plan.append(('null', related_model, rel.field.name, related_lookup))
+
+    plan.append(('delete', model, None, lookup))
+    return plan
 
 
 class Command(BaseCommand):
@@ -26,17 +74,51 @@ class Command(BaseCommand):
     Helper admin command to clean up demo users, to be called e.g. by cron
     """
 
+    option_list = BaseCommand.option_list + (
+        make_option('--chunk-size',
+                    action='store',
+                    type='int',
+                    dest='chunk_size',
+                    default=500,
+                    help='Number of users deleted in one transaction'),
+    )
+
     help = 'Deletes all temporary users older than 1 week'
 
     def handle(self, **options):
 
-        profile_list = UserProfile.objects.filter(is_temporary=True)
-        counter = 0
-        for profile in profile_list:
-            delta = now() - profile.user.date_joined
+        # Users still waiting in the guest user pool are kept
+        user_ids = list(User.objects.filter(userprofile__is_temporary=True,
+                                            date_joined__lte=now() - datetime.timedelta(7))
+                                    .exclude(guestuser__claim_token__isnull=True,
+                                             guestuser__isnull=False)
+                                    .values_list('pk', flat=True))
+
+        # Delete the users table by table, in chunks. The data is going away,
+        # so the rows are deleted directly without loading them or sending
+        # signals to reset their caches. Only models with files go through
+        # the regular delete, whose post_delete receivers remove the files.
+        plan = get_purge_plan(User)
+        stats = collections.OrderedDict()
+        chunk_size = options['chunk_size']
+        for i in range(0, len(user_ids), chunk_size):
+            chunk = user_ids[i:i + chunk_size]
+            with transaction.atomic():
+                for action, model, field, lookup in plan:
+                    start = time.time()
+                    queryset = model.objects.filter(**{'{0}__in'.format(lookup): chunk})
+                    if action == 'null':
+                        rows = queryset.update(**{field: None})
+                    elif any(isinstance(f, models.FileField) for f in model._meta.fields):
+                        rows = queryset.delete()[1].get(model._meta.label, 0)
+                    else:
+                        rows = queryset._raw_delete(queryset.db)
 
-            if delta >= datetime.timedelta(7):
-                counter += 1
-                profile.user.delete()
+                    table_stats = stats.setdefault(model._meta.db_table, [0, 0])
+                    table_stats[0] += rows
+                    table_stats[1] += time.time() - start
 
-        self.stdout.write("Deleted {0} temporary users".format(counter))
+        for table, (rows, seconds) in stats.items():
+            if rows:
+                self.stdout.write("{0}: {1} rows in {2:.2f}s".format(table, rows, seconds))
+        self.stdout.write("Deleted {0} temporary users".format(len(user_ids)))
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 *-*
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+from optparse import make_option
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import translation
+
+from wger.core.demo import (
+    fill_guest_user_pool,
+    get_guest_user_pool_stats
+)
+
+
+class Command(BaseCommand):
+    """
+    Helper admin command to create guest users in advance, to be called e.g. by cron
+    """
+
+    option_list = BaseCommand.option_list + (
+        make_option('--size',
+                    action='store',
+                    type='int',
+                    dest='size',
+                    default=20,
+                    help='Number of available guest users to keep in the pool'),
+    )
+
+    help = 'Creates guest users with demo data until the pool has the given size'
+
+    def handle(self, **options):
+
+        # The demo data is created in the site's default language
+        with translation.override(settings.LANGUAGE_CODE):
+            created = fill_guest_user_pool(options['size'])
+        stats = get_guest_user_pool_stats()
+
+        self.stdout.write("Created {0} guest users".format(created))
+        if int(options['verbosity']) >= 2:
+            self.stdout.write("Available: {available}, handed out: {claimed}, "
+                              "pool was empty: {misses} times".format(**stats))
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 *-*
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+from optparse import make_option
+
+from django.core.management.base import BaseCommand
+
+from wger.core.export import (
+    delete_old_export_jobs,
+    fail_stale_export_jobs,
+    process_export_jobs
+)
+
+
+class Command(BaseCommand):
+    """
+    Helper admin command to render the queued PDF exports, to be called e.g. by cron
+    """
+
+    option_list = BaseCommand.option_list + (
+        make_option('--processes',
+                    action='store',
+                    type='int',
+                    dest='processes',
+                    default=2,
+                    help='Number of worker processes that render the PDFs'),
+        make_option('--max-age',
+                    action='store',
+                    type='int',
+                    dest='max_age',
+                    default=7,
+                    help='Delete exports older than this number of days'),
+        make_option('--timeout',
+                    action='store',
+                    type='int',
+                    dest='timeout',
+                    default=60,
+                    help='Mark exports running for longer than this number of minutes '
+                         'as failed'),
+    )
+
+    help = 'Renders the queued PDF exports and deletes the old ones'
+
+    def handle(self, **options):
+
+        deleted = delete_old_export_jobs(options['max_age'])
+        failed = fail_stale_export_jobs(options['timeout'])
+        processed = process_export_jobs(max(options['processes'], 1))
+
+        self.stdout.write("Processed {0} export jobs".format(processed))
+        if int(options['verbosity']) >= 2:
+            self.stdout.write("Deleted {0} old export jobs".format(deleted))
+            self.stdout.write("Failed {0} stale export jobs".format(failed))
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 *-*
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+from optparse import make_option
+
+from django.core.management.base import BaseCommand
+
+from wger.utils.instrumentation import (
+    ORDER_BY,
+    get_slowest_views,
+    reset_stats
+)
+
+
+class Command(BaseCommand):
+    """
+    Shows the views with the worst numbers recorded by the instrumentation
+    middleware
+    """
+
+    option_list = BaseCommand.option_list + (
+        make_option('--count',
+                    action='store',
+                    type='int',
+                    dest='count',
+                    default=20,
+                    help='Number of views to show'),
+        make_option('--order-by',
+                    action='store',
+                    type='choice',
+                    choices=ORDER_BY,
+                    dest='order_by',
+                    default='time',
+                    help='Value to sort by, one of: {0}'.format(', '.join(ORDER_BY))),
+        make_option('--reset',
+                    action='store_true',
+                    dest='reset',
+                    default=False,
+                    help='Delete the collected statistics afterwards'),
+    )
+
+    help = 'Shows the slowest views recorded by the instrumentation middleware'
+
+    def handle(self, **options):
+
+        views = get_slowest_views(options['order_by'], options['count'])
+        if not views:
+            self.stdout.write("No statistics collected, is the instrumentation middleware "
+                              "active and the cache shared between processes?")
+
+        for name, stats in views:
+            self.stdout.write("{name}: {requests} requests, avg {avg_time:.1f} ms, "
+                              "max {max_time:.1f} ms, avg {avg_queries:.1f} queries, "
+                              "max {max_queries} queries, DB {db_time:.1f} ms, "
+                              "templates {template_time:.1f} ms, "
+                              "cache {cache_hits} hits / {cache_misses} misses"
+                              .format(name=name, **stats))
+
+        if options['reset']:
+            reset_stats()
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+USER_INDEXES = (('core_auth_user_name', ('last_name', 'first_name')), )
+'''
+Indexes on the (unmanaged) user table, used to sort the user lists by name
+
+The search of the user lists looks for the text anywhere in the username,
+email and name, which no index can help with, it scans the table.
+'''
+
+
+def create_user_indexes(apps, schema_editor):
+    """
+    Creates the indexes, with the SQL of the database's schema editor
+    """
+    for name, columns in USER_INDEXES:
+        schema_editor.execute(schema_editor.sql_create_index % {
+            'name': schema_editor.quote_name(name),
+            'table': schema_editor.quote_name('auth_user'),
+            'columns': ', '.join(schema_editor.quote_name(column) for column in columns),
+            'extra': ''})
+
+
+def delete_user_indexes(apps, schema_editor):
+    """
+    Deletes the indexes, e.g. MySQL needs the table for this
+    """
+    for name, columns in USER_INDEXES:
+        schema_editor.execute(schema_editor.sql_delete_index % {
+            'name': schema_editor.quote_name(name),
+            'table': schema_editor.quote_name('auth_user')})
+
+
+class Migration(migrations.Migration):
+    '''
+    Indexes used to sort the user lists
+    '''
+
+    dependencies = [
+        ('auth', '0007_alter_validators_add_error_messages'),
+        ('core', '0009_auto_20160303_2340'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='usercache',
+            name='last_activity',
+            field=models.DateField(null=True, db_index=True),
+        ),
+        migrations.RunPython(create_user_indexes, delete_user_indexes),
+    ]
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import wger.core.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0011_guestuser'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('workout', 'Workout'), ('schedule', 'Workout schedule'), ('nutritionplan', 'Nutrition plan'), ('gym', 'Current plans of all gym members')], editable=False, max_length=20)),
+                ('object_id', models.IntegerField(editable=False)),
+                ('images', models.BooleanField(default=False, editable=False)),
+                ('comments', models.BooleanField(default=False, editable=False)),
+                ('only_table', models.BooleanField(default=False, editable=False)),
+                ('language', models.CharField(editable=False, max_length=10)),
+                ('base_url', models.CharField(editable=False, max_length=200)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], db_index=True, default='queued', editable=False, max_length=10)),
+                ('progress', models.IntegerField(default=0, editable=False)),
+                ('total', models.IntegerField(default=0, editable=False)),
+                ('creation_date', models.DateTimeField(auto_now_add=True)),
+                ('result', models.FileField(blank=True, editable=False, max_length=200, upload_to=wger.core.models.export_upload_dir)),
+                ('user', models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['creation_date'],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_exportjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exportjob',
+            name='columns',
+            field=models.CharField(blank=True, editable=False, max_length=200),
+        ),
+        migrations.AlterField(
+            model_name='exportjob',
+            name='kind',
+            field=models.CharField(choices=[('workout', 'Workout'), ('schedule', 'Workout schedule'), ('nutritionplan', 'Nutrition plan'), ('gym', 'Current plans of all gym members'), ('gymmembers', 'Members of a gym')], editable=False, max_length=20),
+        ),
+    ]
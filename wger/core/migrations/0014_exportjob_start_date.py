@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_exportjob_columns'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exportjob',
+            name='start_date',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+    ]
@@ -16,6 +16,7 @@
 
 import datetime
 import decimal
+import uuid
 
 from django.db import models
 from django.db.models import IntegerField
@@ -484,7 +485,7 @@ class UserCache(models.Model):
     The user
     '''
 
-    last_activity = models.DateField(null=True)
+    last_activity = models.DateField(null=True, db_index=True)
     '''
     The user's last activity.
 
@@ -499,6 +500,192 @@ class UserCache(models.Model):
         return u"Cache for user {0}".format(self.user)
 
 
+@python_2_unicode_compatible
+class GuestUser(models.Model):
+    """
+    A temporary user with demo data, created in advance so that it can be
+    handed out to a visitor without any work during the request
+    """
+
+    user = models.OneToOneField(User, editable=False)
+    '''
+    The temporary user
+    '''
+
+    claim_token = models.CharField(max_length=32,
+                                   null=True,
+                                   editable=False,
+                                   db_index=True)
+    '''
+    Random token set when the user is handed out. Users without a token are
+    still available in the pool.
+    '''
+
+    def __str__(self):
+        """
+        Return a more human-readable representation
+        """
+        return u"Guest user {0}".format(self.user)
+
+
+def export_upload_dir(instance, filename):
+    """
+    Returns the upload target for the rendered exports
+    """
+    return "export/{0}/{1}/{2}".format(instance.user_id, uuid.uuid4(), filename)
+
+
+@python_2_unicode_compatible
+class ExportJob(models.Model):
+    """
+    A PDF or CSV export that is created in the background by the
+    process-export-jobs command
+    """
+
+    KIND_WORKOUT = 'workout'
+    KIND_SCHEDULE = 'schedule'
+    KIND_NUTRITION_PLAN = 'nutritionplan'
+    KIND_GYM = 'gym'
+    KIND_GYM_MEMBERS = 'gymmembers'
+    KINDS = ((KIND_WORKOUT, _('Workout')),
+             (KIND_SCHEDULE, _('Workout schedule')),
+             (KIND_NUTRITION_PLAN, _('Nutrition plan')),
+             (KIND_GYM, _('Current plans of all gym members')),
+             (KIND_GYM_MEMBERS, _('Members of a gym')))
+
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS = ((STATUS_QUEUED, _('Queued')),
+              (STATUS_RUNNING, _('Running')),
+              (STATUS_DONE, _('Done')),
+              (STATUS_FAILED, _('Failed')))
+
+    user = models.ForeignKey(User, editable=False)
+    '''
+    The user that requested the export
+    '''
+
+    kind = models.CharField(max_length=20, choices=KINDS, editable=False)
+    '''
+    What is exported
+    '''
+
+    object_id = models.IntegerField(editable=False)
+    '''
+    The ID of the exported workout, schedule, plan or gym
+    '''
+
+    images = models.BooleanField(default=False, editable=False)
+    '''
+    Flag indicating whether the exercise images are included
+    '''
+
+    comments = models.BooleanField(default=False, editable=False)
+    '''
+    Flag indicating whether the exercise comments are included
+    '''
+
+    only_table = models.BooleanField(default=False, editable=False)
+    '''
+    Flag indicating whether the workouts are exported as table, without the
+    space for the logs
+    '''
+
+    columns = models.CharField(max_length=200, blank=True, editable=False)
+    '''
+    The columns of a member export, comma separated
+    '''
+
+    language = models.CharField(max_length=10, editable=False)
+    '''
+    The language the PDFs are rendered in
+    '''
+
+    base_url = models.CharField(max_length=200, editable=False)
+    '''
+    The absolute URL of the site, used for the links in the PDFs
+    '''
+
+    status = models.CharField(max_length=10,
+                              choices=STATUS,
+                              default=STATUS_QUEUED,
+                              editable=False,
+                              db_index=True)
+    '''
+    The current state of the job
+    '''
+
+    progress = models.IntegerField(default=0, editable=False)
+    '''
+    Number of rendered PDFs
+    '''
+
+    total = models.IntegerField(default=0, editable=False)
+    '''
+    Number of PDFs to render, known once the job is running
+    '''
+
+    creation_date = models.DateTimeField(auto_now_add=True, editable=False)
+    '''
+    When the job was queued
+    '''
+
+    start_date = models.DateTimeField(null=True, editable=False)
+    '''
+    When the job started running, used to fail the jobs of a crashed
+    process-export-jobs run
+    '''
+
+    result = models.FileField(max_length=200,
+                              blank=True,
+                              editable=False,
+                              upload_to=export_upload_dir)
+    '''
+    The rendered PDF, a ZIP file with all PDFs of a gym or the CSV file with
+    its members
+    '''
+
+    class Meta:
+        """
+        Set Meta options
+        """
+        ordering = ["creation_date", ]
+
+    def __str__(self):
+        """
+        Return a more human-readable representation
+        """
+        return u"Export job {0} for user {1}".format(self.pk, self.user)
+
+    def get_absolute_url(self):
+        """
+        Returns the URL of the status page
+        """
+        return reverse('core:export:view', kwargs={'pk': self.pk})
+
+    def get_owner_object(self):
+        """
+        Returns the object that has owner information
+        """
+        return self
+
+    @property
+    def is_gym_export(self):
+        """
+        Flag indicating whether the job exports the data of a gym
+        """
+        return self.kind in (self.KIND_GYM, self.KIND_GYM_MEMBERS)
+
+    @property
+    def is_finished(self):
+        """
+        Flag indicating whether the job is done or failed
+        """
+        return self.status in (self.STATUS_DONE, self.STATUS_FAILED)
+
+
 @python_2_unicode_compatible
 class DaysOfWeek(models.Model):
     """
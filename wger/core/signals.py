@@ -15,11 +15,19 @@
 # You should have received a copy of the GNU Affero General Public License
 
 
+from django.apps import apps
 from django.contrib.auth.models import User
-from django.db.models.signals import post_save
+from django.db.models.signals import (
+    post_delete,
+    post_save
+)
 
-from wger.core.models import UserProfile, UserCache
+from wger.core.models import ExportJob, UserProfile, UserCache
 from wger.utils.helpers import disable_for_loaddata
+from wger.utils.reference_data import (
+    REFERENCE_MODELS,
+    reference_data
+)
 
 
 @disable_for_loaddata
@@ -40,5 +48,26 @@ def create_user_cache(sender, instance, created, **kwargs):
         UserCache.objects.create(user=instance)
 
 
+def delete_export_job_result(sender, instance, **kwargs):
+    """
+    Deletes the rendered file of an export job from the disk as well, also
+    when the job is deleted together with its user
+    """
+    if instance.result:
+        instance.result.delete(save=False)
+
+
+def reset_reference_data(sender, **kwargs):
+    """
+    Reload the lookup tables in all processes after changing one of them
+    """
+    reference_data.invalidate()
+
+
 post_save.connect(create_user_profile, sender=User)
 post_save.connect(create_user_cache, sender=User)
+post_delete.connect(delete_export_job_result, sender=ExportJob)
+
+for model in REFERENCE_MODELS:
+    post_save.connect(reset_reference_data, sender=apps.get_model(model))
+    post_delete.connect(reset_reference_data, sender=apps.get_model(model))
@@ -23,7 +23,9 @@ from django.core.urlresolvers import reverse
 from django.core.urlresolvers import NoReverseMatch
 from django.core.cache import cache
 from django.conf import settings
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from wger.utils.constants import TWOPLACES
 
 
@@ -180,6 +182,22 @@ class WorkoutManagerTestCase(BaseTestCase, TestCase):
         self.client.logout()
         self.current_user = 'anonymous'
 
+    def assert_query_budget(self, url, budget, data=None):
+        """
+        Requests the URL and checks that the view executes at most the given
+        number of queries. Returns the response.
+        """
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, data or {})
+        self.assertLessEqual(len(context),
+                             budget,
+                             u'{0} executed {1} queries, the budget is {2}:\n{3}'.format(
+                                 url,
+                                 len(context),
+                                 budget,
+                                 u'\n'.join(query['sql'] for query in context.captured_queries)))
+        return response
+
     def compare_fields(self, field, value):
         current_field_class = field.__class__.__name__
 
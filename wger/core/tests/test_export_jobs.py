@@ -0,0 +1,188 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+import datetime
+import io
+import zipfile
+
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.core.urlresolvers import reverse
+from django.utils.timezone import now
+
+from wger.core.export import process_export_jobs
+from wger.core.models import ExportJob
+from wger.core.tests.base_testcase import WorkoutManagerTestCase
+from wger.gym.models import Gym
+from wger.manager.models import Schedule
+
+
+class ExportJobTestCase(WorkoutManagerTestCase):
+    """
+    Tests the PDF exports rendered in the background
+    """
+
+    def test_schedule(self):
+        """
+        Test queueing, rendering and downloading the PDF of a schedule
+        """
+        self.user_login('test')
+        url = reverse('core:export:add', kwargs={'kind': 'schedule', 'pk': 1})
+        response = self.client.post(url, {'pdf_type': 'table', 'images': 'on'})
+        job = ExportJob.objects.get()
+        self.assertRedirects(response, reverse('core:export:view', kwargs={'pk': job.pk}))
+        self.assertEqual(job.status, ExportJob.STATUS_QUEUED)
+        self.assertTrue(job.images)
+        self.assertFalse(job.comments)
+        self.assertTrue(job.only_table)
+
+        # The status page reloads itself until the PDF is ready
+        response = self.client.get(job.get_absolute_url())
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'http-equiv="refresh"')
+
+        call_command('process-export-jobs', processes=1)
+        job = ExportJob.objects.get()
+        self.assertEqual(job.status, ExportJob.STATUS_DONE)
+        self.assertEqual(job.progress, 1)
+        self.assertEqual(job.total, 1)
+
+        # Polling returns the status as JSON
+        response = self.client.get(job.get_absolute_url(), HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEqual(response.json()['status'], 'done')
+        download_url = reverse('core:export:download', kwargs={'pk': job.pk})
+        self.assertEqual(response.json()['download_url'], download_url)
+
+        response = self.client.get(job.get_absolute_url())
+        self.assertRedirects(response, download_url)
+        response = self.client.get(download_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename=Schedule-1.pdf')
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
+
+    def test_add_checks(self):
+        """
+        Test that only the user's own objects can be exported, per POST
+        """
+        self.user_login('test')
+        url = reverse('core:export:add', kwargs={'kind': 'schedule', 'pk': 1})
+        self.assertEqual(self.client.get(url).status_code, 405)
+
+        schedule = Schedule.objects.exclude(user__username='test').first()
+        url = reverse('core:export:add', kwargs={'kind': 'schedule', 'pk': schedule.pk})
+        self.assertEqual(self.client.post(url).status_code, 404)
+        self.assertFalse(ExportJob.objects.exists())
+
+    def test_other_user(self):
+        """
+        Test that other users can't see or download an export
+        """
+        self.user_login('test')
+        self.client.post(reverse('core:export:add', kwargs={'kind': 'workout', 'pk': 3}))
+        process_export_jobs()
+        job = ExportJob.objects.get()
+
+        self.user_login('admin')
+        self.assertEqual(self.client.get(job.get_absolute_url()).status_code, 404)
+        response = self.client.get(reverse('core:export:download', kwargs={'pk': job.pk}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_failed(self):
+        """
+        Test that an export of a deleted object fails
+        """
+        self.user_login('test')
+        self.client.post(reverse('core:export:add', kwargs={'kind': 'schedule', 'pk': 1}))
+        Schedule.objects.get(pk=1).delete()
+        self.assertEqual(process_export_jobs(), 1)
+
+        job = ExportJob.objects.get()
+        self.assertEqual(job.status, ExportJob.STATUS_FAILED)
+        self.assertFalse(job.result)
+        response = self.client.get(job.get_absolute_url())
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, 'http-equiv="refresh"')
+
+    def test_gym(self):
+        """
+        Test exporting the current plans of all members of a gym
+        """
+        gym = Gym.objects.get(pk=1)
+        url = reverse('gym:export:plans', kwargs={'gym_pk': gym.pk})
+
+        self.user_login('test')
+        self.assertEqual(self.client.post(url).status_code, 403)
+
+        self.user_login('manager1')
+        self.assertEqual(self.client.get(url).status_code, 200)
+        response = self.client.post(url, {'pdf_type': 'table'})
+        job = ExportJob.objects.get()
+        self.assertRedirects(response, job.get_absolute_url())
+
+        process_export_jobs()
+        job = ExportJob.objects.get()
+        members = Gym.objects.get_members(gym.pk)
+        self.assertEqual(job.status, ExportJob.STATUS_DONE)
+        self.assertTrue(job.start_date)
+        self.assertEqual(job.total, members.count())
+        self.assertEqual(job.progress, members.count())
+
+        response = self.client.get(reverse('core:export:download', kwargs={'pk': job.pk}))
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        today = datetime.date.today()
+        self.assertEqual(response['Content-Disposition'],
+                         'attachment; filename=Plans-gym-1-{t.year}-{t.month:02d}-{t.day:02d}.zip'
+                         .format(t=today))
+        zip_file = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        usernames = set(name.split('/')[0] for name in zip_file.namelist())
+        self.assertTrue(usernames)
+        self.assertTrue(usernames <= set(members.values_list('username', flat=True)))
+
+    def test_delete_old(self):
+        """
+        Test that old exports are deleted with their files
+        """
+        self.user_login('test')
+        self.client.post(reverse('core:export:add', kwargs={'kind': 'workout', 'pk': 3}))
+        process_export_jobs()
+        job = ExportJob.objects.get()
+        self.assertTrue(default_storage.exists(job.result.name))
+
+        call_command('process-export-jobs', max_age=1)
+        self.assertTrue(ExportJob.objects.exists())
+
+        ExportJob.objects.update(creation_date=job.creation_date - datetime.timedelta(days=2))
+        call_command('process-export-jobs', max_age=1)
+        self.assertFalse(ExportJob.objects.exists())
+        self.assertFalse(default_storage.exists(job.result.name))
+
+    def test_stale_running(self):
+        """
+        Test that jobs running for too long, e.g. of a killed run, fail
+        """
+        self.user_login('test')
+        self.client.post(reverse('core:export:add', kwargs={'kind': 'workout', 'pk': 3}))
+        start_date = now() - datetime.timedelta(minutes=30)
+        ExportJob.objects.update(status=ExportJob.STATUS_RUNNING, start_date=start_date)
+
+        call_command('process-export-jobs', timeout=60)
+        job = ExportJob.objects.get()
+        self.assertEqual(job.status, ExportJob.STATUS_RUNNING)
+
+        call_command('process-export-jobs', timeout=20)
+        job = ExportJob.objects.get()
+        self.assertEqual(job.status, ExportJob.STATUS_FAILED)
+        response = self.client.get(job.get_absolute_url())
+        self.assertNotContains(response, 'http-equiv="refresh"')
@@ -16,17 +16,38 @@ import datetime
 import random
 
 from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
 from django.core.management import call_command
 from django.core.urlresolvers import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
-from wger.core.demo import create_demo_entries, create_temporary_user
+from wger.core.demo import (
+    claim_guest_user,
+    create_demo_entries,
+    create_temporary_user,
+    fill_guest_user_pool,
+    get_guest_user_pool_stats
+)
+from wger.core.models import (
+    ExportJob,
+    GuestUser
+)
 from wger.core.tests.base_testcase import WorkoutManagerTestCase
-from wger.manager.models import (Day,
+from wger.manager.models import (get_week_start,
+                                 Day,
+                                 PersonalRecord,
                                  Schedule,
                                  ScheduleStep,
+                                 Set,
+                                 Setting,
+                                 WeeklyMuscleVolume,
                                  Workout,
-                                 WorkoutLog)
+                                 WorkoutLog,
+                                 WorkoutMonthSummary)
 from wger.nutrition.models import Meal
+from wger.nutrition.models import MealItem
 from wger.nutrition.models import NutritionPlan
 from wger.weight.models import WeightEntry
 
@@ -109,6 +130,72 @@ class DemoUserTestCase(WorkoutManagerTestCase):
         # Body weight
         self.assertEqual(WeightEntry.objects.filter(user=user).count(), 19)
 
+    def test_demo_data_queries(self):
+        """
+        Tests that the demo data is created with a fixed number of queries
+        and that the copied rows are correctly linked
+        """
+        user = create_temporary_user()
+        create_demo_entries(user)
+        user = create_temporary_user()
+        with self.assertNumQueries(38):
+            create_demo_entries(user)
+
+        workout = Workout.objects.filter(user=user).order_by('pk').first()
+        self.assertEqual(Day.objects.filter(training=workout).count(), 2)
+        self.assertEqual([day.day.get().pk for day in Day.objects.filter(training=workout)],
+                         [1, 3])
+        superset = Set.objects.get(exerciseday__training=workout, order=4)
+        self.assertEqual([e.pk for e in superset.exercises.all()], [91, 126])
+        self.assertEqual(Setting.objects.filter(set__exerciseday__training=workout).count(), 9)
+        self.assertEqual(MealItem.objects.filter(meal__plan__user=user).count(), 7)
+        self.assertEqual(Schedule.objects.filter(user=user, is_active=True).count(), 1)
+        self.assertEqual(len(workout.canonical_representation['day_list']), 2)
+
+    def test_demo_data_calendar(self):
+        """
+        Tests that the calendar shows the logs of the demo data
+        """
+        user = create_temporary_user()
+        create_demo_entries(user)
+        self.client.force_login(user)
+
+        months = set(date.replace(day=1) for date in
+                     WorkoutLog.objects.filter(user=user).values_list('date', flat=True))
+        self.assertEqual(set(WorkoutMonthSummary.objects.filter(user=user)
+                             .values_list('date', flat=True)), months)
+        for month in months:
+            response = self.client.get(reverse('manager:workout:calendar',
+                                               kwargs={'year': month.year,
+                                                       'month': month.month}))
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(sorted(response.context['month_list']), sorted(months))
+            self.assertTrue(response.context['logs'])
+
+    def test_demo_data_personal_records(self):
+        """
+        Tests that the personal records of the demo logs are calculated
+        """
+        user = create_temporary_user()
+        create_demo_entries(user)
+        logs = WorkoutLog.objects.filter(user=user, reps__gt=0)
+        self.assertEqual(set(PersonalRecord.objects.filter(user=user)
+                             .values_list('exercise', 'reps', 'weight')),
+                         set((exercise, reps, max(logs.filter(exercise=exercise, reps=reps)
+                                                  .values_list('weight', flat=True)))
+                             for exercise, reps in logs.values_list('exercise', 'reps')))
+
+    def test_demo_data_weekly_volume(self):
+        """
+        Tests that the weekly volume of the demo logs is calculated
+        """
+        user = create_temporary_user()
+        create_demo_entries(user)
+        weeks = set(get_week_start(date) for date in
+                    WorkoutLog.objects.filter(user=user).values_list('date', flat=True))
+        self.assertEqual(set(WeeklyMuscleVolume.objects.filter(user=user)
+                             .values_list('date', flat=True)), weeks)
+
     def test_demo_user(self):
         """
         Tests that temporary users are automatically created when visiting
@@ -186,3 +273,112 @@ class DemoUserTestCase(WorkoutManagerTestCase):
         self.assertEqual(self.count_temp_users(), 18)
         call_command('delete-temp-users')
         self.assertEqual(self.count_temp_users(), 2)
+
+    def test_command_delete_dependent_rows(self):
+        """
+        Tests that the management command deletes all the data of the users
+        """
+        models = (Workout, Day, Set, Setting, WorkoutLog, Schedule, ScheduleStep,
+                  NutritionPlan, Meal, MealItem, WeightEntry)
+        counts = [model.objects.count() for model in models]
+        user = create_temporary_user()
+        create_demo_entries(user)
+        User.objects.filter(pk=user.pk).update(date_joined='2013-01-01 00:00+01:00')
+        self.assertEqual(Workout.objects.filter(user=user).count(), 4)
+
+        call_command('delete-temp-users', chunk_size=1)
+        self.assertEqual([model.objects.count() for model in models], counts)
+        self.assertFalse(User.objects.filter(pk=user.pk).exists())
+        self.assertEqual(Day.day.through.objects.filter(day__training__user=user).count(), 0)
+
+    def test_command_delete_export_files(self):
+        """
+        Tests that the management command deletes the export files of the users
+        """
+        user = create_temporary_user()
+        job = ExportJob.objects.create(user=user, kind=ExportJob.KIND_WORKOUT, object_id=1,
+                                       status=ExportJob.STATUS_DONE)
+        job.result.save('Workout-1.pdf', ContentFile(b'pdf'))
+        self.assertTrue(default_storage.exists(job.result.name))
+        User.objects.filter(pk=user.pk).update(date_joined='2013-01-01 00:00+01:00')
+
+        call_command('delete-temp-users')
+        self.assertFalse(ExportJob.objects.filter(pk=job.pk).exists())
+        self.assertFalse(default_storage.exists(job.result.name))
+
+
+class GuestUserPoolTestCase(WorkoutManagerTestCase):
+    """
+    Tests the pool of ready-made guest users
+    """
+
+    def test_fill_pool(self):
+        """
+        Tests that the pool is filled up to the given size
+        """
+        self.assertEqual(fill_guest_user_pool(2), 2)
+        self.assertEqual(fill_guest_user_pool(3), 1)
+        self.assertEqual(fill_guest_user_pool(3), 0)
+        self.assertEqual(GuestUser.objects.count(), 3)
+
+        user = GuestUser.objects.first().user
+        self.assertTrue(user.userprofile.is_temporary)
+        self.assertEqual(Workout.objects.filter(user=user).count(), 4)
+
+    def test_claim(self):
+        """
+        Tests that every guest user is only handed out once
+        """
+        fill_guest_user_pool(2)
+        user1 = claim_guest_user()
+        user2 = claim_guest_user()
+        self.assertNotEqual(user1.pk, user2.pk)
+        self.assertIsNone(claim_guest_user())
+        self.assertEqual(get_guest_user_pool_stats(),
+                         {'available': 0, 'claimed': 2, 'misses': 1})
+
+    def test_claim_update(self):
+        """
+        Tests that the claiming UPDATE has no subquery, which MySQL rejects
+        on the updated table
+        """
+        fill_guest_user_pool(1)
+        with CaptureQueriesContext(connection) as context:
+            self.assertTrue(claim_guest_user())
+        updates = [query['sql'] for query in context.captured_queries
+                   if query['sql'].startswith('UPDATE') and 'guestuser' in query['sql']]
+        self.assertEqual(len(updates), 1)
+        self.assertNotIn('SELECT', updates[0])
+
+    def test_dashboard(self):
+        """
+        Tests that visitors get a user from the pool, with demo data
+        """
+        fill_guest_user_pool(1)
+        guest = GuestUser.objects.get()
+        user_count = User.objects.count()
+
+        self.client.get(reverse('core:dashboard'))
+        self.assertEqual(User.objects.count(), user_count)
+        self.assertEqual(int(self.client.session['_auth_user_id']), guest.user_id)
+        self.assertTrue(self.client.session['has_demo_data'])
+
+        # The pool is empty, a user without demo data is created
+        self.client.logout()
+        self.client.get(reverse('core:dashboard'))
+        self.assertEqual(User.objects.count(), user_count + 1)
+        self.assertFalse(self.client.session.get('has_demo_data'))
+        self.assertEqual(get_guest_user_pool_stats()['misses'], 1)
+
+    def test_command(self):
+        """
+        Tests the management command and that users in the pool are not deleted
+        """
+        call_command('fill-guest-user-pool', size=2)
+        self.assertEqual(get_guest_user_pool_stats()['available'], 2)
+        claim_guest_user()
+
+        User.objects.filter().update(date_joined='2013-01-01 00:00+01:00')
+        call_command('delete-temp-users')
+        self.assertEqual(User.objects.filter(userprofile__is_temporary=True).count(), 1)
+        self.assertEqual(get_guest_user_pool_stats()['available'], 1)
@@ -12,6 +12,8 @@
 #
 # You should have received a copy of the GNU Affero General Public License
 
+import json
+
 from django.contrib.auth.models import User
 from django.core.urlresolvers import reverse, reverse_lazy
 
@@ -20,6 +22,7 @@ from wger.core.tests.base_testcase import (
     WorkoutManagerEditTestCase,
     WorkoutManagerAccessTestCase
 )
+from wger.gym.models import Gym
 
 
 class StatusUserTestCase(WorkoutManagerTestCase):
@@ -192,6 +195,35 @@ class UserListTestCase(WorkoutManagerAccessTestCase):
                  'trainer4')
 
 
+class UserListDataTestCase(WorkoutManagerAccessTestCase):
+    """
+    Test accessing the data of the general user overview
+    """
+
+    url = 'core:user:list-data'
+    user_success = ('admin',
+                    'general_manager1')
+    user_fail = ('member1',
+                 'manager1',
+                 'trainer2')
+
+    def test_data(self):
+        """
+        Test the returned page, sorted by gym
+        """
+        self.user_login('general_manager1')
+        response = self.client.get(reverse('core:user:list-data'),
+                                   {'length': 5,
+                                    'order[0][column]': 4,
+                                    'search[value]': 'trainer'})
+        data = json.loads(response.content.decode('utf8'))
+
+        self.assertEqual(data['recordsTotal'], User.objects.count())
+        self.assertEqual(data['recordsFiltered'], 5)
+        self.assertEqual([row[0] for row in data['data']], [7, 8, 4, 5, 6])
+        self.assertIn(Gym.objects.get(pk=1).get_absolute_url(), data['data'][2][4])
+
+
 class UserDetailPageTestCase(WorkoutManagerAccessTestCase):
     """
     Test accessing the user detail page
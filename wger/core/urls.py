@@ -27,6 +27,7 @@ from django.core.urlresolvers import reverse_lazy
 from wger.core.views import (
     user,
     misc,
+    export,
     license,
     languages,
     repetition_units,
@@ -93,6 +94,9 @@ patterns_user = [
     url(r'^(?P<pk>\d+)/overview',
         user.UserDetailView.as_view(),
         name='overview'),
+    url(r'^list/data$',
+        user.UserListDataView.as_view(),
+        name='list-data'),
     url(r'^list',
         user.UserListView.as_view(),
         name='list'),
@@ -174,6 +178,19 @@ patterns_weight_units = [
         name='delete'),
 ]
 
+# sub patterns for the background exports
+patterns_export = [
+    url(r'^add/(?P<kind>workout|schedule|nutritionplan)/(?P<pk>\d+)$',
+        export.add,
+        name='add'),
+    url(r'^(?P<pk>\d+)/view$',
+        export.view,
+        name='view'),
+    url(r'^(?P<pk>\d+)/download$',
+        export.download,
+        name='download'),
+]
+
 
 #
 # Actual patterns
@@ -200,10 +217,14 @@ urlpatterns = [
     url(r'^feedback$',
         misc.FeedbackClass.as_view(),
         name='feedback'),
+    url(r'^instrumentation$',
+        misc.instrumentation_stats,
+        name='instrumentation'),
 
     url(r'^language/', include(patterns_language, namespace="language")),
     url(r'^user/', include(patterns_user, namespace="user")),
     url(r'^license/', include(patterns_license, namespace="license")),
     url(r'^repetition-unit/', include(patterns_repetition_units, namespace="repetition-unit")),
     url(r'^weight-unit/', include(patterns_weight_units, namespace="weight-unit")),
+    url(r'^export/', include(patterns_export, namespace="export")),
 ]
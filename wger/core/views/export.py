@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+import logging
+import os
+
+from django.contrib.auth.decorators import login_required
+from django.core.urlresolvers import reverse
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponseForbidden,
+    HttpResponseNotAllowed,
+    HttpResponseRedirect,
+    JsonResponse
+)
+from django.shortcuts import (
+    get_object_or_404,
+    render
+)
+
+from wger.core.export import (
+    get_export_options,
+    queue_export_job
+)
+from wger.core.models import ExportJob
+from wger.gym.models import Gym
+from wger.gym.views.export import check_export_permissions
+from wger.manager.models import (
+    Schedule,
+    Workout
+)
+from wger.nutrition.models import NutritionPlan
+
+
+logger = logging.getLogger(__name__)
+
+EXPORT_MODELS = {ExportJob.KIND_WORKOUT: Workout,
+                 ExportJob.KIND_SCHEDULE: Schedule,
+                 ExportJob.KIND_NUTRITION_PLAN: NutritionPlan}
+'''The objects a user can export in the background'''
+
+CONTENT_TYPES = {ExportJob.KIND_GYM: 'application/zip',
+                 ExportJob.KIND_GYM_MEMBERS: 'text/csv'}
+'''The content types of the exports that are not a PDF'''
+
+
+@login_required
+def add(request, kind, pk):
+    """
+    Queues the PDF export of one of the user's workouts, schedules or plans
+    and redirects to the status page
+    """
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+
+    if kind not in EXPORT_MODELS:
+        raise Http404
+    obj = get_object_or_404(EXPORT_MODELS[kind], pk=pk, user=request.user)
+
+    job = queue_export_job(request, kind, obj.pk, **get_export_options(request.POST))
+    return HttpResponseRedirect(job.get_absolute_url())
+
+
+@login_required
+def view(request, pk):
+    """
+    Shows the progress of an export
+
+    The page reloads itself until the export is finished and then redirects
+    to the download. AJAX requests get the status as JSON, so it can also be
+    polled by scripts.
+    """
+    job = get_object_or_404(ExportJob, pk=pk, user=request.user)
+    download_url = reverse('core:export:download', kwargs={'pk': job.pk})
+
+    if request.is_ajax():
+        return JsonResponse({'status': job.status,
+                             'progress': job.progress,
+                             'total': job.total,
+                             'download_url': download_url if job.result else None})
+
+    if job.status == ExportJob.STATUS_DONE:
+        return HttpResponseRedirect(download_url)
+
+    return render(request, 'export/view.html', {'job': job})
+
+
+@login_required
+def download(request, pk):
+    """
+    Sends the rendered file of an export
+
+    The data of a gym can only be downloaded as long as the user can still
+    export it.
+    """
+    job = get_object_or_404(ExportJob, pk=pk, user=request.user)
+    if not job.result:
+        raise Http404
+
+    if job.is_gym_export:
+        gym = get_object_or_404(Gym, pk=job.object_id)
+        if not check_export_permissions(request.user, gym):
+            return HttpResponseForbidden()
+
+    response = FileResponse(job.result.storage.open(job.result.name, 'rb'),
+                            content_type=CONTENT_TYPES.get(job.kind, 'application/pdf'))
+    response['Content-Disposition'] = 'attachment; filename={0}'.format(
+        os.path.basename(job.result.name))
+    return response
@@ -18,7 +18,11 @@ import logging
 
 from django.conf import settings
 from django.shortcuts import render
-from django.http import HttpResponseRedirect
+from django.http import (
+    HttpResponseForbidden,
+    HttpResponseRedirect,
+    JsonResponse
+)
 from django.core.exceptions import ObjectDoesNotExist
 from django.core.urlresolvers import reverse, reverse_lazy
 from django.core import mail
@@ -32,12 +36,21 @@ from django.template.loader import render_to_string
 
 
 from wger.core.forms import FeedbackRegisteredForm, FeedbackAnonymousForm
-from wger.core.demo import create_demo_entries, create_temporary_user
+from wger.core.demo import (
+    claim_guest_user,
+    create_demo_entries,
+    create_temporary_user
+)
 from wger.core.models import DaysOfWeek
-from wger.manager.models import Schedule
+from wger.manager.models import (
+    Day,
+    Schedule
+)
 from wger.nutrition.models import NutritionPlan
 from wger.weight.models import WeightEntry
 from wger.weight.helpers import get_last_entries
+from wger.utils import instrumentation
+from wger.utils.reference_data import reference_data
 
 
 logger = logging.getLogger(__name__)
@@ -64,15 +77,18 @@ def demo_entries(request):
         return HttpResponseRedirect(reverse('software:features'))
 
     if (((not request.user.is_authenticated() or request.user.userprofile.is_temporary)
-         and not request.session['has_demo_data'])):
+         and not request.session.get('has_demo_data'))):
         # If we reach this from a page that has no user created by the
-        # middleware, do that now
+        # middleware, do that now. Users from the pool already have demo data.
         if not request.user.is_authenticated():
-            user = create_temporary_user()
+            user = claim_guest_user()
+            if not user:
+                user = create_temporary_user()
+                create_demo_entries(user)
             django_login(request, user)
+        else:
+            create_demo_entries(request.user)
 
-        # OK, continue
-        create_demo_entries(request.user)
         request.session['has_demo_data'] = True
         messages.success(request, _('We have created sample workout, workout schedules, weight '
                                     'logs, (body) weight and nutrition plan entries so you can '
@@ -114,12 +130,14 @@ def dashboard(request):
     # Format a bit the days so it doesn't have to be done in the template
     used_days = {}
     if current_workout:
-        for day in current_workout.day_set.select_related():
-            for day_of_week in day.day.select_related():
-                used_days[day_of_week.id] = day.description
+        workout_days = Day.day.through.objects.filter(day__training=current_workout) \
+                                              .order_by('day_id') \
+                                              .values_list('daysofweek_id', 'day__description')
+        for day_of_week_id, description in workout_days:
+            used_days[day_of_week_id] = description
 
     week_day_result = []
-    for week in DaysOfWeek.objects.all():
+    for week in reference_data.all(DaysOfWeek):
         day_has_workout = False
 
         if week.id in used_days:
@@ -198,3 +216,25 @@ class FeedbackClass(FormView):
         mail.mail_admins(subject, message)
 
         return super(FeedbackClass, self).form_valid(form)
+
+
+def instrumentation_stats(request):
+    """
+    Returns the statistics collected by the instrumentation middleware as JSON,
+    slowest views first. Only available to administrators.
+    """
+    if not request.user.is_staff:
+        return HttpResponseForbidden()
+
+    order_by = request.GET.get('order_by')
+    if order_by not in instrumentation.ORDER_BY:
+        order_by = 'time'
+    try:
+        count = int(request.GET.get('count', 50))
+    except ValueError:
+        count = 50
+
+    views = instrumentation.get_slowest_views(order_by, count)
+    return JsonResponse({'time_buckets': instrumentation.TIME_BUCKETS,
+                         'query_buckets': instrumentation.QUERY_BUCKETS,
+                         'views': [dict(stats, view=name) for name, stats in views]})
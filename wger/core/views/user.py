@@ -14,10 +14,11 @@
 #
 # You should have received a copy of the GNU Affero General Public License
 
+import json
 import logging
 
 from django.shortcuts import render, get_object_or_404
-from django.http import HttpResponseRedirect, HttpResponseForbidden
+from django.http import HttpResponse, HttpResponseRedirect, HttpResponseForbidden
 from django.template.context_processors import csrf
 from django.core.urlresolvers import reverse
 from django.utils.translation import ugettext as _, ugettext_lazy
@@ -50,19 +51,12 @@ from wger.core.forms import (
     RegistrationFormNoCaptcha,
     UserLoginForm)
 from wger.core.models import Language
-from wger.manager.models import (
-    WorkoutLog,
-    WorkoutSession,
-    Workout
-)
-from wger.nutrition.models import NutritionPlan
 from wger.config.models import GymConfig
-from wger.weight.models import WeightEntry
-from wger.gym.models import (
-    AdminUserNote,
-    GymUserConfig,
-    Contract
+from wger.gym.helpers import (
+    get_trainer_summary,
+    get_user_table_data
 )
+from wger.gym.models import GymUserConfig
 
 logger = logging.getLogger(__name__)
 
@@ -477,21 +471,7 @@ class UserDetailView(LoginRequiredMixin, WgerMultiplePermissionRequiredMixin, De
         Send some additional data to the template
         """
         context = super(UserDetailView, self).get_context_data(**kwargs)
-        out = []
-        workouts = Workout.objects.filter(user=self.object).all()
-        for workout in workouts:
-            logs = WorkoutLog.objects.filter(workout=workout)
-            out.append({'workout': workout,
-                        'logs': logs.dates('date', 'day').count(),
-                        'last_log': logs.last()})
-        context['workouts'] = out
-        context['weight_entries'] = WeightEntry.objects.filter(user=self.object)\
-            .order_by('-date')[:5]
-        context['nutrition_plans'] = NutritionPlan.objects.filter(user=self.object)\
-            .order_by('-creation_date')[:5]
-        context['session'] = WorkoutSession.objects.filter(user=self.object).order_by('-date')[:10]
-        context['admin_notes'] = AdminUserNote.objects.filter(member=self.object)[:5]
-        context['contracts'] = Contract.objects.filter(member=self.object)[:5]
+        context.update(get_trainer_summary(self.object))
         return context
 
 
@@ -505,16 +485,9 @@ class UserListView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
 
     def get_queryset(self):
         """
-        Return a list with the users, not really a queryset.
+        The users are loaded page by page by UserListDataView
         """
-        out = {'admins': [],
-               'members': []}
-
-        for u in User.objects.select_related('usercache', 'userprofile__gym').all():
-            out['members'].append({'obj': u,
-                                   'last_log': u.usercache.last_activity})
-
-        return out
+        return User.objects.none()
 
     def get_context_data(self, **kwargs):
         """
@@ -527,5 +500,19 @@ class UserListView(LoginRequiredMixin, PermissionRequiredMixin, ListView):
                                           _('Name'),
                                           _('Last activity'),
                                           _('Gym')],
-                                 'users': context['object_list']['members']}
+                                 'url': reverse('core:user:list-data')}
         return context
+
+
+class UserListDataView(UserListView):
+    """
+    One page of the users in the instance, searched and sorted as requested
+    by the server-side user table
+    """
+
+    def get(self, request, *args, **kwargs):
+        """
+        Return the users as JSON
+        """
+        data = get_user_table_data(User.objects.all(), request.GET, show_gym=True)
+        return HttpResponse(json.dumps(data), 'application/json')
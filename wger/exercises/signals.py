@@ -15,6 +15,7 @@
 # You should have received a copy of the GNU Affero General Public License
 
 
+from django.core.cache import cache
 from django.db.models.signals import pre_save
 from django.db.models.signals import post_delete
 from django.dispatch import receiver
@@ -23,6 +24,7 @@ from easy_thumbnails.signal_handlers import generate_aliases
 from easy_thumbnails.signals import saved_file
 
 from wger.exercises.models import ExerciseImage
+from wger.utils.cache import cache_mapper
 
 
 @receiver(post_delete, sender=ExerciseImage)
@@ -34,6 +36,7 @@ def delete_exercise_image_on_delete(sender, instance, **kwargs):
     thumbnailer = get_thumbnailer(instance.image)
     thumbnailer.delete_thumbnails()
     instance.image.delete(save=False)
+    cache.delete(cache_mapper.get_pdf_image_key(instance))
 
 
 @receiver(pre_save, sender=ExerciseImage)
@@ -55,6 +58,7 @@ def delete_exercise_image_on_update(sender, instance, **kwargs):
         thumbnailer = get_thumbnailer(instance.image)
         thumbnailer.delete_thumbnails()
         instance.image.delete(save=False)
+        cache.delete(cache_mapper.get_pdf_image_key(instance))
 
 
 # Generate thumbnails when uploading a new image
@@ -12,8 +12,12 @@
 #
 # You should have received a copy of the GNU Affero General Public License
 
+import os
+
+from django.core.cache import cache
 from django.core.files import File
 from django.core.urlresolvers import reverse
+from PIL import Image
 
 from wger.core.tests.base_testcase import (
     WorkoutManagerTestCase,
@@ -22,6 +26,9 @@ from wger.core.tests.base_testcase import (
     WorkoutManagerDeleteTestCase
 )
 from wger.exercises.models import Exercise, ExerciseImage
+from wger.manager.models import Setting
+from wger.utils.cache import cache_mapper
+from wger.utils.pdf import get_pdf_image
 
 
 class MainImageTestCase(WorkoutManagerTestCase):
@@ -101,6 +108,56 @@ class MainImageTestCase(WorkoutManagerTestCase):
         self.assertFalse(ExerciseImage.objects.get(pk=pk5).is_main)
 
 
+class PdfImageTestCase(WorkoutManagerTestCase):
+    """
+    Tests the small renditions of the exercise images used in the PDFs
+    """
+
+    def save_image(self, exercise):
+        """
+        Helper function to save an image to an exercise
+        """
+        image = ExerciseImage()
+        image.exercise = exercise
+        image.status = ExerciseImage.STATUS_ACCEPTED
+        image.image.save('protestschwein.jpg',
+                         File(open('wger/exercises/tests/protestschwein.jpg', 'rb')))
+        image.save()
+        return image
+
+    def test_rendition(self):
+        """
+        Test that the rendition is small and its path is cached
+        """
+        image = self.save_image(Exercise.objects.get(pk=2))
+        path = get_pdf_image(image)
+        self.assertNotEqual(path, image.image.path)
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(Image.open(path).size[0], 240)
+        self.assertLess(os.path.getsize(path), os.path.getsize(image.image.path))
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_pdf_image(image), path)
+
+        # Deleting the image also deletes the rendition
+        image.delete()
+        self.assertFalse(os.path.exists(path))
+        self.assertIsNone(cache.get(cache_mapper.get_pdf_image_key(image)))
+
+    def test_workout_pdf(self):
+        """
+        Test that the renditions are used in the workout PDFs
+        """
+        setting = Setting.objects.filter(set__exerciseday__training_id=3).first()
+        image = self.save_image(setting.exercise)
+
+        self.user_login('test')
+        response = self.client.get(reverse('manager:workout:pdf-table',
+                                           kwargs={'id': 3, 'images': 1, 'comments': 0}))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(cache.get(cache_mapper.get_pdf_image_key(image)))
+
+
 class AddExerciseImageTestCase(WorkoutManagerAddTestCase):
     """
     Tests adding an image to an exercise
@@ -20,11 +20,7 @@ from django.core import mail
 
 from django.shortcuts import render, get_object_or_404
 from django.http import HttpResponseRedirect, HttpResponseForbidden
-from django.forms import (
-    ModelForm,
-    ModelChoiceField,
-    ModelMultipleChoiceField
-)
+from django.forms import ModelForm
 from django.core.cache import cache
 from django.core.urlresolvers import reverse, reverse_lazy
 from django.contrib.auth.mixins import PermissionRequiredMixin, LoginRequiredMixin
@@ -52,6 +48,10 @@ from wger.utils.generic_views import (
 )
 from wger.utils.language import load_language, load_item_languages
 from wger.utils.cache import cache_mapper
+from wger.utils.reference_data import (
+    ReferenceChoiceField,
+    ReferenceMultipleChoiceField
+)
 from wger.utils.widgets import (
     TranslatedSelect,
     TranslatedSelectMultiple,
@@ -165,19 +165,22 @@ class ExercisesEditAddView(WgerFormMixin):
         # have we access to the currently used language. In other places Django defaults
         # to 'en-us'.
         class ExerciseForm(ModelForm):
-            category = ModelChoiceField(queryset=ExerciseCategory.objects.all(),
-                                        widget=TranslatedSelect())
-            muscles = ModelMultipleChoiceField(queryset=Muscle.objects.all(),
-                                               widget=TranslatedOriginalSelectMultiple(),
-                                               required=False)
+            category = ReferenceChoiceField(queryset=ExerciseCategory.objects.all(),
+                                            widget=TranslatedSelect())
+            muscles = ReferenceMultipleChoiceField(queryset=Muscle.objects.all(),
+                                                   widget=TranslatedOriginalSelectMultiple(),
+                                                   required=False)
 
-            muscles_secondary = ModelMultipleChoiceField(queryset=Muscle.objects.all(),
-                                                         widget=TranslatedOriginalSelectMultiple(),
-                                                         required=False)
+            muscles_secondary = ReferenceMultipleChoiceField(
+                queryset=Muscle.objects.all(),
+                widget=TranslatedOriginalSelectMultiple(),
+                required=False)
 
             class Meta:
                 model = Exercise
                 widgets = {'equipment': TranslatedSelectMultiple()}
+                field_classes = {'equipment': ReferenceMultipleChoiceField,
+                                 'license': ReferenceChoiceField}
                 fields = ['name_original',
                           'category',
                           'description',
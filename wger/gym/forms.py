@@ -17,8 +17,10 @@
 from django.contrib.auth.models import User
 from django import forms
 from django.utils.translation import ugettext as _
+from django.utils.translation import ugettext_lazy
 
 from wger.core.forms import UserPersonalInformationForm
+from wger.gym.helpers import MEMBER_EXPORT_COLUMNS
 from wger.utils.widgets import BootstrapSelectMultiple
 
 
@@ -90,3 +92,39 @@ class GymUserAddForm(GymUserPermisssionForm, UserPersonalInformationForm):
         except User.DoesNotExist:
             return username
         raise forms.ValidationError(_("A user with that username already exists."))
+
+
+class GymMemberExportForm(forms.Form):
+    """
+    Form used to select the options of the CSV export of the gym members
+    """
+
+    columns = forms.MultipleChoiceField(label=ugettext_lazy('Columns'),
+                                        choices=MEMBER_EXPORT_COLUMNS,
+                                        initial=[i[0] for i in MEMBER_EXPORT_COLUMNS],
+                                        widget=BootstrapSelectMultiple())
+
+    background = forms.BooleanField(required=False,
+                                    label=ugettext_lazy('Prepare in the background'),
+                                    help_text=ugettext_lazy('Recommended for gyms with many '
+                                                            'members. The export is saved and '
+                                                            'you are notified per email when '
+                                                            'it is ready.'))
+
+
+class GymPlansExportForm(forms.Form):
+    """
+    Form used to select the options of the PDF export of the members' plans
+    """
+
+    pdf_type = forms.ChoiceField(label=ugettext_lazy('Type'),
+                                 choices=(('log', ugettext_lazy('Log')),
+                                          ('table', ugettext_lazy('Table'))),
+                                 initial='table',
+                                 widget=forms.RadioSelect())
+
+    images = forms.BooleanField(required=False,
+                                label=ugettext_lazy('with images'))
+
+    comments = forms.BooleanField(required=False,
+                                  label=ugettext_lazy('with comments'))
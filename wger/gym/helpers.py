@@ -14,7 +14,78 @@
 #
 # You should have received a copy of the GNU Affero General Public License
 
-from wger.manager.models import WorkoutLog, WorkoutSession
+import csv
+import datetime
+
+import six
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.urlresolvers import reverse
+from django.core.cache import cache
+from django.db.models import (
+    Count,
+    F,
+    Max,
+    Q
+)
+from django.template.loader import render_to_string
+from django.utils import (
+    formats,
+    translation
+)
+from django.utils.encoding import force_text
+from django.utils.html import format_html
+from django.utils.translation import ugettext as _
+from django.utils.translation import ugettext_lazy
+
+from wger.gym.managers import GYM_ADMIN_PERMISSIONS
+from wger.gym.models import (
+    AdminUserNote,
+    Contract,
+    Gym
+)
+from wger.manager.models import (
+    Workout,
+    WorkoutLog,
+    WorkoutSession
+)
+from wger.nutrition.models import NutritionPlan
+from wger.utils.cache import cache_mapper
+from wger.utils.helpers import EchoBuffer
+from wger.weight.models import WeightEntry
+
+
+MEMBER_EXPORT_COLUMNS = (('id', ugettext_lazy('Nr.')),
+                         ('gym', ugettext_lazy('Gym')),
+                         ('username', ugettext_lazy('Username')),
+                         ('email', ugettext_lazy('Email')),
+                         ('first_name', ugettext_lazy('First name')),
+                         ('last_name', ugettext_lazy('Last name')),
+                         ('gender', ugettext_lazy('Gender')),
+                         ('age', ugettext_lazy('Age')),
+                         ('zip_code', ugettext_lazy('ZIP code')),
+                         ('city', ugettext_lazy('City')),
+                         ('street', ugettext_lazy('Street')),
+                         ('phone', ugettext_lazy('Phone')))
+'''
+Columns available in the CSV export of the gym members
+'''
+
+MEMBER_EXPORT_ADDRESS_COLUMNS = ('zip_code', 'city', 'street', 'phone')
+
+USER_TABLE_ORDERING = (('pk', ),
+                       ('username', ),
+                       ('last_name', 'first_name'),
+                       ('usercache__last_activity', ),
+                       ('userprofile__gym__name', ))
+'''
+Fields used to sort the columns of the user tables, in the order of the columns
+'''
+
+USER_TABLE_MAX_LENGTH = 100
+'''
+Maximum number of users returned for one page of the user tables
+'''
 
 
 def get_user_last_activity(user):
@@ -59,6 +130,104 @@ def is_any_gym_admin(user):
         or user.has_perm('gym.gym_trainer')
 
 
+def filter_gym_permission(queryset, codenames):
+    """
+    Filters a user queryset to the users with any of the given gym permissions
+
+    This is the set-based equivalent of calling user.has_perm('gym.<codename>')
+    on every user: the permission can come from a group, from the user
+    directly or from being a superuser. Inactive users have no permissions.
+
+    :param queryset: a user queryset
+    :param codenames: a list of gym permission codenames
+    :return: the filtered queryset
+    """
+    return queryset.filter(Q(is_superuser=True)
+                           | Q(groups__permissions__content_type__app_label='gym',
+                               groups__permissions__codename__in=codenames)
+                           | Q(user_permissions__content_type__app_label='gym',
+                               user_permissions__codename__in=codenames),
+                           is_active=True).distinct()
+
+
+def get_inactive_members(gym_pk, weeks, today=None):
+    """
+    Collects the inactive members and the trainers to notify for a gym
+
+    Instead of checking the permissions, configuration and cache of each
+    member individually, the roles, configuration flags and last activity
+    are read with a fixed number of queries.
+
+    :param gym_pk: the gym's PK
+    :param weeks: number of weeks without activity to be considered inactive
+    :param today: reference date, defaults to today
+    :return: a tuple with the trainer list, the inactive users and the users
+             without any activity
+    """
+    if today is None:
+        today = datetime.date.today()
+
+    gym_users = User.objects.filter(userprofile__gym_id=gym_pk, is_active=True)
+    admin_ids = filter_gym_permission(gym_users, GYM_ADMIN_PERMISSIONS).values_list('pk')
+
+    trainer_list = filter_gym_permission(gym_users, ('gym_trainer',))\
+        .exclude(email='')\
+        .filter(gymadminconfig__overview_inactive=True)\
+        .select_related('userprofile__notification_language')
+
+    members = gym_users.exclude(pk__in=admin_ids)\
+        .filter(gymuserconfig__include_inactive=True)\
+        .filter(Q(usercache__last_activity__isnull=True)
+                | Q(usercache__last_activity__lt=today - datetime.timedelta(weeks=weeks)))\
+        .annotate(last_activity=F('usercache__last_activity'))\
+        .order_by('pk')
+
+    user_list = []
+    user_list_no_activity = []
+    for user in members:
+        entry = {'user': user, 'last_activity': user.last_activity}
+        if user.last_activity:
+            user_list.append(entry)
+        else:
+            user_list_no_activity.append(entry)
+
+    return list(trainer_list), user_list, user_list_no_activity
+
+
+def get_inactive_members_emails(gym_pk):
+    """
+    Renders the overview emails of inactive members for a gym
+
+    This is a module level function so that it can be used by the worker
+    processes of the inactive-members command.
+
+    :param gym_pk: the gym's PK
+    :return: a tuple with the gym's name and a list of (subject, message,
+             from_email, recipient_list) tuples, as expected by send_mass_mail.
+             The list is None if the reminders are deactivated for the gym.
+    """
+    gym = Gym.objects.select_related('config').get(pk=gym_pk)
+    weeks = gym.config.weeks_inactive
+    if not weeks:
+        return gym.name, None
+
+    trainer_list, user_list, user_list_no_activity = get_inactive_members(gym_pk, weeks)
+    messages = []
+    if not user_list and not user_list_no_activity:
+        return gym.name, messages
+
+    context = {'weeks': weeks,
+               'user_list': user_list,
+               'user_list_no_activity': user_list_no_activity}
+    for trainer in trainer_list:
+        with translation.override(trainer.userprofile.notification_language.short_name):
+            messages.append((_('Reminder of inactive members'),
+                             render_to_string('gym/email_inactive_members.html', context),
+                             settings.WGER_SETTINGS['EMAIL_FROM'],
+                             [trainer.email]))
+    return gym.name, messages
+
+
 def get_permission_list(user):
     """
     Calculate available user permissions
@@ -80,3 +249,176 @@ def get_permission_list(user):
         form_group_permission.append('manager')
 
     return form_group_permission
+
+
+def get_member_export_rows(gym, columns, chunk_size=500):
+    """
+    Generator with the rows of the CSV export of the gym members
+
+    The members are read in chunks, with their profiles joined and the
+    addresses of all members in a chunk read with a single query.
+
+    :param gym: the gym to export
+    :param columns: list with the keys of the columns to export, see
+                    MEMBER_EXPORT_COLUMNS
+    :param chunk_size: number of members read per query
+    """
+    def encode(value):
+        # Python 2's csv module can't handle unicode
+        if six.PY2 and isinstance(value, six.text_type):
+            return value.encode('utf8')
+        return value
+
+    labels = dict(MEMBER_EXPORT_COLUMNS)
+    yield [encode(force_text(labels[column])) for column in columns]
+
+    load_address = any(column in MEMBER_EXPORT_ADDRESS_COLUMNS for column in columns)
+    members = Gym.objects.get_members(gym.pk).select_related('userprofile').order_by('pk')
+    last_pk = 0
+    while True:
+        chunk = list(members.filter(pk__gt=last_pk)[:chunk_size])
+        if not chunk:
+            break
+        last_pk = chunk[-1].pk
+
+        # Same contract as used in UserProfile.address
+        addresses = {}
+        if load_address:
+            contracts = Contract.objects.filter(member_id__in=[user.pk for user in chunk])\
+                .order_by('member_id', 'date_start')\
+                .values('member_id', *MEMBER_EXPORT_ADDRESS_COLUMNS)
+            for contract in contracts:
+                addresses.setdefault(contract['member_id'], contract)
+
+        for user in chunk:
+            row = {'id': user.id,
+                   'gym': gym.name,
+                   'username': user.username,
+                   'email': user.email,
+                   'first_name': user.first_name,
+                   'last_name': user.last_name,
+                   'gender': force_text(user.userprofile.get_gender_display()),
+                   'age': user.userprofile.age}
+            address = addresses.get(user.pk, {})
+            for column in MEMBER_EXPORT_ADDRESS_COLUMNS:
+                row[column] = address.get(column) or ''
+            yield [encode(row[column]) for column in columns]
+
+
+def get_member_export_csv(gym, columns):
+    """
+    Generator with the lines of the CSV export of the gym members
+    """
+    writer = csv.writer(EchoBuffer(), delimiter='\t', quoting=csv.QUOTE_ALL)
+    for row in get_member_export_rows(gym, columns):
+        yield writer.writerow(row)
+
+
+def get_user_table_data(queryset, params, show_gym=False):
+    """
+    Returns one page of the users in the queryset, in the format expected by the
+    server-side processing mode of DataTables.
+
+    Searching, sorting and paginating is done in the database, so only the
+    users actually shown are loaded. The sorting by name and last activity
+    uses indexes, the search looks for the text anywhere in the fields and
+    scans the table.
+
+    :param queryset: the users to show
+    :param params: the request's GET parameters
+    :param show_gym: whether to include the column with the user's gym
+    :return: a dictionary, ready to be serialized as JSON
+    """
+    try:
+        draw = int(params.get('draw', 0))
+        start = max(int(params.get('start', 0)), 0)
+        length = int(params.get('length', USER_TABLE_MAX_LENGTH))
+        column = int(params.get('order[0][column]', 0))
+    except ValueError:
+        draw, start, length, column = 0, 0, USER_TABLE_MAX_LENGTH, 0
+    if not 0 < length <= USER_TABLE_MAX_LENGTH:
+        length = USER_TABLE_MAX_LENGTH
+    column_count = len(USER_TABLE_ORDERING) if show_gym else len(USER_TABLE_ORDERING) - 1
+    if not 0 <= column < column_count:
+        column = 0
+
+    records_total = queryset.count()
+    records_filtered = records_total
+
+    search = params.get('search[value]', '').strip()
+    if search:
+        queryset = queryset.filter(Q(username__icontains=search)
+                                   | Q(email__icontains=search)
+                                   | Q(first_name__icontains=search)
+                                   | Q(last_name__icontains=search))
+        records_filtered = queryset.count()
+
+    prefix = '-' if params.get('order[0][dir]') == 'desc' else ''
+    ordering = ['{0}{1}'.format(prefix, field) for field in USER_TABLE_ORDERING[column]]
+    if column:
+        ordering.append('pk')
+
+    related = ['usercache', 'userprofile__gym'] if show_gym else ['usercache']
+    data = []
+    for user in queryset.select_related(*related).order_by(*ordering)[start:start + length]:
+        last_activity = user.usercache.last_activity
+        row = [user.pk,
+               format_html('<a href="{0}">{1}</a>',
+                           reverse('core:user:overview', kwargs={'pk': user.pk}),
+                           user),
+               format_html('{0}', user.get_full_name()),
+               formats.date_format(last_activity) if last_activity else '-/-']
+        if show_gym:
+            gym = user.userprofile.gym
+            row.append(format_html('<a href="{0}">{1}</a>', gym.get_absolute_url(), gym)
+                       if gym else '-/-')
+        data.append(row)
+
+    return {'draw': draw,
+            'recordsTotal': records_total,
+            'recordsFiltered': records_filtered,
+            'data': data}
+
+
+def get_trainer_summary(member):
+    """
+    Returns the overview of a member's activity shown to trainers
+
+    The number of logged days and the last log of every workout are calculated
+    with a single grouped query. The result is cached and reset by signals when
+    the member's workouts, logs, sessions, weight entries, nutrition plans,
+    notes or contracts change.
+
+    :param member: the user
+    :return: a dictionary with the workouts, weight entries, nutrition plans,
+             sessions, admin notes and contracts of the member
+    """
+    summary = cache.get(cache_mapper.get_trainer_summary(member))
+    if summary is not None:
+        return summary
+
+    log_stats = {}
+    for stats in WorkoutLog.objects.filter(workout__user=member) \
+            .order_by() \
+            .values('workout_id') \
+            .annotate(days=Count('date', distinct=True), last_log=Max('date')):
+        log_stats[stats['workout_id']] = stats
+
+    workouts = []
+    for workout in Workout.objects.filter(user=member):
+        stats = log_stats.get(workout.pk, {})
+        workouts.append({'workout': workout,
+                         'logs': stats.get('days', 0),
+                         'last_log': stats.get('last_log')})
+
+    summary = {'workouts': workouts,
+               'weight_entries': list(WeightEntry.objects.filter(user=member)
+                                                         .order_by('-date')[:5]),
+               'nutrition_plans': list(NutritionPlan.objects.filter(user=member)
+                                                            .order_by('-creation_date')[:5]),
+               'session': list(WorkoutSession.objects.filter(user=member)
+                                                     .order_by('-date')[:10]),
+               'admin_notes': list(AdminUserNote.objects.filter(member=member)[:5]),
+               'contracts': list(Contract.objects.filter(member=member)[:5])}
+    cache.set(cache_mapper.get_trainer_summary(member), summary)
+    return summary
@@ -14,17 +14,14 @@
 #
 # You should have received a copy of the GNU Affero General Public License
 
-import datetime
+import multiprocessing
+from optparse import make_option
 
 from django.core import mail
-from django.utils import translation
-from django.utils.translation import ugettext as _
 from django.core.management.base import BaseCommand
-from django.template.loader import render_to_string
-from django.conf import settings
+from django.db import connections
 
-from wger.gym.helpers import is_any_gym_admin
-from wger.gym.helpers import get_user_last_activity
+from wger.gym.helpers import get_inactive_members_emails
 from wger.gym.models import Gym
 
 
@@ -32,75 +29,48 @@ class Command(BaseCommand):
     """
     Sends overviews of inactive users to gym trainers
     """
+
+    option_list = BaseCommand.option_list + (
+        make_option('--processes',
+                    action='store',
+                    type='int',
+                    dest='processes',
+                    default=1,
+                    help='Number of worker processes used to process the gyms. '
+                         'Default: 1 (process in this process)'),
+    )
+
     help = 'Send out emails to trainers with users that have not shown recent activity'
 
     def handle(self, **options):
         """
         Process gyms and send emails
         """
-
-        today = datetime.date.today()
-
-        for gym in Gym.objects.all():
+        gym_list = list(Gym.objects.values_list('pk', flat=True))
+
+        if options['processes'] > 1 and len(gym_list) > 1:
+            # The workers open their own database connections
+            connections.close_all()
+            pool = multiprocessing.Pool(options['processes'])
+            results = pool.imap_unordered(get_inactive_members_emails, gym_list)
+        else:
+            pool = None
+            results = (get_inactive_members_emails(gym_pk) for gym_pk in gym_list)
+
+        email_list = []
+        for gym_name, messages in results:
             if int(options['verbosity']) >= 2:
-                self.stdout.write("* Processing gym '{}' ".format(gym))
+                self.stdout.write("* Processing gym '{}' ".format(gym_name))
 
-            user_list = []
-            trainer_list = []
-            user_list_no_activity = []
-            weeks = gym.config.weeks_inactive
-
-            if not weeks:
+            if messages is None:
                 if int(options['verbosity']) >= 2:
-                    self.stdout.write("  Reminders deactivatd, skipping")
+                    self.stdout.write("  Reminders deactivated, skipping")
                 continue
+            email_list.extend(messages)
 
-            for profile in gym.userprofile_set.all():
-                user = profile.user
-
-                # check if the account was deactivated (user can't login)
-                if not user.is_active:
-                    continue
-
-                # add to trainer list that will be notified
-                if user.has_perm('gym.gym_trainer'):
-                    trainer_list.append(user)
-
-                # Check appropriate permissions
-                if is_any_gym_admin(user):
-                    continue
-
-                # Check user preferences
-                if not user.gymuserconfig.include_inactive:
-                    continue
-
-                last_activity = user.usercache.last_activity
-                if not last_activity:
-                    user_list_no_activity.append({'user': user, 'last_activity': last_activity})
-                elif today - last_activity > datetime.timedelta(weeks=weeks):
-                    user_list.append({'user': user, 'last_activity': last_activity})
-
-            if user_list or user_list_no_activity:
-                for trainer in trainer_list:
-
-                    # Profile might not have email
-                    if not trainer.email:
-                        continue
-
-                    # Check trainer preferences
-                    if not trainer.gymadminconfig.overview_inactive:
-                        continue
+        if pool:
+            pool.close()
+            pool.join()
 
-                    translation.activate(trainer.userprofile.notification_language.short_name)
-                    subject = _('Reminder of inactive members')
-                    context = {
-                        'weeks': weeks,
-                        'user_list': user_list,
-                        'user_list_no_activity': user_list_no_activity
-                    }
-                    message = render_to_string('gym/email_inactive_members.html', context)
-                    mail.send_mail(subject,
-                                   message,
-                                   settings.WGER_SETTINGS['EMAIL_FROM'],
-                                   [trainer.email],
-                                   fail_silently=True)
+        # Send all emails over the same connection
+        mail.send_mass_mail(email_list, fail_silently=True)
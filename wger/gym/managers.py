@@ -15,11 +15,16 @@
 # You should have received a copy of the GNU Affero General Public License
 
 from django.db import models
-from django.db.models import Q
-from django.contrib.auth.models import (
-    Permission,
-    User
-)
+from django.core.cache import cache
+from django.contrib.auth.models import User
+
+from wger.utils.cache import cache_mapper
+
+
+GYM_ADMIN_PERMISSIONS = ('manage_gym', 'manage_gyms', 'gym_trainer')
+'''
+Codenames of the permissions that make a user an administrator of a gym
+'''
 
 
 class GymManager(models.Manager):
@@ -27,28 +32,33 @@ class GymManager(models.Manager):
     Custom query manager for Gyms
     """
 
+    def get_admin_ids(self, gym_pk):
+        """
+        Returns a set with the IDs of the admins of this gym
+
+        The set is cached and reset by signals when the group memberships or
+        the gym of a user change, so it can be used to check in constant time
+        whether a user is an administrator of the gym.
+        """
+        admin_ids = cache.get(cache_mapper.get_gym_admin_ids(gym_pk))
+        if admin_ids is None:
+            users = User.objects.filter(userprofile__gym_id=gym_pk,
+                                        groups__permissions__content_type__app_label='gym',
+                                        groups__permissions__codename__in=GYM_ADMIN_PERMISSIONS)
+            admin_ids = frozenset(users.values_list('pk', flat=True))
+            cache.set(cache_mapper.get_gym_admin_ids(gym_pk), admin_ids)
+        return admin_ids
+
     def get_members(self, gym_pk):
         """
         Returns all members for this gym (i.e non-admin ones)
         """
-        perm_gym = Permission.objects.get(codename='manage_gym')
-        perm_gyms = Permission.objects.get(codename='manage_gyms')
-        perm_trainer = Permission.objects.get(codename='gym_trainer')
-
         users = User.objects.filter(userprofile__gym_id=gym_pk)
-        return users.exclude(Q(groups__permissions=perm_gym) |
-                             Q(groups__permissions=perm_gyms) |
-                             Q(groups__permissions=perm_trainer)).distinct()
+        return users.exclude(pk__in=self.get_admin_ids(gym_pk))
 
     def get_admins(self, gym_pk):
         """
         Returns all admins for this gym (i.e trainers, managers, etc.)
         """
-        perm_gym = Permission.objects.get(codename='manage_gym')
-        perm_gyms = Permission.objects.get(codename='manage_gyms')
-        perm_trainer = Permission.objects.get(codename='gym_trainer')
-
         users = User.objects.filter(userprofile__gym_id=gym_pk)
-        return users.filter(Q(groups__permissions=perm_gym) |
-                            Q(groups__permissions=perm_gyms) |
-                            Q(groups__permissions=perm_trainer)).distinct()
+        return users.filter(pk__in=self.get_admin_ids(gym_pk))
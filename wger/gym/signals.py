@@ -15,14 +15,37 @@
 # You should have received a copy of the GNU Affero General Public License
 
 
-from django.db.models.signals import post_save, post_delete
+from django.contrib.auth.models import (
+    Group,
+    User
+)
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_save
+)
 from django.dispatch import receiver
 
+from wger.core.models import UserProfile
 from wger.gym.models import (
+    AdminUserNote,
+    Contract,
     Gym,
     GymConfig,
     UserDocument
 )
+from wger.manager.models import (
+    Workout,
+    WorkoutLog,
+    WorkoutSession
+)
+from wger.nutrition.models import NutritionPlan
+from wger.utils.cache import (
+    reset_gym_admin_ids,
+    reset_trainer_summary
+)
+from wger.weight.models import WeightEntry
 
 
 @receiver(post_save, sender=Gym)
@@ -45,3 +68,94 @@ def delete_user_document_on_delete(sender, instance, **kwargs):
     """
 
     instance.document.delete(save=False)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def reset_admin_ids_group_membership(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Resets the cached gym administrators when the groups of a user change
+    """
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    # Groups of a user were changed
+    if not reverse:
+        reset_gym_admin_ids(UserProfile.objects.filter(user=instance)
+                                               .values_list('gym_id', flat=True)
+                                               .first())
+
+    # Users of a group were changed, if the group was cleared we don't know
+    # which users were affected anymore
+    elif pk_set is not None:
+        reset_gym_admin_ids(*UserProfile.objects.filter(user_id__in=pk_set)
+                                                .values_list('gym_id', flat=True)
+                                                .distinct())
+    else:
+        reset_gym_admin_ids(*Gym.objects.values_list('pk', flat=True))
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def reset_admin_ids_group_permissions(sender, action, **kwargs):
+    """
+    Resets the cached gym administrators when the permissions of a group change
+    """
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        reset_gym_admin_ids(*Gym.objects.values_list('pk', flat=True))
+
+
+@receiver(pre_save, sender=UserProfile)
+def reset_admin_ids_gym_change(sender, instance, **kwargs):
+    """
+    Resets the cached gym administrators when a user changes gyms
+    """
+    if kwargs['raw']:
+        return
+
+    gym_pks = set([instance.gym_id])
+    if instance.pk:
+        gym_pks.update(UserProfile.objects.filter(pk=instance.pk)
+                                          .values_list('gym_id', flat=True))
+    if len(gym_pks) > 1 or not instance.pk:
+        reset_gym_admin_ids(*gym_pks)
+
+
+@receiver(post_delete, sender=UserProfile)
+def reset_admin_ids_profile_delete(sender, instance, **kwargs):
+    """
+    Resets the cached gym administrators when a user is deleted
+    """
+    reset_gym_admin_ids(instance.gym_id)
+
+
+def reset_trainer_summary_user(sender, instance, **kwargs):
+    """
+    Resets the cached overview of a member shown to trainers when one of
+    their workouts, logs, sessions, weight entries or nutrition plans changes
+    """
+    if not kwargs.get('raw'):
+        reset_trainer_summary(instance.user_id)
+
+
+def reset_trainer_summary_member(sender, instance, **kwargs):
+    """
+    Resets the cached overview of a member shown to trainers when one of
+    their admin notes or contracts changes
+    """
+    if not kwargs.get('raw'):
+        reset_trainer_summary(instance.member_id)
+
+
+post_save.connect(reset_trainer_summary_user, sender=Workout)
+post_save.connect(reset_trainer_summary_user, sender=WorkoutLog)
+post_save.connect(reset_trainer_summary_user, sender=WorkoutSession)
+post_save.connect(reset_trainer_summary_user, sender=WeightEntry)
+post_save.connect(reset_trainer_summary_user, sender=NutritionPlan)
+post_save.connect(reset_trainer_summary_member, sender=AdminUserNote)
+post_save.connect(reset_trainer_summary_member, sender=Contract)
+post_delete.connect(reset_trainer_summary_user, sender=Workout)
+post_delete.connect(reset_trainer_summary_user, sender=WorkoutLog)
+post_delete.connect(reset_trainer_summary_user, sender=WorkoutSession)
+post_delete.connect(reset_trainer_summary_user, sender=WeightEntry)
+post_delete.connect(reset_trainer_summary_user, sender=NutritionPlan)
+post_delete.connect(reset_trainer_summary_member, sender=AdminUserNote)
+post_delete.connect(reset_trainer_summary_member, sender=Contract)
@@ -14,8 +14,11 @@
 
 import datetime
 
+from django.core import mail
 from django.core.urlresolvers import reverse
 
+from wger.core.export import process_export_jobs
+from wger.core.models import ExportJob
 from wger.core.tests.base_testcase import WorkoutManagerTestCase
 from wger.gym.models import Gym
 
@@ -43,8 +46,9 @@ class GymMembersCsvExportTestCase(WorkoutManagerTestCase):
                 format(t=today, gym=gym.id)
             self.assertEqual(response['Content-Disposition'],
                              'attachment; filename={0}'.format(filename))
-            self.assertGreaterEqual(len(response.content), 1000)
-            self.assertLessEqual(len(response.content), 1300)
+            content = b''.join(response.streaming_content)
+            self.assertGreaterEqual(len(content), 1000)
+            self.assertLessEqual(len(content), 1300)
 
     def test_export_csv_authorized(self):
         """
@@ -77,3 +81,73 @@ class GymMembersCsvExportTestCase(WorkoutManagerTestCase):
         """
         self.user_logout()
         self.export_csv(fail=True)
+
+    def test_export_csv_columns(self):
+        """
+        Test the CSV export with selected columns
+        """
+        self.user_login('manager1')
+        response = self.client.get(reverse('gym:export:users', kwargs={'gym_pk': 1}),
+                                   {'columns': ['username', 'city', 'foo']})
+        self.assertEqual(response.status_code, 200)
+
+        lines = b''.join(response.streaming_content).decode('utf8').splitlines()
+        self.assertEqual(lines[0], '"Username"\t"City"')
+        self.assertIn('"member2"\t"The City"', lines)
+        self.assertEqual(len(lines), 11)
+
+    def test_export_options(self):
+        """
+        Test the export options form
+        """
+        self.user_login('manager1')
+        response = self.client.get(reverse('gym:export:users-options', kwargs={'gym_pk': 1}))
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.post(reverse('gym:export:users-options', kwargs={'gym_pk': 1}),
+                                    {'columns': ['username', 'email']})
+        self.assertEqual(response.status_code, 302)
+        self.assertIn('columns=username&columns=email', response['Location'])
+
+        self.user_login('member1')
+        response = self.client.get(reverse('gym:export:users-options', kwargs={'gym_pk': 1}))
+        self.assertEqual(response.status_code, 403)
+
+    def test_prepare_export(self):
+        """
+        Test preparing the CSV export in the background
+        """
+        self.user_login('manager1')
+        response = self.client.post(reverse('gym:export:users-options', kwargs={'gym_pk': 1}),
+                                    {'columns': ['id', 'username'], 'background': 'on'})
+        job = ExportJob.objects.get()
+        self.assertRedirects(response, job.get_absolute_url())
+        self.assertEqual(job.kind, ExportJob.KIND_GYM_MEMBERS)
+        self.assertEqual(job.columns, 'id,username')
+
+        process_export_jobs()
+        job = ExportJob.objects.get()
+        self.assertEqual(job.status, ExportJob.STATUS_DONE)
+
+        # The email only links to the download view, the file is not public
+        download_url = reverse('core:export:download', kwargs={'pk': job.pk})
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, [job.user.email])
+        self.assertIn('http://testserver{0}'.format(download_url), mail.outbox[0].body)
+
+        response = self.client.get(download_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        lines = b''.join(response.streaming_content).decode('utf8').splitlines()
+        self.assertEqual(lines[0], '"Nr."\t"Username"')
+        self.assertEqual(len(lines), 11)
+
+        # Only the administrator that requested it, while still allowed to export
+        self.user_login('manager3')
+        self.assertEqual(self.client.get(download_url).status_code, 404)
+
+        self.user_login('manager1')
+        profile = job.user.userprofile
+        profile.gym_id = 2
+        profile.save()
+        self.assertEqual(self.client.get(download_url).status_code, 403)
@@ -12,7 +12,13 @@
 #
 # You should have received a copy of the GNU Affero General Public License
 # along with Workout Manager.  If not, see <http://www.gnu.org/licenses/>.
-from django.core.urlresolvers import reverse_lazy
+from django.contrib.auth.models import (
+    Group,
+    User
+)
+import json
+
+from django.core.urlresolvers import reverse, reverse_lazy
 
 from wger.core.models import UserProfile
 from wger.core.tests.base_testcase import WorkoutManagerAccessTestCase
@@ -71,6 +77,81 @@ class GymUserOverviewTest(WorkoutManagerAccessTestCase):
                  'manager3')
 
 
+class GymUserListDataAccessTest(WorkoutManagerAccessTestCase):
+    """
+    Tests accessing the data of the gym member table
+    """
+    url = reverse_lazy('gym:gym:user-list-data', kwargs={'pk': 1})
+    anonymous_fail = True
+    user_success = ('admin',
+                    'trainer2',
+                    'manager1',
+                    'general_manager1')
+    user_fail = ('member1',
+                 'trainer4',
+                 'manager3')
+
+
+class GymUserListDataTestCase(WorkoutManagerTestCase):
+    """
+    Tests the data of the server-side gym member table
+    """
+
+    def get_data(self, **params):
+        """
+        Helper function that returns the decoded table data
+        """
+        response = self.client.get(reverse('gym:gym:user-list-data', kwargs={'pk': 1}), params)
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content.decode('utf8'))
+
+    def test_pagination(self):
+        """
+        Test that only the requested page is returned
+        """
+        self.user_login('manager1')
+        data = self.get_data(draw=3, start=0, length=4)
+        self.assertEqual(data['draw'], 3)
+        self.assertEqual(data['recordsTotal'], 10)
+        self.assertEqual(data['recordsFiltered'], 10)
+        self.assertEqual([row[0] for row in data['data']], [2, 14, 15, 16])
+
+        data = self.get_data(start=8, length=4)
+        self.assertEqual(len(data['data']), 2)
+
+    def test_sorting(self):
+        """
+        Test sorting by username, descending
+        """
+        self.user_login('manager1')
+        data = self.get_data(length=10, **{'order[0][column]': 1, 'order[0][dir]': 'desc'})
+        usernames = [User.objects.get(pk=row[0]).username for row in data['data']]
+        self.assertEqual(usernames, sorted(usernames, reverse=True))
+
+    def test_search(self):
+        """
+        Test searching by username, email and name
+        """
+        self.user_login('manager1')
+        data = self.get_data(**{'search[value]': 'MEMBER2'})
+        self.assertEqual(data['recordsTotal'], 10)
+        self.assertEqual(data['recordsFiltered'], 1)
+        self.assertIn('member2', data['data'][0][1])
+
+        data = self.get_data(**{'search[value]': 'no-such-user'})
+        self.assertEqual(data['recordsFiltered'], 0)
+        self.assertEqual(data['data'], [])
+
+    def test_invalid_parameters(self):
+        """
+        Test that invalid parameters fall back to the defaults
+        """
+        self.user_login('manager1')
+        data = self.get_data(start='foo', length=100000, **{'order[0][column]': 4})
+        self.assertEqual(data['recordsTotal'], 10)
+        self.assertEqual(len(data['data']), 10)
+
+
 class AddGymTestCase(WorkoutManagerAddTestCase):
     """
     Tests adding a new gym
@@ -146,3 +227,57 @@ class GymTestCase(WorkoutManagerTestCase):
 
         gym.delete()
         self.assertEqual(UserProfile.objects.filter(gym=gym).count(), 0)
+
+
+class GymAdminIdsTestCase(WorkoutManagerTestCase):
+    """
+    Tests the cached index of gym administrators
+    """
+
+    def test_admin_ids(self):
+        """
+        Test that the admin IDs are correctly calculated and cached
+        """
+        admin_ids = Gym.objects.get_admin_ids(1)
+        self.assertIn(4, admin_ids)
+        self.assertIn(9, admin_ids)
+        self.assertNotIn(14, admin_ids)
+        self.assertNotIn(7, admin_ids)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(Gym.objects.get_admin_ids(1), admin_ids)
+
+        with self.assertNumQueries(1):
+            members = list(Gym.objects.get_members(1))
+        self.assertIn(User.objects.get(pk=14), members)
+        self.assertNotIn(User.objects.get(pk=4), members)
+
+    def test_reset_group_membership(self):
+        """
+        Test that changing the groups of a user resets the index
+        """
+        Gym.objects.get_admin_ids(1)
+
+        user = User.objects.get(pk=14)
+        user.groups.add(Group.objects.get(name='gym_trainer'))
+        self.assertIn(14, Gym.objects.get_admin_ids(1))
+        self.assertIn(user, Gym.objects.get_admins(1))
+
+        user.groups.remove(Group.objects.get(name='gym_trainer'))
+        self.assertNotIn(14, Gym.objects.get_admin_ids(1))
+
+        Group.objects.get(name='gym_manager').user_set.add(user)
+        self.assertIn(14, Gym.objects.get_admin_ids(1))
+
+    def test_reset_gym_change(self):
+        """
+        Test that changing the gym of a user resets the index
+        """
+        Gym.objects.get_admin_ids(1)
+        Gym.objects.get_admin_ids(2)
+
+        profile = User.objects.get(pk=4).userprofile
+        profile.gym_id = 2
+        profile.save()
+        self.assertNotIn(4, Gym.objects.get_admin_ids(1))
+        self.assertIn(4, Gym.objects.get_admin_ids(2))
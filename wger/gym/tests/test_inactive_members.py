@@ -14,8 +14,13 @@
 
 from django.core import mail
 from django.core.management import call_command
+from django.test import TransactionTestCase
 
-from wger.core.tests.base_testcase import WorkoutManagerTestCase
+from wger.core.tests.base_testcase import (
+    BaseTestCase,
+    WorkoutManagerTestCase
+)
+from wger.gym.helpers import get_inactive_members_emails
 
 
 class EmailInactiveUserTestCase(WorkoutManagerTestCase):
@@ -41,3 +46,29 @@ class EmailInactiveUserTestCase(WorkoutManagerTestCase):
         trainer_list.sort()
 
         self.assertEqual(recipment_list.sort(), trainer_list.sort())
+
+    def test_reminder_number_queries(self):
+        """
+        Test that the number of queries per gym does not depend on the members
+        """
+
+        with self.assertNumQueries(3):
+            gym_name, messages = get_inactive_members_emails(1)
+        self.assertEqual(len(messages), 4)
+
+
+class EmailInactiveUserParallelTestCase(BaseTestCase, TransactionTestCase):
+    """
+    Test email reminders for inactive users, processing the gyms in parallel
+
+    The worker processes open their own database connections, so the data
+    must be committed, not only visible in the transaction of a TestCase.
+    """
+
+    def test_reminder_parallel(self):
+        """
+        Test email reminders for inactive users, processing gyms in parallel
+        """
+
+        call_command('inactive-members', processes=2)
+        self.assertEqual(len(mail.outbox), 6)
@@ -0,0 +1,89 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+import datetime
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.urlresolvers import reverse
+
+from wger.core.tests.base_testcase import WorkoutManagerTestCase
+from wger.gym.helpers import get_trainer_summary
+from wger.gym.models import AdminUserNote
+from wger.manager.models import (
+    Workout,
+    WorkoutLog
+)
+from wger.utils.cache import cache_mapper
+from wger.weight.models import WeightEntry
+
+
+class TrainerSummaryTestCase(WorkoutManagerTestCase):
+    """
+    Test the cached overview of a member shown to trainers
+    """
+
+    def test_workout_logs(self):
+        """
+        Test the number of logged days and the last log of the workouts
+        """
+        user = User.objects.get(pk=1)
+        summary = get_trainer_summary(user)
+
+        self.assertEqual(len(summary['workouts']), Workout.objects.filter(user=user).count())
+        for entry in summary['workouts']:
+            logs = WorkoutLog.objects.filter(workout=entry['workout'])
+            last_log = logs.last()
+            self.assertEqual(entry['logs'], logs.dates('date', 'day').count())
+            self.assertEqual(entry['last_log'], last_log.date if last_log else None)
+
+    def test_cache(self):
+        """
+        Test that the summary is cached
+        """
+        user = User.objects.get(pk=2)
+        self.assertFalse(cache.get(cache_mapper.get_trainer_summary(user)))
+        with self.assertNumQueries(7):
+            get_trainer_summary(user)
+        self.assertTrue(cache.get(cache_mapper.get_trainer_summary(user)))
+        with self.assertNumQueries(0):
+            get_trainer_summary(user)
+
+    def test_cache_reset(self):
+        """
+        Test that the cached summary is reset when the member's data changes
+        """
+        user = User.objects.get(pk=2)
+        get_trainer_summary(user)
+        entry = WeightEntry.objects.create(user=user, weight=80, date=datetime.date(2016, 1, 1))
+        self.assertFalse(cache.get(cache_mapper.get_trainer_summary(user)))
+
+        get_trainer_summary(user)
+        entry.delete()
+        self.assertFalse(cache.get(cache_mapper.get_trainer_summary(user)))
+
+        get_trainer_summary(user)
+        AdminUserNote.objects.create(user_id=9, member=user, note='Note')
+        self.assertFalse(cache.get(cache_mapper.get_trainer_summary(user)))
+
+    def test_detail_page(self):
+        """
+        Test that the detail page uses the summary
+        """
+        self.user_login('trainer1')
+        response = self.client.get(reverse('core:user:overview', kwargs={'pk': 2}))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(cache.get(cache_mapper.get_trainer_summary(2)))
+        self.assertEqual(len(response.context['workouts']),
+                         Workout.objects.filter(user_id=2).count())
@@ -48,6 +48,9 @@ patterns_gym = [
     url(r'^(?P<pk>\d+)/members$',
         gym.GymUserListView.as_view(),
         name='user-list'),
+    url(r'^(?P<pk>\d+)/members/data$',
+        gym.GymUserListDataView.as_view(),
+        name='user-list-data'),
     url(r'^(?P<gym_pk>\d+)/add-member$',
         gym.GymAddUserView.as_view(),
         name='add-user'),
@@ -175,6 +178,12 @@ patterns_export = [
     url(r'^users/(?P<gym_pk>\d+)$',
         export.users,
         name='users'),
+    url(r'^users/(?P<gym_pk>\d+)/options$',
+        export.users_options,
+        name='users-options'),
+    url(r'^plans/(?P<gym_pk>\d+)$',
+        export.plans,
+        name='plans'),
 ]
 
 #
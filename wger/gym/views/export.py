@@ -14,77 +14,163 @@
 #
 # You should have received a copy of the GNU Affero General Public License
 
-import six
-import csv
 import datetime
 import logging
 
 from django.contrib.auth.decorators import login_required
+from django.core.urlresolvers import reverse
 from django.http.response import (
     HttpResponseForbidden,
-    HttpResponse
+    HttpResponseRedirect,
+    StreamingHttpResponse
 )
-from django.shortcuts import get_object_or_404
+from django.shortcuts import (
+    get_object_or_404,
+    render
+)
+from django.template.context_processors import csrf
+from django.utils import translation
+from django.utils.http import urlencode
 from django.utils.translation import ugettext as _
 
+from wger.core.export import (
+    get_export_options,
+    queue_export_job
+)
+from wger.core.models import ExportJob
+from wger.gym.forms import (
+    GymMemberExportForm,
+    GymPlansExportForm
+)
+from wger.gym.helpers import (
+    MEMBER_EXPORT_COLUMNS,
+    get_member_export_csv
+)
 from wger.gym.models import Gym
 
 logger = logging.getLogger(__name__)
 
 
+def check_export_permissions(user, gym):
+    """
+    Checks that the user can export the members of the gym
+    """
+    if not user.has_perm('gym.manage_gyms') and not user.has_perm('gym.manage_gym'):
+        return False
+
+    if user.has_perm('gym.manage_gym') and user.userprofile.gym != gym:
+        return False
+
+    return True
+
+
 @login_required
 def users(request, gym_pk):
     """
     Exports all members in selected gym
+
+    The columns can be selected with (repeated) 'columns' GET parameters,
+    by default all are exported.
     """
     gym = get_object_or_404(Gym, pk=gym_pk)
 
-    if not request.user.has_perm('gym.manage_gyms') \
-            and not request.user.has_perm('gym.manage_gym'):
+    if not check_export_permissions(request.user, gym):
         return HttpResponseForbidden()
 
-    if request.user.has_perm('gym.manage_gym') \
-            and request.user.userprofile.gym != gym:
-        return HttpResponseForbidden()
+    columns = [column for column, label in MEMBER_EXPORT_COLUMNS
+               if column in request.GET.getlist('columns')]
+    if not columns:
+        columns = [column for column, label in MEMBER_EXPORT_COLUMNS]
+
+    # The rows are generated while the response is being sent
+    def content(language):
+        with translation.override(language):
+            for line in get_member_export_csv(gym, columns):
+                yield line
 
-    # Create CSV 'file'
-    response = HttpResponse(content_type='text/csv')
-    writer = csv.writer(response, delimiter='\t', quoting=csv.QUOTE_ALL)
-
-    # Python3: the .encode() is only needed for python 2.7. Should this requirement
-    #          be dropped once, they can be removed.
-    writer.writerow([_('Nr.'),
-                     _('Gym').encode('utf8'),
-                     _('Username').encode('utf8'),
-                     _('Email').encode('utf8'),
-                     _('First name').encode('utf8'),
-                     _('Last name').encode('utf8'),
-                     _('Gender').encode('utf8'),
-                     _('Age').encode('utf8'),
-                     _('ZIP code').encode('utf8'),
-                     _('City').encode('utf8'),
-                     _('Street').encode('utf8'),
-                     _('Phone').encode('utf8')])
-    for user in Gym.objects.get_members(gym_pk):
-        address = user.userprofile.address
-        writer.writerow([user.id,
-                         gym.name.encode('utf8'),
-                         user.username,
-                         user.email,
-                         user.first_name.encode('utf8'),
-                         user.last_name.encode('utf8'),
-                         user.userprofile.get_gender_display().encode('utf8'),
-                         user.userprofile.age,
-                         address['zip_code'],
-                         address['city'].encode('utf8'),
-                         address['street'].encode('utf8'),
-                         address['phone'].encode('utf8')
-                         ])
+    response = StreamingHttpResponse(content(translation.get_language()),
+                                     content_type='text/csv')
 
     # Send the data to the browser
     today = datetime.date.today()
     filename = 'User-data-gym-{gym}-{t.year}-{t.month:02d}-{t.day:02d}.csv'.format(t=today,
                                                                                    gym=gym.id)
     response['Content-Disposition'] = 'attachment; filename={0}'.format(filename)
-    response['Content-Length'] = len(response.content)
     return response
+
+
+@login_required
+def users_options(request, gym_pk):
+    """
+    Select the options for the export of the gym members
+
+    The export is either downloaded directly or queued as export job, which
+    is prepared in the background and the user notified per email when it is
+    ready.
+    """
+    gym = get_object_or_404(Gym, pk=gym_pk)
+
+    if not check_export_permissions(request.user, gym):
+        return HttpResponseForbidden()
+
+    if request.method == 'POST':
+        form = GymMemberExportForm(data=request.POST)
+
+        if form.is_valid():
+            columns = form.cleaned_data['columns']
+
+            if not form.cleaned_data['background']:
+                return HttpResponseRedirect('{0}?{1}'.format(
+                    reverse('gym:export:users', kwargs={'gym_pk': gym.pk}),
+                    urlencode({'columns': columns}, doseq=True)))
+
+            job = queue_export_job(request, ExportJob.KIND_GYM_MEMBERS, gym.pk, columns=columns)
+            return HttpResponseRedirect(job.get_absolute_url())
+    else:
+        form = GymMemberExportForm()
+
+    context = {'title': _('Export'),
+               'form': form,
+               'form_fields': form,
+               'form_action': reverse('gym:export:users-options', kwargs={'gym_pk': gym.pk}),
+               'extend_template': 'base_empty.html' if request.is_ajax() else 'base.html',
+               'submit_text': _('Export')}
+    context.update(csrf(request))
+
+    return render(request, 'form.html', context)
+
+
+@login_required
+def plans(request, gym_pk):
+    """
+    Exports the current workout and nutrition plan of all members as PDFs
+
+    The PDFs are rendered in the background and downloaded as ZIP file from
+    the status page of the export.
+    """
+    gym = get_object_or_404(Gym, pk=gym_pk)
+
+    if not check_export_permissions(request.user, gym):
+        return HttpResponseForbidden()
+
+    if request.method == 'POST':
+        form = GymPlansExportForm(data=request.POST)
+
+        if form.is_valid():
+            job = queue_export_job(request,
+                                   ExportJob.KIND_GYM,
+                                   gym.pk,
+                                   **get_export_options(form.cleaned_data))
+            return HttpResponseRedirect(job.get_absolute_url())
+    else:
+        form = GymPlansExportForm()
+
+    context = {'title': _('Export plans'),
+               'form': form,
+               'form_fields': form,
+               'form_action': reverse('gym:export:plans', kwargs={'gym_pk': gym.pk}),
+               'extend_template': 'base_empty.html' if request.is_ajax() else 'base.html',
+               'submit_text': _('Export')}
+    context.update(csrf(request))
+
+    return render(request, 'form.html', context)
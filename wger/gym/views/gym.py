@@ -15,6 +15,7 @@
 # You should have received a copy of the GNU Affero General Public License
 import csv
 import datetime
+import json
 import logging
 
 from django.contrib.auth.mixins import PermissionRequiredMixin, LoginRequiredMixin
@@ -42,6 +43,7 @@ from django.views.generic import (
 from wger.gym.forms import GymUserAddForm, GymUserPermisssionForm
 from wger.gym.helpers import (
     get_user_last_activity,
+    get_user_table_data,
     is_any_gym_admin,
     get_permission_list
 )
@@ -99,14 +101,11 @@ class GymUserListView(LoginRequiredMixin, WgerMultiplePermissionRequiredMixin, L
 
     def get_queryset(self):
         """
-        Return a list with the users, not really a queryset.
-        """
-        out = {'admins': [],
-               'members': []}
+        Return a list with the admins, not really a queryset.
 
-        for u in Gym.objects.get_members(self.kwargs['pk']).select_related('usercache'):
-            out['members'].append({'obj': u,
-                                   'last_log': u.usercache.last_activity})
+        The members are loaded page by page by GymUserListDataView.
+        """
+        out = {'admins': []}
 
         # admins list
         for u in Gym.objects.get_admins(self.kwargs['pk']):
@@ -125,12 +124,27 @@ class GymUserListView(LoginRequiredMixin, WgerMultiplePermissionRequiredMixin, L
         context = super(GymUserListView, self).get_context_data(**kwargs)
         context['gym'] = Gym.objects.get(pk=self.kwargs['pk'])
         context['admin_count'] = len(context['object_list']['admins'])
-        context['user_count'] = len(context['object_list']['members'])
+        context['user_count'] = Gym.objects.get_members(self.kwargs['pk']).count()
         context['user_table'] = {'keys': [_('ID'), _('Username'), _('Name'), _('Last activity')],
-                                 'users': context['object_list']['members']}
+                                 'url': reverse('gym:gym:user-list-data',
+                                                kwargs={'pk': self.kwargs['pk']})}
         return context
 
 
+class GymUserListDataView(GymUserListView):
+    """
+    One page of the members of a specific gym, searched and sorted as requested
+    by the server-side member table
+    """
+
+    def get(self, request, *args, **kwargs):
+        """
+        Return the members as JSON
+        """
+        data = get_user_table_data(Gym.objects.get_members(self.kwargs['pk']), request.GET)
+        return HttpResponse(json.dumps(data), 'application/json')
+
+
 class GymAddView(WgerFormMixin, LoginRequiredMixin, PermissionRequiredMixin, CreateView):
     """
     View to add a new gym
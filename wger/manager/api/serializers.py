@@ -22,18 +22,26 @@ from wger.core.api.serializers import (
     RepetitionUnitSerializer,
     WeightUnitSerializer
 )
+from wger.core.models import (
+    RepetitionUnit,
+    WeightUnit
+)
 from wger.exercises.api.serializers import ExerciseSerializer
 
 from wger.manager.models import (
+    PersonalRecord,
     Workout,
     ScheduleStep,
     Day,
     Setting,
     Set,
     Schedule,
+    WeeklyMuscleVolume,
     WorkoutLog,
+    WorkoutMonthSummary,
     WorkoutSession
 )
+from wger.utils.reference_data import ReferencePrimaryKeyRelatedField
 
 
 class WorkoutSerializer(serializers.ModelSerializer):
@@ -59,11 +67,43 @@ class WorkoutLogSerializer(serializers.ModelSerializer):
     """
     Workout session serializer
     """
+    repetition_unit = ReferencePrimaryKeyRelatedField(queryset=RepetitionUnit.objects.all(),
+                                                      required=False)
+    weight_unit = ReferencePrimaryKeyRelatedField(queryset=WeightUnit.objects.all(),
+                                                  required=False)
+
     class Meta:
         model = WorkoutLog
         exclude = ('user',)
 
 
+class WorkoutMonthSummarySerializer(serializers.ModelSerializer):
+    """
+    Monthly workout summary serializer
+    """
+    class Meta:
+        model = WorkoutMonthSummary
+        exclude = ('user',)
+
+
+class PersonalRecordSerializer(serializers.ModelSerializer):
+    """
+    Personal record serializer
+    """
+    class Meta:
+        model = PersonalRecord
+        exclude = ('user',)
+
+
+class WeeklyMuscleVolumeSerializer(serializers.ModelSerializer):
+    """
+    Weekly volume serializer
+    """
+    class Meta:
+        model = WeeklyMuscleVolume
+        exclude = ('user',)
+
+
 class ScheduleStepSerializer(serializers.ModelSerializer):
     """
     ScheduleStep serializer
@@ -103,6 +143,11 @@ class SettingSerializer(serializers.ModelSerializer):
     """
     Workout setting serializer
     """
+    repetition_unit = ReferencePrimaryKeyRelatedField(queryset=RepetitionUnit.objects.all(),
+                                                      required=False)
+    weight_unit = ReferencePrimaryKeyRelatedField(queryset=WeightUnit.objects.all(),
+                                                  required=False)
+
     class Meta:
         model = Setting
 
@@ -22,6 +22,7 @@ from rest_framework.response import Response
 from rest_framework.decorators import detail_route
 
 from wger.manager.api.serializers import (
+    PersonalRecordSerializer,
     WorkoutSerializer,
     ScheduleStepSerializer,
     WorkoutCanonicalFormSerializer,
@@ -29,17 +30,22 @@ from wger.manager.api.serializers import (
     SettingSerializer,
     SetSerializer,
     ScheduleSerializer,
+    WeeklyMuscleVolumeSerializer,
     WorkoutLogSerializer,
+    WorkoutMonthSummarySerializer,
     WorkoutSessionSerializer
 )
 from wger.manager.models import (
+    PersonalRecord,
     Workout,
     Set,
     ScheduleStep,
     Schedule,
     Day,
     Setting,
+    WeeklyMuscleVolume,
     WorkoutLog,
+    WorkoutMonthSummary,
     WorkoutSession
 )
 from wger.utils.viewsets import WgerOwnerObjectModelViewSet
@@ -277,3 +283,70 @@ class WorkoutLogViewSet(WgerOwnerObjectModelViewSet):
         Return objects to check for ownership permission
         """
         return [(Workout, 'workout')]
+
+
+class WorkoutMonthSummaryViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    API endpoint for the monthly summaries of the workout logs
+
+    Filter with ?year=<year> to get the data for e.g. a heatmap of a year
+    """
+    serializer_class = WorkoutMonthSummarySerializer
+    is_private = True
+    ordering_fields = '__all__'
+    filter_fields = ('date', )
+
+    def get_queryset(self):
+        """
+        Only allow access to appropriate objects
+        """
+        queryset = WorkoutMonthSummary.objects.filter(user=self.request.user)
+        year = self.request.query_params.get('year')
+        if year and year.isdigit():
+            queryset = queryset.filter(date__year=int(year))
+        return queryset
+
+
+class PersonalRecordViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    API endpoint for the personal records
+
+    Order e.g. with ?ordering=-one_rep_max to get the strongest records first
+    """
+    serializer_class = PersonalRecordSerializer
+    is_private = True
+    ordering_fields = '__all__'
+    filter_fields = ('exercise',
+                     'reps',
+                     'weight_unit',
+                     'date')
+
+    def get_queryset(self):
+        """
+        Only allow access to appropriate objects
+        """
+        return PersonalRecord.objects.filter(user=self.request.user)
+
+
+class WeeklyMuscleVolumeViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    API endpoint for the weekly training volume per muscle
+
+    Returns the weeks of one year, the current one or the one passed with
+    ?year=<year>, without pagination so that a chart can be drawn with the
+    data of one call.
+    """
+    serializer_class = WeeklyMuscleVolumeSerializer
+    is_private = True
+    pagination_class = None
+    ordering_fields = '__all__'
+    filter_fields = ('date',
+                     'muscle')
+
+    def get_queryset(self):
+        """
+        Only allow access to appropriate objects
+        """
+        year = self.request.query_params.get('year')
+        year = int(year) if year and year.isdigit() else datetime.date.today().year
+        return WeeklyMuscleVolume.objects.filter(user=self.request.user, date__year=year)
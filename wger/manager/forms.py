@@ -55,6 +55,7 @@ from wger.utils.widgets import (
     ExerciseAjaxSelect
 )
 from wger.utils.constants import DATE_FORMATS
+from wger.utils.reference_data import ReferenceChoiceField
 from wger.utils.widgets import Html5DateInput
 
 
@@ -110,11 +111,11 @@ class SetFormMobile(ModelForm):
         exclude = ('order', 'exerciseday')
         widgets = {'exercises': MultipleHiddenInput(), }
 
-    categories_list = ModelChoiceField(ExerciseCategory.objects.all(),
-                                       empty_label=_('All categories'),
-                                       label=_('Categories'),
-                                       widget=TranslatedSelect(),
-                                       required=False)
+    categories_list = ReferenceChoiceField(ExerciseCategory.objects.all(),
+                                           empty_label=_('All categories'),
+                                           label=_('Categories'),
+                                           widget=TranslatedSelect(),
+                                           required=False)
     exercise_list = ModelChoiceField(Exercise.objects)
 
     # We need to overwrite the init method here because otherwise Django
@@ -131,6 +132,8 @@ class SettingForm(ModelForm):
     class Meta:
         model = Setting
         exclude = ('set', 'exercise', 'order', 'comment')
+        field_classes = {'repetition_unit': ReferenceChoiceField,
+                         'weight_unit': ReferenceChoiceField}
 
 
 class HelperDateForm(Form):
@@ -146,12 +149,12 @@ class WorkoutLogForm(ModelForm):
 
     These fields are re-defined here only to make them optional
     """
-    repetition_unit = ModelChoiceField(queryset=RepetitionUnit.objects.all(),
+    repetition_unit = ReferenceChoiceField(queryset=RepetitionUnit.objects.all(),
+                                           label=_('Unit'),
+                                           required=False)
+    weight_unit = ReferenceChoiceField(queryset=WeightUnit.objects.all(),
                                        label=_('Unit'),
                                        required=False)
-    weight_unit = ModelChoiceField(queryset=WeightUnit.objects.all(),
-                                   label=_('Unit'),
-                                   required=False)
     exercise = ModelChoiceField(queryset=Exercise.objects.all(),
                                 label=_('Exercise'),
                                 required=False)
@@ -16,6 +16,7 @@
 # along with Workout Manager.  If not, see <http://www.gnu.org/licenses/>.
 
 import datetime
+import decimal
 from calendar import HTMLCalendar
 
 from reportlab.lib import colors
@@ -33,7 +34,10 @@ from django.core.urlresolvers import reverse
 from django.utils.translation import ugettext as _
 from wger.utils.helpers import normalize_decimal
 
-from wger.utils.pdf import styleSheet
+from wger.utils.pdf import (
+    get_pdf_image,
+    styleSheet
+)
 
 
 def render_workout_day(day, nr_of_weeks=7, images=False, comments=False, only_table=False):
@@ -109,19 +113,19 @@ def render_workout_day(day, nr_of_weeks=7, images=False, comments=False, only_ta
 
             # Add the exercise's main image
             image = Paragraph('', styleSheet["Small"])
-            if images:
-                if exercise['obj'].main_image:
+            main_image = exercise['obj'].main_image if images else None
+            if main_image:
 
-                    # Make the images somewhat larger when printing only the workout and not
-                    # also the columns for weight logs
-                    if only_table:
-                        image_size = 2
-                    else:
-                        image_size = 1.5
+                # Make the images somewhat larger when printing only the workout and not
+                # also the columns for weight logs
+                if only_table:
+                    image_size = 2
+                else:
+                    image_size = 1.5
 
-                    image = Image(exercise['obj'].main_image.image)
-                    image.drawHeight = image_size * cm * image.drawHeight / image.drawWidth
-                    image.drawWidth = image_size * cm
+                image = Image(get_pdf_image(main_image))
+                image.drawHeight = image_size * cm * image.drawHeight / image.drawWidth
+                image.drawWidth = image_size * cm
 
             # Put the name and images and comments together
             exercise_content = [Paragraph(exercise['obj'].name, styleSheet["Small"]),
@@ -302,6 +306,20 @@ def reps_smart_text(settings, set_obj):
     return setting_text, setting_list, weight_list, reps_list, repetition_units, weight_units
 
 
+def estimate_one_rep_max(weight, reps):
+    """
+    Estimates the one repetition maximum with Epley's formula
+
+    :param weight: the weight lifted
+    :param reps: the number of repetitions done with the weight
+    :return: the estimated maximum, as a decimal with two places
+    """
+    weight = decimal.Decimal(weight)
+    if reps > 1:
+        weight *= 1 + decimal.Decimal(reps) / 30
+    return weight.quantize(decimal.Decimal('0.01'))
+
+
 class WorkoutCalendar(HTMLCalendar):
     """
     A calendar renderer, see this blog entry for details:
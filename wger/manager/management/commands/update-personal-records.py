@@ -0,0 +1,35 @@
+# -*- coding: utf-8 *-*
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+from django.core.management.base import BaseCommand
+
+from wger.manager.models import PersonalRecord
+
+
+class Command(BaseCommand):
+    """
+    Calculates again the personal records of all users
+    """
+
+    help = 'Calculate again the personal records (best weight per exercise and ' \
+           'repetitions) of all users. This is only needed when logs were changed ' \
+           'bypassing the models, e.g. with bulk inserts or raw SQL.'
+
+    def handle(self, **options):
+        """
+        Process the options
+        """
+
+        print('** Updating the personal records')
+        PersonalRecord.objects.rebuild()
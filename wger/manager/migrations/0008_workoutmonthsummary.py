@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import decimal
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def create_summaries(apps, schema_editor):
+    '''
+    Creates the monthly summaries of the existing logs and sessions
+
+    This is the logic of WorkoutMonthSummaryManager.rebuild and LOG_VOLUME at
+    the time this migration was created: only the logs in repetitions and kg
+    or lb add up to the volume, converted to kg.
+    '''
+    WorkoutLog = apps.get_model("manager", "WorkoutLog")
+    WorkoutSession = apps.get_model("manager", "WorkoutSession")
+    WorkoutMonthSummary = apps.get_model("manager", "WorkoutMonthSummary")
+
+    factors = {1: decimal.Decimal(1), 2: decimal.Decimal('0.45359237')}
+    months = {}
+    logs = WorkoutLog.objects.values('user_id', 'date', 'reps', 'weight',
+                                     'repetition_unit_id', 'weight_unit_id')
+    for log in logs.iterator():
+        key = (log['user_id'], log['date'].replace(day=1))
+        month = months.setdefault(key, {'logs': 0,
+                                        'volume': decimal.Decimal(0),
+                                        'sessions': 0,
+                                        'days': set()})
+        month['logs'] += 1
+        if log['repetition_unit_id'] == 1 and log['weight_unit_id'] in factors:
+            month['volume'] += log['reps'] * log['weight'] * factors[log['weight_unit_id']]
+        month['days'].add(log['date'])
+
+    for session in WorkoutSession.objects.values('user_id', 'date').iterator():
+        key = (session['user_id'], session['date'].replace(day=1))
+        month = months.setdefault(key, {'logs': 0, 'volume': 0, 'sessions': 0, 'days': set()})
+        month['sessions'] += 1
+        month['days'].add(session['date'])
+
+    WorkoutMonthSummary.objects.bulk_create(
+        [WorkoutMonthSummary(user_id=user_id,
+                             date=date,
+                             logs=month['logs'],
+                             sessions=month['sessions'],
+                             days=len(month['days']),
+                             volume=month['volume'].quantize(decimal.Decimal('0.01')))
+         for (user_id, date), month in months.items()],
+        batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('manager', '0007_auto_20160311_2258'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkoutMonthSummary',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(editable=False, verbose_name='Month')),
+                ('logs', models.PositiveIntegerField(default=0, verbose_name='Log entries')),
+                ('sessions', models.PositiveIntegerField(default=0, verbose_name='Workout sessions')),
+                ('days', models.PositiveIntegerField(default=0, verbose_name='Days trained')),
+                ('volume', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Volume')),
+                ('user', models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'ordering': ['date'],
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='workoutmonthsummary',
+            unique_together=set([('user', 'date')]),
+        ),
+        migrations.RunPython(create_summaries, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('manager', '0008_workoutmonthsummary'),
+    ]
+
+    operations = [
+        migrations.AlterIndexTogether(
+            name='workoutlog',
+            index_together=set([('user', 'date'), ('user', 'exercise', 'date', 'reps')]),
+        ),
+        migrations.AlterIndexTogether(
+            name='workoutsession',
+            index_together=set([('user', 'date')]),
+        ),
+    ]
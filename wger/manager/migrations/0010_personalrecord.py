@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import decimal
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def estimate_one_rep_max(weight, reps):
+    '''
+    Epley's formula, like wger.manager.helpers.estimate_one_rep_max at the
+    time this migration was created
+    '''
+    weight = decimal.Decimal(weight)
+    if reps > 1:
+        weight *= 1 + decimal.Decimal(reps) / 30
+    return weight.quantize(decimal.Decimal('0.01'))
+
+
+def create_records(apps, schema_editor):
+    '''
+    Creates the personal records of the existing logs
+
+    This is the logic of PersonalRecordManager.rebuild at the time this
+    migration was created.
+    '''
+    WorkoutLog = apps.get_model("manager", "WorkoutLog")
+    PersonalRecord = apps.get_model("manager", "PersonalRecord")
+
+    records = {}
+    logs = WorkoutLog.objects.filter(repetition_unit=1, weight_unit__in=(1, 2), reps__gt=0)\
+        .order_by('date', 'id')\
+        .values_list('user', 'exercise', 'reps', 'weight_unit', 'weight', 'date')
+    for user_id, exercise_id, reps, weight_unit_id, weight, date in logs.iterator():
+        key = (user_id, exercise_id, reps, weight_unit_id)
+        best = records[key][0] if key in records else (weight, date)
+        if weight > best[0]:
+            best = (weight, date)
+        records[key] = (best, (weight, date))
+
+    PersonalRecord.objects.bulk_create(
+        [PersonalRecord(user_id=user_id,
+                        exercise_id=exercise_id,
+                        reps=reps,
+                        weight_unit_id=weight_unit_id,
+                        weight=best[0],
+                        date=best[1],
+                        one_rep_max=estimate_one_rep_max(best[0], reps),
+                        last_weight=last[0],
+                        last_date=last[1])
+         for (user_id, exercise_id, reps, weight_unit_id), (best, last) in records.items()],
+        batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0012_exportjob'),
+        ('exercises', '0003_auto_20160921_2000'),
+        ('manager', '0009_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PersonalRecord',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reps', models.PositiveIntegerField(verbose_name='Repetitions')),
+                ('weight', models.DecimalField(decimal_places=2, max_digits=5, verbose_name='Weight')),
+                ('date', models.DateField(verbose_name='Date')),
+                ('one_rep_max', models.DecimalField(decimal_places=2, max_digits=7, verbose_name='Estimated one repetition maximum')),
+                ('last_weight', models.DecimalField(decimal_places=2, max_digits=5, verbose_name='Last weight')),
+                ('last_date', models.DateField(verbose_name='Last date')),
+                ('exercise', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='exercises.Exercise', verbose_name='Exercise')),
+                ('user', models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='User')),
+                ('weight_unit', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.WeightUnit', verbose_name='Unit')),
+            ],
+            options={
+                'ordering': ['exercise', 'reps'],
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='personalrecord',
+            unique_together=set([('user', 'exercise', 'reps', 'weight_unit')]),
+        ),
+        migrations.RunPython(create_records, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import datetime
+import decimal
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def create_volumes(apps, schema_editor):
+    '''
+    Calculates the weekly volume of the existing logs
+
+    This is the logic of WeeklyMuscleVolumeManager.rebuild and LOG_VOLUME at
+    the time this migration was created: every log counts as a set, only the
+    logs in repetitions and kg or lb add up to the volume, converted to kg.
+    '''
+    WorkoutLog = apps.get_model("manager", "WorkoutLog")
+    WeeklyMuscleVolume = apps.get_model("manager", "WeeklyMuscleVolume")
+
+    factors = {1: decimal.Decimal(1), 2: decimal.Decimal('0.45359237')}
+    rows = {}
+    for prefix, field in (('', 'exercise__muscles'),
+                          ('secondary_', 'exercise__muscles_secondary')):
+        logs = WorkoutLog.objects.filter(**{field + '__isnull': False}).order_by()\
+            .values_list('user', 'date', field, 'reps', 'weight', 'repetition_unit',
+                         'weight_unit')
+        for user_id, date, muscle_id, reps, weight, repetition_unit_id, weight_unit_id \
+                in logs.iterator():
+            key = (user_id, date - datetime.timedelta(days=date.weekday()), muscle_id)
+            row = rows.setdefault(key, {'sets': 0,
+                                        'volume': decimal.Decimal(0),
+                                        'secondary_sets': 0,
+                                        'secondary_volume': decimal.Decimal(0)})
+            row[prefix + 'sets'] += 1
+            if repetition_unit_id == 1 and weight_unit_id in factors:
+                row[prefix + 'volume'] += reps * weight * factors[weight_unit_id]
+
+    for row in rows.values():
+        row['volume'] = row['volume'].quantize(decimal.Decimal('0.01'))
+        row['secondary_volume'] = row['secondary_volume'].quantize(decimal.Decimal('0.01'))
+
+    WeeklyMuscleVolume.objects.bulk_create(
+        [WeeklyMuscleVolume(user_id=user_id, date=week, muscle_id=muscle_id, **values)
+         for (user_id, week, muscle_id), values in rows.items()],
+        batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exercises', '0003_auto_20160921_2000'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('manager', '0010_personalrecord'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WeeklyMuscleVolume',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(editable=False, verbose_name='Week')),
+                ('sets', models.PositiveIntegerField(default=0, verbose_name='Sets')),
+                ('volume', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Volume')),
+                ('secondary_sets', models.PositiveIntegerField(default=0, verbose_name='Sets (secondary muscle)')),
+                ('secondary_volume', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Volume (secondary muscle)')),
+                ('muscle', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='exercises.Muscle', verbose_name='Muscle')),
+                ('user', models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'ordering': ['date', 'muscle'],
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='weeklymusclevolume',
+            unique_together=set([('user', 'date', 'muscle')]),
+        ),
+        migrations.RunPython(create_volumes, reverse_code=migrations.RunPython.noop),
+    ]
@@ -15,12 +15,26 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with Workout Manager.  If not, see <http://www.gnu.org/licenses/>.
 
+import collections
 import datetime
+import decimal
 import logging
 from django.utils.encoding import python_2_unicode_compatible
 
 import six
-from django.db import models
+from django.db import (
+    models,
+    transaction
+)
+from django.db.models import (
+    Case,
+    Count,
+    DecimalField,
+    F,
+    Sum,
+    Value,
+    When
+)
 from django.utils.translation import ugettext_lazy as _
 from django.contrib.auth.models import User
 from django.core.validators import MaxValueValidator
@@ -32,10 +46,14 @@ from django.core.validators import MinValueValidator
 from sortedm2m.fields import SortedManyToManyField
 
 from wger.core.models import DaysOfWeek, RepetitionUnit, WeightUnit
-from wger.exercises.models import Exercise
-from wger.manager.helpers import reps_smart_text
+from wger.exercises.models import Exercise, Muscle
+from wger.manager.helpers import (
+    estimate_one_rep_max,
+    reps_smart_text
+)
 from wger.utils.cache import (
     cache_mapper,
+    reset_pdf_version,
     reset_workout_canonical_form,
     reset_workout_log
 )
@@ -44,6 +62,24 @@ from wger.utils.fields import Html5DateField
 
 logger = logging.getLogger(__name__)
 
+LB_IN_KG = decimal.Decimal('0.45359237')
+'''Kilograms in one pound, used to add up the volume of logs in lb'''
+
+LOG_VOLUME = Case(When(repetition_unit=1,
+                       weight_unit=1,
+                       then=F('reps') * F('weight')),
+                  When(repetition_unit=1,
+                       weight_unit=2,
+                       then=F('reps') * F('weight') * Value(LB_IN_KG)),
+                  default=Value(0),
+                  output_field=DecimalField())
+'''
+Volume of a workout log in kg, the repetitions times the weight
+
+Only logs counted in repetitions with a weight in kg or lb have a volume,
+e.g. seconds or plates can't be added up with them.
+'''
+
 
 #
 # Classes
@@ -92,10 +128,19 @@ class Workout(models.Model):
 
     def delete(self, *args, **kwargs):
         """
-        Reset all cached infos
+        Reset all cached infos and update the monthly summaries, personal
+        records and weekly volumes of the deleted logs and sessions
         """
         reset_workout_canonical_form(self.id)
+        logs = WorkoutLog.objects.filter(workout=self)
+        months = list(logs.dates('date', 'month'))
+        months += WorkoutSession.objects.filter(workout=self).dates('date', 'month')
+        records = list(logs.order_by().values_list(*PersonalRecord.KEY_FIELDS).distinct())
         super(Workout, self).delete(*args, **kwargs)
+        WorkoutMonthSummary.objects.refresh(self.user_id, *months)
+        PersonalRecord.objects.refresh(self.user_id, *records)
+        if records:
+            WeeklyMuscleVolume.objects.rebuild([self.user_id])
 
     def get_owner_object(self):
         """
@@ -264,6 +309,7 @@ class Schedule(models.Model):
             Schedule.objects.filter(user=self.user).update(is_active=False)
             self.is_active = True
 
+        reset_pdf_version('schedule', self.id)
         super(Schedule, self).save(*args, **kwargs)
 
     def get_current_scheduled_workout(self):
@@ -332,6 +378,20 @@ class ScheduleStep(models.Model):
     order = models.IntegerField(verbose_name=_('Order'),
                                 default=1)
 
+    def save(self, *args, **kwargs):
+        """
+        Reset all cached infos
+        """
+        reset_pdf_version('schedule', self.schedule_id)
+        super(ScheduleStep, self).save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        """
+        Reset all cached infos
+        """
+        reset_pdf_version('schedule', self.schedule_id)
+        super(ScheduleStep, self).delete(*args, **kwargs)
+
     def get_owner_object(self):
         """
         Returns the object that has owner information
@@ -720,10 +780,21 @@ class WorkoutLog(models.Model):
 
     date = Html5DateField(verbose_name=_('Date'))
 
+    TRACKED_FIELDS = ('date', 'reps', 'weight', 'exercise_id', 'repetition_unit_id',
+                      'weight_unit_id')
+    '''
+    Fields used in the monthly summary, the personal records and the weekly volume
+    '''
+
     # Metaclass to set some other properties
     class Meta:
         ordering = ["date", "reps"]
 
+        # The logs of an exercise in date order, also used to find the last
+        # weight for some repetitions, and the logs of the calendar pages
+        index_together = (("user", "exercise", "date", "reps"),
+                          ("user", "date"))
+
     def __str__(self):
         """
         Return a more human-readable representation
@@ -752,9 +823,27 @@ class WorkoutLog(models.Model):
         except WorkoutSession.DoesNotExist:
             return None
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Remember the values the monthly summary, the personal records and
+        the weekly volume depend on
+        """
+        instance = super(WorkoutLog, cls).from_db(db, field_names, values)
+        instance._tracked_values = instance.get_tracked_values()
+        return instance
+
+    def get_tracked_values(self):
+        """
+        Returns the values of the entry that are used in the monthly summary,
+        the personal records and the weekly volume
+        """
+        return dict((field, self.__dict__.get(field)) for field in self.TRACKED_FIELDS)
+
     def save(self, *args, **kwargs):
         """
-        Reset cache
+        Reset cache and update the monthly summary, the personal records and
+        the weekly volume
         """
         reset_workout_log(self.user_id, self.date.year, self.date.month, self.date.day)
 
@@ -764,12 +853,30 @@ class WorkoutLog(models.Model):
             self.reps = 1
         super(WorkoutLog, self).save(*args, **kwargs)
 
+        original = getattr(self, '_tracked_values', None)
+        self._tracked_values = self.get_tracked_values()
+        if original is None:
+            WorkoutMonthSummary.objects.refresh(self.user_id, self.date)
+            PersonalRecord.objects.add_log(self)
+            WeeklyMuscleVolume.objects.refresh(self.user_id, self.date)
+        elif original != self._tracked_values:
+            WorkoutMonthSummary.objects.refresh(self.user_id, self.date, original['date'])
+            PersonalRecord.objects.refresh(self.user_id,
+                                           PersonalRecord.get_key(self._tracked_values),
+                                           PersonalRecord.get_key(original))
+            WeeklyMuscleVolume.objects.refresh(self.user_id, self.date, original['date'])
+
     def delete(self, *args, **kwargs):
         """
-        Reset cache
+        Reset cache and update the monthly summary, the personal records and
+        the weekly volume
         """
         reset_workout_log(self.user_id, self.date.year, self.date.month, self.date.day)
         super(WorkoutLog, self).delete(*args, **kwargs)
+        WorkoutMonthSummary.objects.refresh(self.user_id, self.date)
+        PersonalRecord.objects.refresh(self.user_id,
+                                       PersonalRecord.get_key(self.get_tracked_values()))
+        WeeklyMuscleVolume.objects.refresh(self.user_id, self.date)
 
 
 @python_2_unicode_compatible
@@ -853,6 +960,7 @@ class WorkoutSession(models.Model):
         """
         ordering = ["date", ]
         unique_together = ("date", "user")
+        index_together = ("user", "date")
 
     def clean(self):
         """
@@ -871,16 +979,559 @@ class WorkoutSession(models.Model):
         """
         return self
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """
+        Remember the date, the only value the monthly summary depends on
+        """
+        instance = super(WorkoutSession, cls).from_db(db, field_names, values)
+        instance._summary_date = instance.__dict__.get('date')
+        return instance
+
     def save(self, *args, **kwargs):
         """
-        Reset cache
+        Reset cache and update the monthly summary
         """
         reset_workout_log(self.user_id, self.date.year, self.date.month)
         super(WorkoutSession, self).save(*args, **kwargs)
 
+        original = getattr(self, '_summary_date', None)
+        self._summary_date = self.date
+        if original != self.date:
+            dates = [self.date, original] if original else [self.date]
+            WorkoutMonthSummary.objects.refresh(self.user_id, *dates)
+
     def delete(self, *args, **kwargs):
         """
-        Reset cache
+        Reset cache and update the monthly summary
         """
         reset_workout_log(self.user_id, self.date.year, self.date.month)
         super(WorkoutSession, self).delete(*args, **kwargs)
+        WorkoutMonthSummary.objects.refresh(self.user_id, self.date)
+
+
+class WorkoutMonthSummaryManager(models.Manager):
+    """
+    Custom manager for the monthly summaries of the workout logs
+    """
+
+    def refresh(self, user_id, *dates):
+        """
+        Calculates again the summaries of the months of the given dates
+
+        This is called every time a log or a session is saved or deleted, so
+        that only the affected month is read from the logs.
+        """
+        for month in set(datetime.date(date.year, date.month, 1) for date in dates if date):
+            next_month = (month + datetime.timedelta(days=31)).replace(day=1)
+            logs = WorkoutLog.objects.filter(user_id=user_id,
+                                             date__gte=month,
+                                             date__lt=next_month)
+            sessions = WorkoutSession.objects.filter(user_id=user_id,
+                                                     date__gte=month,
+                                                     date__lt=next_month)
+            summary = summarize_month(logs.order_by().values('date')
+                                      .annotate(logs=Count('id'), volume=Sum(LOG_VOLUME)),
+                                      sessions.values_list('date', flat=True))
+            if summary['logs'] or summary['sessions']:
+                self.update_or_create(user_id=user_id, date=month, defaults=summary)
+            else:
+                self.filter(user_id=user_id, date=month).delete()
+
+    def rebuild(self, user_ids=None):
+        """
+        Calculates again all summaries of the given users, or of all users
+        """
+        if user_ids is None:
+            user_ids = User.objects.values_list('pk', flat=True)
+
+        for user_id in user_ids:
+            months = {}
+            logs = WorkoutLog.objects.filter(user_id=user_id).order_by().values('date')\
+                .annotate(logs=Count('id'), volume=Sum(LOG_VOLUME))
+            for entry in logs:
+                month = entry['date'].replace(day=1)
+                months.setdefault(month, ([], []))[0].append(entry)
+            sessions = WorkoutSession.objects.filter(user_id=user_id)
+            for date in sessions.values_list('date', flat=True):
+                months.setdefault(date.replace(day=1), ([], []))[1].append(date)
+
+            with transaction.atomic():
+                self.filter(user_id=user_id).delete()
+                self.bulk_create([WorkoutMonthSummary(user_id=user_id,
+                                                      date=month,
+                                                      **summarize_month(*months[month]))
+                                  for month in sorted(months)])
+
+
+def summarize_month(log_days, session_dates):
+    """
+    Calculates the values of a monthly summary
+
+    :param log_days: the number of logs and their volume per day, as dictionaries
+                     with the keys date, logs and volume
+    :param session_dates: the dates of the sessions of the month
+    """
+    session_dates = set(session_dates)
+    days = set(session_dates)
+    summary = {'logs': 0, 'volume': decimal.Decimal(0)}
+    for entry in log_days:
+        days.add(entry['date'])
+        summary['logs'] += entry['logs']
+        summary['volume'] += decimal.Decimal(entry['volume'] or 0)
+    summary['sessions'] = len(session_dates)
+    summary['days'] = len(days)
+    summary['volume'] = summary['volume'].quantize(decimal.Decimal('0.01'))
+    return summary
+
+
+@python_2_unicode_compatible
+class WorkoutMonthSummary(models.Model):
+    """
+    Summary of the workout logs and sessions of a user in one month
+
+    The summaries are kept up to date when logs or sessions are saved or
+    deleted, so the calendar can e.g. list the months with logs without
+    reading all of them.
+    """
+
+    objects = WorkoutMonthSummaryManager()
+
+    user = models.ForeignKey(User,
+                             verbose_name=_('User'),
+                             editable=False)
+
+    date = models.DateField(verbose_name=_('Month'),
+                            editable=False)
+    '''
+    The first day of the month
+    '''
+
+    logs = models.PositiveIntegerField(verbose_name=_('Log entries'),
+                                       default=0)
+    '''
+    The number of log entries
+    '''
+
+    sessions = models.PositiveIntegerField(verbose_name=_('Workout sessions'),
+                                           default=0)
+    '''
+    The number of workout sessions
+    '''
+
+    days = models.PositiveIntegerField(verbose_name=_('Days trained'),
+                                       default=0)
+    '''
+    The number of days with logs or a session
+    '''
+
+    volume = models.DecimalField(verbose_name=_('Volume'),
+                                 decimal_places=2,
+                                 max_digits=14,
+                                 default=0)
+    '''
+    The sum of repetitions times weight of the logs, in kg. Only logs counted
+    in repetitions with a weight in kg or lb are included
+    '''
+
+    class Meta:
+        """
+        Set other properties
+        """
+        ordering = ["date", ]
+        unique_together = ("user", "date")
+
+    def __str__(self):
+        """
+        Return a more human-readable representation
+        """
+        return u"{0} - {1:%Y-%m}".format(self.user, self.date)
+
+    def get_owner_object(self):
+        """
+        Returns the object that has owner information
+        """
+        return self
+
+
+class PersonalRecordManager(models.Manager):
+    """
+    Custom manager for the personal records
+    """
+
+    def get_logs(self, user_id):
+        """
+        Returns the logs of a user that can set a record, the ones counted
+        in repetitions with a weight
+        """
+        return WorkoutLog.objects.filter(user_id=user_id,
+                                         repetition_unit=1,
+                                         weight_unit__in=(1, 2),
+                                         reps__gt=0)
+
+    def add_log(self, log):
+        """
+        Updates the record with a new log, without reading the other logs
+        """
+        if log.repetition_unit_id != 1 or log.weight_unit_id not in (1, 2) or log.reps <= 0:
+            return
+
+        try:
+            record = self.get(user_id=log.user_id,
+                              exercise_id=log.exercise_id,
+                              reps=log.reps,
+                              weight_unit_id=log.weight_unit_id)
+        except PersonalRecord.DoesNotExist:
+            self.create(user_id=log.user_id,
+                        exercise_id=log.exercise_id,
+                        reps=log.reps,
+                        weight_unit_id=log.weight_unit_id,
+                        **get_record_values(log.reps,
+                                            (log.weight, log.date),
+                                            (log.weight, log.date)))
+            return
+
+        best = (record.weight, record.date)
+        if log.weight > record.weight or (log.weight == record.weight and log.date < record.date):
+            best = (log.weight, log.date)
+        last = (record.last_weight, record.last_date)
+        if log.date >= record.last_date:
+            last = (log.weight, log.date)
+
+        values = get_record_values(log.reps, best, last)
+        if any(getattr(record, field) != value for field, value in values.items()):
+            self.filter(pk=record.pk).update(**values)
+
+    def refresh(self, user_id, *keys):
+        """
+        Calculates again the records with the given keys, (exercise ID,
+        repetitions, weight unit ID) tuples
+
+        This is called when logs are edited or deleted, so that only the
+        logs of the affected records are read.
+        """
+        for exercise_id, reps, weight_unit_id in set(keys):
+            key = {'exercise_id': exercise_id, 'reps': reps, 'weight_unit_id': weight_unit_id}
+            logs = self.get_logs(user_id).filter(**key).values_list('weight', 'date')
+            best = logs.order_by('-weight', 'date', 'id').first()
+            if best:
+                last = logs.order_by('-date', '-id').first()
+                self.update_or_create(user_id=user_id,
+                                      defaults=get_record_values(reps, best, last),
+                                      **key)
+            else:
+                self.filter(user_id=user_id, **key).delete()
+
+    def rebuild(self, user_ids=None):
+        """
+        Calculates again all records of the given users, or of all users
+        """
+        if user_ids is None:
+            user_ids = User.objects.values_list('pk', flat=True)
+
+        for user_id in user_ids:
+            records = collections.OrderedDict()
+            logs = self.get_logs(user_id).order_by('date', 'id')\
+                .values_list('exercise', 'reps', 'weight_unit', 'weight', 'date')
+            for exercise_id, reps, weight_unit_id, weight, date in logs:
+                key = (exercise_id, reps, weight_unit_id)
+                best = records[key][0] if key in records else (weight, date)
+                if weight > best[0]:
+                    best = (weight, date)
+                records[key] = (best, (weight, date))
+
+            with transaction.atomic():
+                self.filter(user_id=user_id).delete()
+                self.bulk_create([PersonalRecord(user_id=user_id,
+                                                 exercise_id=exercise_id,
+                                                 reps=reps,
+                                                 weight_unit_id=weight_unit_id,
+                                                 **get_record_values(reps, best, last))
+                                  for (exercise_id, reps, weight_unit_id), (best, last)
+                                  in records.items()])
+
+
+def get_record_values(reps, best, last):
+    """
+    Returns the values of a personal record
+
+    :param reps: the number of repetitions of the record
+    :param best: (weight, date) tuple of the best log
+    :param last: (weight, date) tuple of the newest log
+    """
+    return {'weight': best[0],
+            'date': best[1],
+            'one_rep_max': estimate_one_rep_max(best[0], reps),
+            'last_weight': last[0],
+            'last_date': last[1]}
+
+
+@python_2_unicode_compatible
+class PersonalRecord(models.Model):
+    """
+    The best weight a user logged for a number of repetitions of an exercise
+
+    Only logs counted in repetitions with a weight unit are taken into
+    account. The records are kept up to date when logs are saved or deleted.
+    """
+
+    KEY_FIELDS = ('exercise_id', 'reps', 'weight_unit_id')
+    '''
+    Fields identifying the record of a log
+    '''
+
+    objects = PersonalRecordManager()
+
+    user = models.ForeignKey(User,
+                             verbose_name=_('User'),
+                             editable=False)
+    exercise = models.ForeignKey(Exercise,
+                                 verbose_name=_('Exercise'))
+
+    reps = models.PositiveIntegerField(verbose_name=_('Repetitions'))
+
+    weight_unit = models.ForeignKey(WeightUnit,
+                                    verbose_name=_('Unit'))
+
+    weight = models.DecimalField(decimal_places=2,
+                                 max_digits=5,
+                                 verbose_name=_('Weight'))
+    '''
+    The best weight
+    '''
+
+    date = models.DateField(verbose_name=_('Date'))
+    '''
+    The date the best weight was first logged
+    '''
+
+    one_rep_max = models.DecimalField(decimal_places=2,
+                                      max_digits=7,
+                                      verbose_name=_('Estimated one repetition maximum'))
+    '''
+    The one repetition maximum, estimated from the best weight
+    '''
+
+    last_weight = models.DecimalField(decimal_places=2,
+                                      max_digits=5,
+                                      verbose_name=_('Last weight'))
+    '''
+    The weight of the newest log, used e.g. as default in the timer
+    '''
+
+    last_date = models.DateField(verbose_name=_('Last date'))
+    '''
+    The date of the newest log
+    '''
+
+    class Meta:
+        """
+        Set other properties
+        """
+        ordering = ["exercise", "reps"]
+        unique_together = ("user", "exercise", "reps", "weight_unit")
+
+    def __str__(self):
+        """
+        Return a more human-readable representation
+        """
+        return u"{0}: {1} × {2} {3}".format(self.exercise, self.reps, self.weight, self.weight_unit)
+
+    @classmethod
+    def get_key(cls, values):
+        """
+        Returns the key of the record of a log, from a dictionary with the
+        values of the log
+        """
+        return tuple(values[field] for field in cls.KEY_FIELDS)
+
+    def get_owner_object(self):
+        """
+        Returns the object that has owner information
+        """
+        return self
+
+
+def get_week_start(date):
+    """
+    Returns the monday of the week of a date
+    """
+    return date - datetime.timedelta(days=date.weekday())
+
+
+class WeeklyMuscleVolumeManager(models.Manager):
+    """
+    Custom manager for the weekly volume per muscle
+    """
+
+    VOLUME_BATCH_SIZE = 100
+    '''Number of users whose volume is calculated together when rebuilding'''
+
+    def aggregate_logs(self, logs, muscle_ids=None):
+        """
+        Sums the sets and the volume of the logs per user, week and muscle
+
+        The logs are summed per day in the database, with one query for the
+        primary and one for the secondary muscles, only the days are added
+        up to weeks here.
+
+        :param muscle_ids: only sum the volume of these muscles, optional
+        :return: a dictionary with the values of the rows by (user ID, week,
+                 muscle ID) tuples
+        """
+        rows = {}
+        for prefix, field in (('', 'exercise__muscles'),
+                              ('secondary_', 'exercise__muscles_secondary')):
+            if muscle_ids is None:
+                muscle_filter = {field + '__isnull': False}
+            else:
+                muscle_filter = {field + '__in': muscle_ids}
+            days = logs.filter(**muscle_filter).order_by()\
+                .values('user', 'date', field)\
+                .annotate(sets=Count('id'), volume=Sum(LOG_VOLUME))
+            for day in days:
+                key = (day['user'], get_week_start(day['date']), day[field])
+                row = rows.setdefault(key, {'sets': 0,
+                                            'volume': decimal.Decimal(0),
+                                            'secondary_sets': 0,
+                                            'secondary_volume': decimal.Decimal(0)})
+                row[prefix + 'sets'] += day['sets']
+                row[prefix + 'volume'] += decimal.Decimal(day['volume'] or 0)
+
+        for row in rows.values():
+            row['volume'] = row['volume'].quantize(decimal.Decimal('0.01'))
+            row['secondary_volume'] = row['secondary_volume'].quantize(decimal.Decimal('0.01'))
+        return rows
+
+    def save_rows(self, rows):
+        """
+        Inserts the rows returned by aggregate_logs
+        """
+        self.bulk_create([WeeklyMuscleVolume(user_id=user_id, date=week, muscle_id=muscle_id,
+                                             **values)
+                          for (user_id, week, muscle_id), values in sorted(rows.items())],
+                         batch_size=500)
+
+    def refresh(self, user_id, *dates):
+        """
+        Calculates again the volume of the weeks of the given dates
+
+        This is called every time a log is saved or deleted, so that only the
+        logs of the affected week are read.
+        """
+        for week in set(get_week_start(date) for date in dates if date):
+            logs = WorkoutLog.objects.filter(user_id=user_id,
+                                             date__gte=week,
+                                             date__lt=week + datetime.timedelta(days=7))
+            rows = self.aggregate_logs(logs)
+            with transaction.atomic():
+                self.filter(user_id=user_id, date=week).delete()
+                self.save_rows(rows)
+
+    def refresh_muscles(self, user_ids, muscle_ids):
+        """
+        Calculates again the volume of the given muscles of the given users
+
+        This is called when the muscles of an exercise change, only the rows
+        of the added or removed muscles are affected.
+        """
+        user_ids = list(user_ids)
+        muscle_ids = list(muscle_ids)
+        if not muscle_ids:
+            return
+
+        for i in range(0, len(user_ids), self.VOLUME_BATCH_SIZE):
+            chunk = user_ids[i:i + self.VOLUME_BATCH_SIZE]
+            rows = self.aggregate_logs(WorkoutLog.objects.filter(user_id__in=chunk), muscle_ids)
+            with transaction.atomic():
+                self.filter(user_id__in=chunk, muscle_id__in=muscle_ids).delete()
+                self.save_rows(rows)
+
+    def rebuild(self, user_ids=None):
+        """
+        Calculates again the whole volume of the given users, or of all users
+        """
+        if user_ids is None:
+            user_ids = User.objects.values_list('pk', flat=True)
+        user_ids = list(user_ids)
+
+        for i in range(0, len(user_ids), self.VOLUME_BATCH_SIZE):
+            chunk = user_ids[i:i + self.VOLUME_BATCH_SIZE]
+            rows = self.aggregate_logs(WorkoutLog.objects.filter(user_id__in=chunk))
+            with transaction.atomic():
+                self.filter(user_id__in=chunk).delete()
+                self.save_rows(rows)
+
+
+@python_2_unicode_compatible
+class WeeklyMuscleVolume(models.Model):
+    """
+    The training volume of a user for a muscle in one week
+
+    Every log counts as one set, its volume is the repetitions times the
+    weight in kg, only for logs counted in repetitions with a weight in kg
+    or lb (see LOG_VOLUME). The rows are kept up to date when logs are saved
+    or deleted.
+    """
+
+    objects = WeeklyMuscleVolumeManager()
+
+    user = models.ForeignKey(User,
+                             verbose_name=_('User'),
+                             editable=False)
+
+    date = models.DateField(verbose_name=_('Week'),
+                            editable=False)
+    '''
+    The monday of the week
+    '''
+
+    muscle = models.ForeignKey(Muscle,
+                               verbose_name=_('Muscle'))
+
+    sets = models.PositiveIntegerField(verbose_name=_('Sets'),
+                                       default=0)
+    '''
+    The number of logs of exercises with the muscle as primary muscle
+    '''
+
+    volume = models.DecimalField(verbose_name=_('Volume'),
+                                 decimal_places=2,
+                                 max_digits=14,
+                                 default=0)
+    '''
+    The volume of the logs of exercises with the muscle as primary muscle
+    '''
+
+    secondary_sets = models.PositiveIntegerField(verbose_name=_('Sets (secondary muscle)'),
+                                                 default=0)
+    '''
+    The number of logs of exercises with the muscle as secondary muscle
+    '''
+
+    secondary_volume = models.DecimalField(verbose_name=_('Volume (secondary muscle)'),
+                                           decimal_places=2,
+                                           max_digits=14,
+                                           default=0)
+    '''
+    The volume of the logs of exercises with the muscle as secondary muscle
+    '''
+
+    class Meta:
+        """
+        Set other properties
+        """
+        ordering = ["date", "muscle"]
+        unique_together = ("user", "date", "muscle")
+
+    def __str__(self):
+        """
+        Return a more human-readable representation
+        """
+        return u"{0} - {1} - {2}".format(self.user, self.date, self.muscle)
+
+    def get_owner_object(self):
+        """
+        Returns the object that has owner information
+        """
+        return self
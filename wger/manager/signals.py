@@ -15,10 +15,11 @@
 # You should have received a copy of the GNU Affero General Public License
 
 
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import post_save, post_delete, m2m_changed
 
+from wger.exercises.models import Exercise
 from wger.gym.helpers import get_user_last_activity
-from wger.manager.models import WorkoutLog, WorkoutSession
+from wger.manager.models import WeeklyMuscleVolume, WorkoutLog, WorkoutSession
 from wger.core.models import UserCache
 
 
@@ -39,3 +40,40 @@ post_save.connect(update_activity_cache, sender=WorkoutLog)
 #       perhaps because of the cascading, needs to be checked
 # post_delete.connect(update_activity_cache, sender=WorkoutSession)
 # post_delete.connect(update_activity_cache, sender=WorkoutLog)
+
+
+def update_weekly_volume(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Calculate again the weekly volume of the users that logged an exercise
+    after its muscles were changed
+
+    Only the rows of the added or removed muscles are touched. A clear
+    doesn't say what was removed, so that is looked up before.
+    """
+    if action == 'pre_clear':
+        if reverse:
+            pk_set = sender.objects.filter(muscle=instance).values_list('exercise', flat=True)
+        else:
+            pk_set = sender.objects.filter(exercise=instance).values_list('muscle', flat=True)
+        instance._weekly_volume_cleared = set(pk_set)
+        return
+
+    if action == 'post_clear':
+        pk_set = instance.__dict__.pop('_weekly_volume_cleared', set())
+    elif action not in ('post_add', 'post_remove'):
+        return
+
+    if reverse:
+        exercise_ids, muscle_ids = pk_set, [instance.pk]
+    else:
+        exercise_ids, muscle_ids = [instance.pk], pk_set
+    if not exercise_ids or not muscle_ids:
+        return
+
+    user_ids = WorkoutLog.objects.filter(exercise__in=exercise_ids)\
+        .order_by().values_list('user', flat=True).distinct()
+    WeeklyMuscleVolume.objects.refresh_muscles(user_ids, muscle_ids)
+
+
+m2m_changed.connect(update_weekly_volume, sender=Exercise.muscles.through)
+m2m_changed.connect(update_weekly_volume, sender=Exercise.muscles_secondary.through)
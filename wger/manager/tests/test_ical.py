@@ -16,8 +16,13 @@ import datetime
 
 from django.contrib.auth.models import User
 from django.core.urlresolvers import reverse
+from icalendar import Calendar
 
 from wger.core.tests.base_testcase import WorkoutManagerTestCase
+from wger.manager.models import (
+    Schedule,
+    Workout
+)
 from wger.utils.helpers import next_weekday, make_token
 
 
@@ -67,8 +72,8 @@ class WorkoutICalExportTestCase(WorkoutManagerTestCase):
                          'attachment; filename=Calendar-workout-3.ics')
 
         # Approximate size
-        self.assertGreater(len(response.content), 540)
-        self.assertLess(len(response.content), 560)
+        self.assertGreater(len(response.content), 575)
+        self.assertLess(len(response.content), 595)
 
     def export_ical_token_wrong(self):
         """
@@ -99,8 +104,8 @@ class WorkoutICalExportTestCase(WorkoutManagerTestCase):
                              'attachment; filename=Calendar-workout-3.ics')
 
             # Approximate size
-            self.assertGreater(len(response.content), 540)
-            self.assertLess(len(response.content), 560)
+            self.assertGreater(len(response.content), 575)
+            self.assertLess(len(response.content), 595)
 
     def test_export_ical_anonymous(self):
         """
@@ -217,3 +222,77 @@ class ScheduleICalExportTestCase(WorkoutManagerTestCase):
         self.export_ical(fail=True)
         self.export_ical_token()
         self.export_ical_token_wrong()
+
+
+class ICalSubscriptionTestCase(WorkoutManagerTestCase):
+    """
+    Tests the caching of the iCal files for calendar subscriptions
+    """
+
+    def get_uids(self, response):
+        """
+        Helper function that returns the UIDs of the events in an iCal file
+        """
+        calendar = Calendar.from_ical(response.content)
+        return sorted(str(event['uid']) for event in calendar.walk('vevent'))
+
+    def assert_not_modified(self, url, change):
+        """
+        Asserts that the file is not sent again until change() is called
+        """
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        last_modified = response['Last-Modified']
+        uids = self.get_uids(response)
+        self.assertTrue(uids)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+        change()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+        # The events keep their UIDs
+        self.assertEqual(self.get_uids(response), uids)
+
+    def test_workout(self):
+        """
+        Test the iCal file of a workout
+        """
+        self.user_login('test')
+        url = reverse('manager:workout:ical', kwargs={'pk': 3})
+        self.assert_not_modified(url, lambda: Workout.objects.get(pk=3).save())
+
+        # The cached file is sent without building the calendar again
+        response = self.client.get(url)
+        with self.assertNumQueries(3):
+            self.assertEqual(self.client.get(url).content, response.content)
+
+    def test_workout_uids(self):
+        """
+        Test that the events have deterministic UIDs
+        """
+        self.user_login('test')
+        response = self.client.get(reverse('manager:workout:ical', kwargs={'pk': 3}))
+        for uid in self.get_uids(response):
+            self.assertTrue(uid.startswith('workout-3-day-'))
+            self.assertTrue(uid.endswith('@example.com'))
+
+    def test_schedule(self):
+        """
+        Test the iCal file of a schedule, which also changes with its workouts
+        """
+        self.user_login('test')
+        schedule = Schedule.objects.get(pk=1)
+        url = reverse('manager:schedule:ical', kwargs={'pk': schedule.pk})
+        step = schedule.schedulestep_set.first()
+        self.assert_not_modified(url, lambda: step.workout.save())
+
+        response = self.client.get(url)
+        for uid in self.get_uids(response):
+            self.assertTrue(uid.startswith('schedule-1-step-'))
@@ -0,0 +1,185 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+import datetime
+import decimal
+
+from django.core.management import call_command
+from django.core.urlresolvers import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from wger.core.tests.base_testcase import WorkoutManagerTestCase
+from wger.exercises.models import Exercise
+from wger.manager.models import (
+    Workout,
+    WorkoutLog,
+    WorkoutMonthSummary,
+    WorkoutSession
+)
+
+
+class WorkoutMonthSummaryTestCase(WorkoutManagerTestCase):
+    """
+    Tests the monthly summaries of the workout logs
+    """
+
+    def get_summaries(self, user_id=1):
+        """
+        Helper returning the summaries of a user as comparable tuples
+        """
+        return list(WorkoutMonthSummary.objects.filter(user_id=user_id)
+                    .values_list('date', 'logs', 'sessions', 'days', 'volume'))
+
+    def add_log(self, date, reps=10, weight=20, **kwargs):
+        """
+        Helper adding a log for the admin user
+        """
+        log = WorkoutLog(user_id=1,
+                         workout=Workout.objects.get(pk=1),
+                         exercise=Exercise.objects.get(pk=1),
+                         reps=reps,
+                         weight=weight,
+                         date=date,
+                         **kwargs)
+        log.save()
+        return log
+
+    def test_rebuild(self):
+        """
+        Test that rebuilding gives the same summaries as the fixtures
+        """
+        summaries = {user_id: self.get_summaries(user_id) for user_id in (1, 2)}
+        WorkoutMonthSummary.objects.all().delete()
+        call_command('update-log-summaries')
+        self.assertEqual(self.get_summaries(1), summaries[1])
+        self.assertEqual(self.get_summaries(2), summaries[2])
+        self.assertEqual(summaries[1][0], (datetime.date(2012, 10, 1), 2, 1, 2,
+                                           decimal.Decimal('496')))
+
+    def test_units(self):
+        """
+        Test that only logs in repetitions and kg or lb have a volume, in kg
+        """
+        date = datetime.date(2015, 3, 4)
+        self.add_log(date)
+        self.add_log(date, weight=100, weight_unit_id=2)
+        self.add_log(date, reps=30, repetition_unit_id=3)
+        self.add_log(date, reps=10, weight=2, weight_unit_id=4)
+        summary = (datetime.date(2015, 3, 1), 4, 0, 1, decimal.Decimal('653.59'))
+        self.assertEqual(self.get_summaries()[-1], summary)
+
+        WorkoutMonthSummary.objects.rebuild([1])
+        self.assertEqual(self.get_summaries()[-1], summary)
+
+    def test_add_edit_delete_log(self):
+        """
+        Test that the summary is updated when logs are saved or deleted
+        """
+        log = self.add_log(datetime.date(2015, 3, 4))
+        self.add_log(datetime.date(2015, 3, 4), reps=5, weight=10)
+        self.assertEqual(self.get_summaries()[-1],
+                         (datetime.date(2015, 3, 1), 2, 0, 1, decimal.Decimal('250')))
+
+        # Moving a log to another month updates both months
+        log = WorkoutLog.objects.get(pk=log.pk)
+        log.date = datetime.date(2015, 4, 1)
+        log.save()
+        self.assertEqual(self.get_summaries()[-2:],
+                         [(datetime.date(2015, 3, 1), 1, 0, 1, decimal.Decimal('50')),
+                          (datetime.date(2015, 4, 1), 1, 0, 1, decimal.Decimal('200'))])
+
+        log.delete()
+        self.assertEqual(self.get_summaries()[-1],
+                         (datetime.date(2015, 3, 1), 1, 0, 1, decimal.Decimal('50')))
+        self.assertFalse(WorkoutMonthSummary.objects.filter(date=datetime.date(2015, 4, 1))
+                         .exists())
+
+    def test_unchanged_log(self):
+        """
+        Test that saving a log without changes doesn't read the month again
+        """
+        log = WorkoutLog.objects.get(pk=1)
+        with CaptureQueriesContext(connection) as context:
+            log.save()
+        self.assertFalse([query for query in context.captured_queries
+                          if 'manager_workoutmonthsummary' in query['sql']])
+
+    def test_session(self):
+        """
+        Test that the summary is updated when sessions are saved or deleted
+        """
+        self.add_log(datetime.date(2015, 3, 4))
+        session = WorkoutSession(user_id=1,
+                                 workout=Workout.objects.get(pk=1),
+                                 date=datetime.date(2015, 3, 5))
+        session.save()
+        self.assertEqual(self.get_summaries()[-1],
+                         (datetime.date(2015, 3, 1), 1, 1, 2, decimal.Decimal('200')))
+
+        session = WorkoutSession.objects.get(pk=session.pk)
+        session.date = datetime.date(2015, 3, 4)
+        session.save()
+        self.assertEqual(self.get_summaries()[-1],
+                         (datetime.date(2015, 3, 1), 1, 1, 1, decimal.Decimal('200')))
+
+        session.delete()
+        self.assertEqual(self.get_summaries()[-1],
+                         (datetime.date(2015, 3, 1), 1, 0, 1, decimal.Decimal('200')))
+
+    def test_delete_workout(self):
+        """
+        Test that deleting a workout updates the months of its logs and sessions
+        """
+        Workout.objects.get(pk=1).delete()
+        self.assertEqual(self.get_summaries(),
+                         [(datetime.date(2014, 1, 1), 0, 1, 1, decimal.Decimal('0'))])
+
+    def test_calendar(self):
+        """
+        Test that the calendar lists the months from the summaries
+        """
+        self.user_login('admin')
+        response = self.client.get(reverse('manager:workout:calendar',
+                                           kwargs={'year': 2012, 'month': 10}))
+        self.assertEqual(list(response.context['month_list']),
+                         [datetime.date(2012, 10, 1),
+                          datetime.date(2012, 11, 1),
+                          datetime.date(2013, 10, 1),
+                          datetime.date(2014, 1, 1)])
+        self.assertEqual(len(response.context['logs']), 2)
+
+        # Months without logs are not read
+        response = self.client.get(reverse('manager:workout:calendar',
+                                           kwargs={'year': 2012, 'month': 12}))
+        self.assertFalse(response.context['logs'])
+
+    def test_api(self):
+        """
+        Test the API, filtered by year for e.g. a heatmap
+        """
+        self.user_login('admin')
+        response = self.client.get('/api/v2/workoutmonthsummary/', {'year': 2012})
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual([result['date'] for result in results], ['2012-10-01', '2012-11-01'])
+        self.assertEqual(results[0]['days'], 2)
+
+        self.user_login('test')
+        response = self.client.get('/api/v2/workoutmonthsummary/')
+        self.assertEqual(response.json()['count'], 2)
+
+        self.client.logout()
+        response = self.client.get('/api/v2/workoutmonthsummary/')
+        self.assertEqual(response.status_code, 403)
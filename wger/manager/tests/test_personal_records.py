@@ -0,0 +1,219 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+import datetime
+import decimal
+
+from django.core.management import call_command
+from django.core.urlresolvers import reverse
+
+from wger.core.tests.base_testcase import WorkoutManagerTestCase
+from wger.exercises.models import Exercise
+from wger.manager.helpers import estimate_one_rep_max
+from wger.manager.models import (
+    PersonalRecord,
+    Workout,
+    WorkoutLog
+)
+from wger.manager.views.workout import LastWeightHelper
+
+
+class PersonalRecordTestCase(WorkoutManagerTestCase):
+    """
+    Tests the personal records
+    """
+
+    def get_record(self, reps=8, weight_unit=1):
+        """
+        Helper returning the record of the admin user for exercise 1 as tuple
+        """
+        record = PersonalRecord.objects.get(user=1, exercise=1, reps=reps, weight_unit=weight_unit)
+        return record.weight, record.date, record.last_weight, record.last_date
+
+    def add_log(self, date, weight, reps=8, **kwargs):
+        """
+        Helper adding a log for exercise 1 of the admin user
+        """
+        log = WorkoutLog(user_id=1,
+                         workout=Workout.objects.get(pk=1),
+                         exercise=Exercise.objects.get(pk=1),
+                         reps=reps,
+                         weight=weight,
+                         date=date,
+                         **kwargs)
+        log.save()
+        return log
+
+    def test_estimate_one_rep_max(self):
+        """
+        Test the estimation of the one repetition maximum
+        """
+        self.assertEqual(estimate_one_rep_max(100, 1), decimal.Decimal('100.00'))
+        self.assertEqual(estimate_one_rep_max(100, 10), decimal.Decimal('133.33'))
+        self.assertEqual(estimate_one_rep_max(decimal.Decimal('38'), 8), decimal.Decimal('48.13'))
+
+    def test_rebuild(self):
+        """
+        Test that rebuilding gives the same records as the fixtures
+        """
+        fields = ('user', 'exercise', 'reps', 'weight_unit', 'weight', 'date', 'one_rep_max',
+                  'last_weight', 'last_date')
+        records = list(PersonalRecord.objects.order_by('user').values_list(*fields))
+        PersonalRecord.objects.all().delete()
+        call_command('update-personal-records')
+        self.assertEqual(list(PersonalRecord.objects.order_by('user').values_list(*fields)),
+                         records)
+
+    def test_add_log(self):
+        """
+        Test that new logs update the record
+        """
+        date = datetime.date(2013, 10, 30)
+        self.add_log(datetime.date(2013, 10, 1), 35)
+        self.assertEqual(self.get_record(), (38, date, 38, date))
+
+        self.add_log(datetime.date(2014, 1, 1), 36)
+        self.assertEqual(self.get_record(), (38, date, 36, datetime.date(2014, 1, 1)))
+
+        # The same weight again is not a new record
+        self.add_log(datetime.date(2014, 2, 1), 38)
+        self.assertEqual(self.get_record(), (38, date, 38, datetime.date(2014, 2, 1)))
+
+        self.add_log(datetime.date(2014, 3, 1), decimal.Decimal('40.5'))
+        record = PersonalRecord.objects.get(user=1, exercise=1, reps=8)
+        self.assertEqual(record.weight, decimal.Decimal('40.5'))
+        self.assertEqual(record.date, datetime.date(2014, 3, 1))
+        self.assertEqual(record.one_rep_max, decimal.Decimal('51.30'))
+
+        # New combination of repetitions
+        self.add_log(datetime.date(2014, 3, 1), 50, reps=5)
+        self.assertEqual(self.get_record(reps=5), (50, datetime.date(2014, 3, 1),
+                                                   50, datetime.date(2014, 3, 1)))
+
+    def test_other_units(self):
+        """
+        Test that only logs in repetitions with a weight count
+        """
+        count = PersonalRecord.objects.count()
+        self.add_log(datetime.date(2014, 1, 1), 100, repetition_unit_id=3)
+        self.add_log(datetime.date(2014, 1, 1), 100, weight_unit_id=3)
+        self.add_log(datetime.date(2014, 1, 1), 100, reps=0)
+        self.assertEqual(PersonalRecord.objects.count(), count)
+
+        self.add_log(datetime.date(2014, 1, 1), 100, weight_unit_id=2)
+        self.assertEqual(self.get_record(weight_unit=2), (100, datetime.date(2014, 1, 1),
+                                                          100, datetime.date(2014, 1, 1)))
+        self.assertEqual(self.get_record()[0], 38)
+
+    def test_edit_delete_log(self):
+        """
+        Test that the record is calculated again when logs are edited or deleted
+        """
+        log = WorkoutLog.objects.get(pk=3)
+        log.weight = 31
+        log.save()
+        self.assertEqual(self.get_record(), (32, datetime.date(2012, 10, 10),
+                                             31, datetime.date(2013, 10, 30)))
+
+        # Moving the log to other repetitions updates both records
+        log.reps = 10
+        log.save()
+        self.assertEqual(self.get_record(), (32, datetime.date(2012, 10, 10),
+                                             30, datetime.date(2012, 11, 1)))
+        self.assertEqual(self.get_record(reps=10), (31, datetime.date(2013, 10, 30),
+                                                    31, datetime.date(2013, 10, 30)))
+
+        log.delete()
+        self.assertFalse(PersonalRecord.objects.filter(user=1, reps=10).exists())
+
+    def test_delete_workout(self):
+        """
+        Test that deleting a workout deletes the records of its logs
+        """
+        Workout.objects.get(pk=1).delete()
+        self.assertFalse(PersonalRecord.objects.filter(user=1).exists())
+        self.assertTrue(PersonalRecord.objects.filter(user=2).exists())
+
+    def test_delete_session_logs(self):
+        """
+        Test that deleting a session together with its logs updates the records
+        """
+        self.add_log(datetime.date(2012, 10, 1), 999)
+        self.assertEqual(self.get_record()[0], 999)
+
+        self.user_login('admin')
+        response = self.client.post(reverse('manager:session:delete',
+                                            kwargs={'pk': 1, 'logs': 'logs'}))
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.get_record(), (38, datetime.date(2013, 10, 30),
+                                             38, datetime.date(2013, 10, 30)))
+
+    def test_calendar(self):
+        """
+        Test that the calendar marks the logs that set a record
+        """
+        self.user_login('admin')
+        response = self.client.get(reverse('manager:workout:calendar',
+                                           kwargs={'year': 2013, 'month': 10}))
+        log = list(response.context['logs'][datetime.date(2013, 10, 30)]['logs'].values())[0][0]
+        self.assertTrue(log.is_record)
+        self.assertContains(response, 'fa-trophy')
+
+        response = self.client.get(reverse('manager:workout:calendar',
+                                           kwargs={'year': 2012, 'month': 10}))
+        self.assertNotContains(response, 'fa-trophy')
+
+        response = self.client.get(reverse('manager:workout:calendar-day',
+                                           kwargs={'username': 'admin',
+                                                   'year': 2013,
+                                                   'month': 10,
+                                                   'day': 30}))
+        self.assertContains(response, 'fa-trophy')
+
+    def test_last_weight(self):
+        """
+        Test that the timer's default weights come from the records
+        """
+        exercise = Exercise.objects.get(pk=1)
+        helper = LastWeightHelper(WorkoutLog.objects.get(pk=1).user)
+        with self.assertNumQueries(1):
+            self.assertEqual(helper.get_last_weight(exercise, 8, 20), 38)
+
+        # Repetitions without a record are looked up once in the logs
+        with self.assertNumQueries(1):
+            self.assertEqual(helper.get_last_weight(exercise, 10, 20), 20)
+            self.assertEqual(helper.get_last_weight(exercise, 10, None), '')
+
+    def test_last_weight_other_units(self):
+        """
+        Test the timer's default weights of logs that can't set a record
+        """
+        self.add_log(datetime.date(2014, 1, 1), 15, reps=12, weight_unit_id=3)
+        helper = LastWeightHelper(WorkoutLog.objects.get(pk=1).user)
+        self.assertEqual(helper.get_last_weight(Exercise.objects.get(pk=1), 12, 20), 15)
+
+    def test_api(self):
+        """
+        Test the API
+        """
+        self.user_login('admin')
+        response = self.client.get('/api/v2/personalrecord/', {'exercise': 1})
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]['reps'], 8)
+        self.assertEqual(results[0]['one_rep_max'], '48.13')
+
+        self.client.logout()
+        self.assertEqual(self.client.get('/api/v2/personalrecord/').status_code, 403)
@@ -0,0 +1,213 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+import datetime
+import decimal
+
+from django.core.management import call_command
+from django.core.urlresolvers import reverse
+
+from wger.core.tests.base_testcase import WorkoutManagerTestCase
+from wger.exercises.models import (
+    Exercise,
+    Muscle
+)
+from wger.manager.models import (
+    WeeklyMuscleVolume,
+    Workout,
+    WorkoutLog
+)
+
+
+class WeeklyMuscleVolumeTestCase(WorkoutManagerTestCase):
+    """
+    Tests the weekly volume per muscle
+    """
+
+    fields = ('user', 'date', 'muscle', 'sets', 'volume', 'secondary_sets', 'secondary_volume')
+
+    def get_week(self, date, user=1):
+        """
+        Helper returning the volume of a week as comparable tuples
+        """
+        return list(WeeklyMuscleVolume.objects.filter(user=user, date=date).order_by('muscle_id')
+                    .values_list('muscle', 'sets', 'volume', 'secondary_sets', 'secondary_volume'))
+
+    def test_rebuild(self):
+        """
+        Test that rebuilding gives the same volume as the fixtures
+        """
+        volumes = list(WeeklyMuscleVolume.objects.order_by('user', 'date', 'muscle')
+                       .values_list(*self.fields))
+        WeeklyMuscleVolume.objects.all().delete()
+        call_command('update-weekly-volume')
+        self.assertEqual(list(WeeklyMuscleVolume.objects.order_by('user', 'date', 'muscle')
+                              .values_list(*self.fields)),
+                         volumes)
+        self.assertEqual(len(volumes), 15)
+
+    def test_add_edit_delete_log(self):
+        """
+        Test that the volume is updated when logs are saved or deleted
+        """
+        week = datetime.date(2012, 10, 1)
+        log = WorkoutLog(user_id=1,
+                         workout=Workout.objects.get(pk=1),
+                         exercise=Exercise.objects.get(pk=2),
+                         reps=10,
+                         weight=50,
+                         date=datetime.date(2012, 10, 3))
+        log.save()
+        self.assertEqual(self.get_week(week),
+                         [(1, 1, decimal.Decimal(240), 1, decimal.Decimal(500)),
+                          (2, 2, decimal.Decimal(740), 0, decimal.Decimal(0)),
+                          (3, 0, decimal.Decimal(0), 2, decimal.Decimal(740))])
+
+        # Moving the log to another week updates both weeks
+        log = WorkoutLog.objects.get(pk=log.pk)
+        log.date = datetime.date(2015, 1, 1)
+        log.save()
+        self.assertEqual(self.get_week(week),
+                         [(1, 1, decimal.Decimal(240), 0, decimal.Decimal(0)),
+                          (2, 1, decimal.Decimal(240), 0, decimal.Decimal(0)),
+                          (3, 0, decimal.Decimal(0), 1, decimal.Decimal(240))])
+        self.assertEqual(len(self.get_week(datetime.date(2014, 12, 29))), 3)
+
+        log.delete()
+        self.assertFalse(self.get_week(datetime.date(2014, 12, 29)))
+
+    def test_units(self):
+        """
+        Test that only logs in repetitions and kg or lb have a volume, in kg
+        """
+        week = datetime.date(2015, 3, 2)
+        for reps, weight, units in ((10, 20, {}),
+                                    (10, 100, {'weight_unit_id': 2}),
+                                    (30, 20, {'repetition_unit_id': 3}),
+                                    (10, 2, {'weight_unit_id': 4})):
+            WorkoutLog(user_id=1,
+                       workout=Workout.objects.get(pk=1),
+                       exercise=Exercise.objects.get(pk=2),
+                       reps=reps,
+                       weight=weight,
+                       date=datetime.date(2015, 3, 4),
+                       **units).save()
+        volume = [(1, 0, decimal.Decimal(0), 4, decimal.Decimal('653.59')),
+                  (2, 4, decimal.Decimal('653.59'), 0, decimal.Decimal(0)),
+                  (3, 0, decimal.Decimal(0), 4, decimal.Decimal('653.59'))]
+        self.assertEqual(self.get_week(week), volume)
+
+        WeeklyMuscleVolume.objects.rebuild([1])
+        self.assertEqual(self.get_week(week), volume)
+
+    def test_delete_workout(self):
+        """
+        Test that deleting a workout removes the volume of its logs
+        """
+        Workout.objects.get(pk=1).delete()
+        self.assertFalse(WeeklyMuscleVolume.objects.filter(user=1).exists())
+        self.assertTrue(WeeklyMuscleVolume.objects.filter(user=2).exists())
+
+    def test_delete_session_logs(self):
+        """
+        Test that deleting a session together with its logs removes their volume
+        """
+        self.assertTrue(self.get_week(datetime.date(2012, 10, 1)))
+        self.user_login('admin')
+        response = self.client.post(reverse('manager:session:delete',
+                                            kwargs={'pk': 1, 'logs': 'logs'}))
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(self.get_week(datetime.date(2012, 10, 1)))
+        self.assertTrue(self.get_week(datetime.date(2012, 10, 8)))
+
+    def test_change_muscles(self):
+        """
+        Test that changing the muscles of an exercise updates the volume
+        """
+        exercise = Exercise.objects.get(pk=1)
+        exercise.muscles_secondary.clear()
+        self.assertEqual([muscle for muscle, sets, volume, secondary_sets, secondary_volume
+                          in self.get_week(datetime.date(2012, 10, 1))],
+                         [1, 2])
+
+        exercise.muscles.remove(2)
+        self.assertEqual([muscle for muscle, sets, volume, secondary_sets, secondary_volume
+                          in self.get_week(datetime.date(2012, 10, 1))],
+                         [1])
+
+        # The volume of the other user is not changed
+        self.assertEqual(len(self.get_week(datetime.date(2012, 10, 29), user=2)), 3)
+
+        exercise.muscles.add(2)
+        exercise.muscles_secondary.add(3)
+        self.assertEqual([muscle for muscle, sets, volume, secondary_sets, secondary_volume
+                          in self.get_week(datetime.date(2012, 10, 1))],
+                         [1, 2, 3])
+
+    def test_change_muscles_rows(self):
+        """
+        Test that only the rows of the changed muscles are calculated again
+        """
+        exercise = Exercise.objects.get(pk=1)
+        muscle_ids = list(exercise.muscles.values_list('pk', flat=True))
+        user_ids = list(WorkoutLog.objects.filter(exercise=exercise)
+                        .values_list('user', flat=True).distinct())
+        WeeklyMuscleVolume.objects.update(sets=99)
+        changed = WeeklyMuscleVolume.objects.filter(user__in=user_ids, muscle__in=muscle_ids)
+        self.assertTrue(changed.exists())
+        unchanged = WeeklyMuscleVolume.objects.count() - changed.count()
+
+        exercise.muscles.clear()
+        self.assertEqual(WeeklyMuscleVolume.objects.filter(sets=99).count(), unchanged)
+
+    def test_change_muscles_reverse(self):
+        """
+        Test that changing the exercises of a muscle updates the volume
+        """
+        muscle = Muscle.objects.get(pk=2)
+        muscle.exercise_set.clear()
+        self.assertEqual([muscle for muscle, sets, volume, secondary_sets, secondary_volume
+                          in self.get_week(datetime.date(2012, 10, 1))],
+                         [1, 3])
+
+        muscle.exercise_set.add(1)
+        self.assertIn(2, [muscle for muscle, sets, volume, secondary_sets, secondary_volume
+                          in self.get_week(datetime.date(2012, 10, 1))])
+
+    def test_api(self):
+        """
+        Test the API, which returns a whole year without pagination
+        """
+        self.user_login('admin')
+        response = self.client.get('/api/v2/weeklymusclevolume/', {'year': 2012})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 9)
+        self.assertEqual(response.json()[0], {'id': 1,
+                                              'date': '2012-10-01',
+                                              'muscle': 1,
+                                              'sets': 1,
+                                              'volume': '240.00',
+                                              'secondary_sets': 0,
+                                              'secondary_volume': '0.00'})
+
+        response = self.client.get('/api/v2/weeklymusclevolume/', {'year': 2012, 'muscle': 3})
+        self.assertEqual(len(response.json()), 3)
+
+        # The current year by default
+        response = self.client.get('/api/v2/weeklymusclevolume/')
+        self.assertEqual(response.json(), [])
+
+        self.client.logout()
+        response = self.client.get('/api/v2/weeklymusclevolume/')
+        self.assertEqual(response.status_code, 403)
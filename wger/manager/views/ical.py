@@ -15,19 +15,29 @@
 # You should have received a copy of the GNU Affero General Public License
 
 import six
+import hashlib
 import logging
 import datetime
+import time
 
 from icalendar import Calendar
 from icalendar import Event
-from icalendar.tools import UIDGenerator
 
 from django.shortcuts import get_object_or_404
 from django.http import HttpResponse, HttpResponseForbidden
 from django.contrib.sites.models import Site
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.encoding import force_bytes
+from django.utils.http import (
+    http_date,
+    quote_etag
+)
 
 from wger import get_version
 from wger.manager.models import Workout, Schedule
+from wger.utils import pdf_cache
+from wger.utils.cache import cache_mapper
 from wger.utils.helpers import next_weekday, check_token
 
 
@@ -44,8 +54,18 @@ to make this work, looking at the module test files or the official RF is
 
 * https://tools.ietf.org/html/rfc5545
 * https://github.com/collective/icalendar/tree/master/src/icalendar/tests
+
+The files can also be subscribed to with the token URLs. Since calendar
+applications poll them regularly, the serialized files are cached until the
+workout or schedule changes (using the same versions as the cached PDFs, see
+wger.utils.pdf_cache) and clients that send the ETag or the date of their copy
+get a "304 Not Modified" response. The events have deterministic UIDs, so the
+clients recognize them again after every update.
 '''
 
+REFRESH_INTERVAL = 'PT1H'
+'''How often calendar applications should fetch subscribed files again'''
+
 
 # Helper functions
 def get_calendar():
@@ -57,10 +77,13 @@ def get_calendar():
     calendar = Calendar()
     calendar.add('prodid', '-//wger Workout Manager//wger.de//')
     calendar.add('version', get_version())
+    calendar.add('refresh-interval', REFRESH_INTERVAL, parameters={'value': 'DURATION'})
+    calendar.add('x-published-ttl', REFRESH_INTERVAL)
     return calendar
 
 
-def get_events_workout(calendar, workout, duration, start_date=None):
+def get_events_workout(calendar, workout, duration, start_date=None, uid_prefix=None,
+                       domain=None):
     """
     Creates all necessary events from the given workout and adds them to
     the calendar. Each event's occurrence ist set to weekly (one event for
@@ -70,13 +93,15 @@ def get_events_workout(calendar, workout, duration, start_date=None):
     :param workout: Workout
     :param duration: duration in weeks
     :param start_date: start date, default: profile default
+    :param uid_prefix: start of the event UIDs, default: the workout's ID
+    :param domain: the site's domain, used in the event UIDs
     :return: None
     """
 
     start_date = start_date if start_date else workout.creation_date
     end_date = start_date + datetime.timedelta(weeks=duration)
-    generator = UIDGenerator()
-    site = Site.objects.get_current()
+    uid_prefix = uid_prefix if uid_prefix else u'workout-{0}'.format(workout.pk)
+    domain = domain if domain else Site.objects.get_current().domain
 
     for day in workout.canonical_representation['day_list']:
 
@@ -95,11 +120,52 @@ def get_events_workout(calendar, workout, duration, start_date=None):
             event.add('dtstart', next_weekday(start_date, weekday.id - 1))
             event.add('dtend', next_weekday(start_date, weekday.id - 1))
             event.add('rrule', {'freq': 'weekly', 'until': end_date})
-            event['uid'] = generator.uid(host_name=site.domain)
+            event['uid'] = u'{0}-day-{1}-{2}@{3}'.format(uid_prefix,
+                                                         day['obj'].pk,
+                                                         weekday.id,
+                                                         domain)
             event.add('priority', 5)
             calendar.add_component(event)
 
 
+def get_ical_response(request, build, filename, kind, pk, dependencies=(), extra=()):
+    """
+    Returns the iCal file of an object, calling build only if it is not cached
+
+    :param request: the current request
+    :param build: function that returns the Calendar, gets the site's domain
+    :param filename: the name of the downloaded file
+    :param kind: the kind of object, e.g. 'workout', used for its version
+    :param pk: the object's primary key
+    :param dependencies: (kind, pk) tuples of other objects in the calendar
+    :param extra: other values the content depends on
+    """
+    domain = Site.objects.get_current().domain
+    key = [kind, pk, pdf_cache.get_version(kind, pk)]
+    key += [pdf_cache.get_version(dependency_kind, dependency_pk)
+            for dependency_kind, dependency_pk in dependencies]
+    key += list(extra) + [domain]
+    etag = hashlib.sha1(force_bytes(u':'.join([six.text_type(i) for i in key]))).hexdigest()
+
+    cache_key = cache_mapper.get_ical_key(kind, pk)
+    cached = cache.get(cache_key)
+    if cached and cached[0] == etag:
+        etag, last_modified, content = cached
+    else:
+        content = build(domain).to_ical()
+        last_modified = int(time.time())
+        cache.set(cache_key, (etag, last_modified, content))
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = HttpResponse(content, content_type='text/calendar')
+        response['Content-Disposition'] = 'attachment; filename={0}'.format(filename)
+        response['Content-Length'] = len(content)
+    response['ETag'] = quote_etag(etag)
+    response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
 # Views
 def export(request, pk, uidb64=None, token=None):
     """
@@ -107,29 +173,30 @@ def export(request, pk, uidb64=None, token=None):
     """
 
     # Load the workout
+    workouts = Workout.objects.select_related('user__userprofile')
     if uidb64 is not None and token is not None:
         if check_token(uidb64, token):
-            workout = get_object_or_404(Workout, pk=pk)
+            workout = get_object_or_404(workouts, pk=pk)
         else:
             return HttpResponseForbidden()
     else:
         if request.user.is_anonymous():
             return HttpResponseForbidden()
-        workout = get_object_or_404(Workout, pk=pk, user=request.user)
+        workout = get_object_or_404(workouts, pk=pk, user=request.user)
 
-    # Create the calendar
-    calendar = get_calendar()
+    duration = workout.user.userprofile.workout_duration
 
-    # Create the events and add them to the calendar
-    get_events_workout(calendar, workout, workout.user.userprofile.workout_duration)
+    def build(domain):
+        calendar = get_calendar()
+        get_events_workout(calendar, workout, duration, domain=domain)
+        return calendar
 
-    # Send the file to the user
-    response = HttpResponse(content_type='text/calendar')
-    response['Content-Disposition'] = \
-        'attachment; filename=Calendar-workout-{0}.ics'.format(workout.pk)
-    response.write(calendar.to_ical())
-    response['Content-Length'] = len(response.content)
-    return response
+    return get_ical_response(request,
+                             build,
+                             'Calendar-workout-{0}.ics'.format(workout.pk),
+                             'workout',
+                             workout.pk,
+                             extra=[duration])
 
 
 def export_schedule(request, pk, uidb64=None, token=None):
@@ -148,19 +215,27 @@ def export_schedule(request, pk, uidb64=None, token=None):
             return HttpResponseForbidden()
         schedule = get_object_or_404(Schedule, pk=pk, user=request.user)
 
-    # Create the calendar
-    calendar = get_calendar()
-
-    # Create the events and add them to the calendar
-    start_date = datetime.date.today()
-    for step in schedule.schedulestep_set.all():
-        get_events_workout(calendar, step.workout, step.duration, start_date)
-        start_date = start_date + datetime.timedelta(weeks=step.duration)
-
-    # Send the file to the user
-    response = HttpResponse(content_type='text/calendar')
-    response['Content-Disposition'] = \
-        'attachment; filename=Calendar-schedule-{0}.ics'.format(schedule.pk)
-    response.write(calendar.to_ical())
-    response['Content-Length'] = len(response.content)
-    return response
+    # The schedule starts today, so the file changes every day
+    today = datetime.date.today()
+    steps = list(schedule.schedulestep_set.select_related('workout'))
+
+    def build(domain):
+        calendar = get_calendar()
+        start_date = today
+        for step in steps:
+            get_events_workout(calendar,
+                               step.workout,
+                               step.duration,
+                               start_date,
+                               uid_prefix=u'schedule-{0}-step-{1}'.format(schedule.pk, step.pk),
+                               domain=domain)
+            start_date = start_date + datetime.timedelta(weeks=step.duration)
+        return calendar
+
+    return get_ical_response(request,
+                             build,
+                             'Calendar-schedule-{0}.ics'.format(schedule.pk),
+                             'schedule',
+                             schedule.pk,
+                             dependencies=[('workout', step.workout_id) for step in steps],
+                             extra=[today])
@@ -17,6 +17,7 @@
 import logging
 import uuid
 import datetime
+from collections import OrderedDict
 
 from django.contrib.auth.mixins import PermissionRequiredMixin, LoginRequiredMixin
 from django.shortcuts import render
@@ -38,6 +39,7 @@ from wger.manager.models import (
     WorkoutSession,
     Day,
     WorkoutLog,
+    WorkoutMonthSummary,
     Schedule
 )
 from wger.manager.forms import (
@@ -50,7 +52,11 @@ from wger.utils.generic_views import (
     WgerDeleteMixin
 )
 from wger.utils.helpers import check_access
-from wger.weight.helpers import process_log_entries, group_log_entries
+from wger.weight.helpers import (
+    group_log_entries,
+    mark_personal_records,
+    process_log_entries
+)
 
 
 logger = logging.getLogger(__name__)
@@ -303,7 +309,13 @@ def calendar(request, username=None, year=None, month=None):
     month = int(month) if month else datetime.date.today().month
 
     (current_workout, schedule) = Schedule.objects.get_current_workout(user)
-    grouped_log_entries = group_log_entries(user, year, month)
+    month_list = list(WorkoutMonthSummary.objects.filter(user=user)
+                      .values_list('date', flat=True))
+    if datetime.date(year, month, 1) in month_list:
+        grouped_log_entries = group_log_entries(user, year, month)
+    else:
+        grouped_log_entries = OrderedDict()
+    mark_personal_records(user, grouped_log_entries)
 
     context['calendar'] = WorkoutCalendar(grouped_log_entries).formatmonth(year, month)
     context['logs'] = grouped_log_entries
@@ -313,7 +325,7 @@ def calendar(request, username=None, year=None, month=None):
     context['owner_user'] = user
     context['is_owner'] = is_owner
     context['impressions'] = WorkoutSession.IMPRESSION
-    context['month_list'] = WorkoutLog.objects.filter(user=user).dates('date', 'month')
+    context['month_list'] = month_list
     context['show_shariff'] = is_owner and user.userprofile.ro_access
     return render(request, 'calendar/month.html', context)
 
@@ -331,6 +343,7 @@ def day(request, username, year, month, day):
         logger.error("Error on date: {0}".format(e))
         return HttpResponseForbidden()
     context['logs'] = group_log_entries(user, date.year, date.month, date.day)
+    mark_personal_records(user, context['logs'])
     context['date'] = date
     context['owner_user'] = user
     context['is_owner'] = is_owner
@@ -17,7 +17,6 @@
 import logging
 import datetime
 
-from django.http import HttpResponse
 from django.http import HttpResponseForbidden
 from django.shortcuts import get_object_or_404
 from django.utils.translation import ugettext as _
@@ -27,6 +26,7 @@ from wger.manager.helpers import render_workout_day
 from wger.utils.helpers import check_token
 from wger.utils.pdf import styleSheet
 from wger.utils.pdf import render_footer
+from wger.utils.pdf_cache import get_pdf_response
 
 from reportlab.lib.pagesizes import A4, cm
 from reportlab.platypus import (
@@ -43,31 +43,14 @@ from wger import get_version
 logger = logging.getLogger(__name__)
 
 
-def workout_log(request, id, images=False, comments=False, uidb64=None, token=None):
+def render_workout_pdf(response, workout, username, url, images=False, comments=False,
+                       only_table=False):
     """
-    Generates a PDF with the contents of the given workout
+    Writes the PDF of a workout to the response (or any other file like object)
 
-    See also
-    * http://www.blog.pythonlibrary.org/2010/09/21/reportlab
-    * http://www.reportlab.com/apis/reportlab/dev/platypus.html
+    :param username: the name of the user the workout is for
+    :param url: the absolute URL of the workout, shown in the footer
     """
-    comments = bool(int(comments))
-    images = bool(int(images))
-
-    # Load the workout
-    if uidb64 is not None and token is not None:
-        if check_token(uidb64, token):
-            workout = get_object_or_404(Workout, pk=id)
-        else:
-            return HttpResponseForbidden()
-    else:
-        if request.user.is_anonymous():
-            return HttpResponseForbidden()
-        workout = get_object_or_404(Workout, pk=id, user=request.user)
-
-    # Create the HttpResponse object with the appropriate PDF headers.
-    response = HttpResponse(content_type='application/pdf')
-
     # Create the PDF object, using the response object as its "file."
     doc = SimpleDocTemplate(response,
                             pagesize=A4,
@@ -78,7 +61,7 @@ def workout_log(request, id, images=False, comments=False, uidb64=None, token=No
                             bottomMargin=0.5 * cm,
                             title=_('Workout'),
                             author='wger Workout Manager',
-                            subject=_('Workout for %s') % request.user.username)
+                            subject=_('Workout for %s') % username)
 
     # container for the 'Flowable' objects
     elements = []
@@ -92,33 +75,28 @@ def workout_log(request, id, images=False, comments=False, uidb64=None, token=No
 
     # Iterate through the Workout and render the training days
     for day in workout.canonical_representation['day_list']:
-        elements.append(render_workout_day(day, images=images, comments=comments))
+        elements.append(render_workout_day(day,
+                                           images=images,
+                                           comments=comments,
+                                           only_table=only_table))
         elements.append(Spacer(10 * cm, 0.5 * cm))
 
     # Footer, date and info
     elements.append(Spacer(10 * cm, 0.5 * cm))
-    elements.append(render_footer(request.build_absolute_uri(workout.get_absolute_url())))
+    elements.append(render_footer(url))
 
     # write the document and send the response to the browser
     doc.build(elements)
 
-    # Create the HttpResponse object with the appropriate PDF headers.
-    response['Content-Disposition'] = 'attachment; filename=Workout-{0}-log.pdf'.format(id)
-    response['Content-Length'] = len(response.content)
-    return response
-
 
-def workout_view(request, id, images=False, comments=False, uidb64=None, token=None):
-    """
-    Generates a PDF with the contents of the workout, without table for logs
+def workout_log(request, id, images=False, comments=False, uidb64=None, token=None):
     """
-
-    '''
     Generates a PDF with the contents of the given workout
+
     See also
     * http://www.blog.pythonlibrary.org/2010/09/21/reportlab
     * http://www.reportlab.com/apis/reportlab/dev/platypus.html
-    '''
+    """
     comments = bool(int(comments))
     images = bool(int(images))
 
@@ -133,43 +111,48 @@ def workout_view(request, id, images=False, comments=False, uidb64=None, token=N
             return HttpResponseForbidden()
         workout = get_object_or_404(Workout, pk=id, user=request.user)
 
-    # Create the HttpResponse object with the appropriate PDF headers.
-    response = HttpResponse(content_type='application/pdf')
+    url = request.build_absolute_uri(workout.get_absolute_url())
+    return get_pdf_response(request,
+                            lambda response: render_workout_pdf(response,
+                                                                workout,
+                                                                request.user.username,
+                                                                url,
+                                                                images=images,
+                                                                comments=comments),
+                            'Workout-{0}-log.pdf'.format(id),
+                            'workout',
+                            workout.pk,
+                            options=('log', int(images), int(comments)))
 
-    # Create the PDF object, using the response object as its "file."
-    doc = SimpleDocTemplate(response,
-                            pagesize=A4,
-                            leftMargin=cm,
-                            rightMargin=cm,
-                            topMargin=0.5 * cm,
-                            bottomMargin=0.5 * cm,
-                            title=_('Workout'),
-                            author='wger Workout Manager',
-                            subject=_('Workout for %s') % request.user.username)
-
-    # container for the 'Flowable' objects
-    elements = []
-
-    # Set the title
-    p = Paragraph('<para align="center"><strong>%(description)s</strong></para>' %
-                  {'description': workout},
-                  styleSheet["HeaderBold"])
-    elements.append(p)
-    elements.append(Spacer(10 * cm, 0.5 * cm))
 
-    # Iterate through the Workout and render the training days
-    for day in workout.canonical_representation['day_list']:
-        elements.append(render_workout_day(day, images=images, comments=comments, only_table=True))
-        elements.append(Spacer(10 * cm, 0.5 * cm))
-
-    # Footer, date and info
-    elements.append(Spacer(10 * cm, 0.5 * cm))
-    elements.append(render_footer(request.build_absolute_uri(workout.get_absolute_url())))
+def workout_view(request, id, images=False, comments=False, uidb64=None, token=None):
+    """
+    Generates a PDF with the contents of the workout, without table for logs
+    """
+    comments = bool(int(comments))
+    images = bool(int(images))
 
-    # write the document and send the response to the browser
-    doc.build(elements)
+    # Load the workout
+    if uidb64 is not None and token is not None:
+        if check_token(uidb64, token):
+            workout = get_object_or_404(Workout, pk=id)
+        else:
+            return HttpResponseForbidden()
+    else:
+        if request.user.is_anonymous():
+            return HttpResponseForbidden()
+        workout = get_object_or_404(Workout, pk=id, user=request.user)
 
-    # Create the HttpResponse object with the appropriate PDF headers.
-    response['Content-Disposition'] = 'attachment; filename=Workout-{0}-table.pdf'.format(id)
-    response['Content-Length'] = len(response.content)
-    return response
+    url = request.build_absolute_uri(workout.get_absolute_url())
+    return get_pdf_response(request,
+                            lambda response: render_workout_pdf(response,
+                                                                workout,
+                                                                request.user.username,
+                                                                url,
+                                                                images=images,
+                                                                comments=comments,
+                                                                only_table=True),
+                            'Workout-{0}-table.pdf'.format(id),
+                            'workout',
+                            workout.pk,
+                            options=('table', int(images), int(comments)))
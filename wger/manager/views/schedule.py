@@ -20,8 +20,7 @@ import datetime
 from django.shortcuts import render, get_object_or_404
 from django.http import (
     HttpResponseRedirect,
-    HttpResponseForbidden,
-    HttpResponse
+    HttpResponseForbidden
 )
 from django.core.urlresolvers import reverse_lazy, reverse
 from django.utils.translation import ugettext_lazy, ugettext as _
@@ -49,6 +48,7 @@ from wger.utils.generic_views import (
 )
 from wger.utils.helpers import make_token, check_token
 from wger.utils.pdf import styleSheet, render_footer
+from wger.utils.pdf_cache import get_pdf_response
 
 
 logger = logging.getLogger(__name__)
@@ -97,29 +97,15 @@ def view(request, pk):
     return render(request, 'schedule/view.html', template_data)
 
 
-def export_pdf_log(request, pk, images=False, comments=False, uidb64=None, token=None):
-    """
-    Show the workout schedule
+def render_schedule_pdf(response, schedule, username, url, images=False, comments=False,
+                        only_table=False):
     """
-    user = request.user
-
-    comments = bool(int(comments))
-    images = bool(int(images))
-
-    # Load the workout
-    if uidb64 is not None and token is not None:
-        if check_token(uidb64, token):
-            schedule = get_object_or_404(Schedule, pk=pk)
-        else:
-            return HttpResponseForbidden()
-    else:
-        if request.user.is_anonymous():
-            return HttpResponseForbidden()
-        schedule = get_object_or_404(Schedule, pk=pk, user=user)
+    Writes the PDF of a schedule to the response (or any other file like object)
 
-    # Create the HttpResponse object with the appropriate PDF headers.
-    # and use it to the create the PDF using it as a file like object
-    response = HttpResponse(content_type='application/pdf')
+    :param username: the name of the user the schedule is for
+    :param url: the absolute URL of the schedule, shown in the footer
+    """
+    # Create the PDF using the response as a file like object
     doc = SimpleDocTemplate(response,
                             pagesize=A4,
                             leftMargin=cm,
@@ -128,7 +114,7 @@ def export_pdf_log(request, pk, images=False, comments=False, uidb64=None, token
                             bottomMargin=0.5 * cm,
                             title=_('Workout'),
                             author='wger Workout Manager',
-                            subject='Schedule for {0}'.format(request.user.username))
+                            subject='Schedule for {0}'.format(username))
 
     # container for the 'Flowable' objects
     elements = []
@@ -147,27 +133,22 @@ def export_pdf_log(request, pk, images=False, comments=False, uidb64=None, token
 
         for day in step.workout.canonical_representation['day_list']:
             elements.append(
-                render_workout_day(day, images=images, comments=comments, nr_of_weeks=7))
+                render_workout_day(day, images=images, comments=comments, nr_of_weeks=7,
+                                   only_table=only_table))
             elements.append(Spacer(10 * cm, 0.5 * cm))
 
     # Footer, date and info
     elements.append(Spacer(10 * cm, 0.5 * cm))
-    url = reverse('manager:schedule:view', kwargs={'pk': schedule.id})
-    elements.append(render_footer(request.build_absolute_uri(url)))
+    elements.append(render_footer(url))
 
     # write the document and send the response to the browser
     doc.build(elements)
-    response['Content-Disposition'] = 'attachment; filename=Schedule-{0}-log.pdf'.format(pk)
-    response['Content-Length'] = len(response.content)
-    return response
 
 
-def export_pdf_table(request, pk, images=False, comments=False, uidb64=None, token=None):
+def export_pdf(request, pk, images, comments, uidb64, token, only_table):
     """
-    Show the workout schedule
+    Common code for the PDF exports of a schedule
     """
-    user = request.user
-
     comments = bool(int(comments))
     images = bool(int(images))
 
@@ -180,52 +161,38 @@ def export_pdf_table(request, pk, images=False, comments=False, uidb64=None, tok
     else:
         if request.user.is_anonymous():
             return HttpResponseForbidden()
-        schedule = get_object_or_404(Schedule, pk=pk, user=user)
-
-    # Create the HttpResponse object with the appropriate PDF headers.
-    # and use it to the create the PDF using it as a file like object
-    response = HttpResponse(content_type='application/pdf')
-    doc = SimpleDocTemplate(response,
-                            pagesize=A4,
-                            leftMargin=cm,
-                            rightMargin=cm,
-                            topMargin=0.5 * cm,
-                            bottomMargin=0.5 * cm,
-                            title=_('Workout'),
-                            author='wger Workout Manager',
-                            subject='Schedule for {0}'.format(request.user.username))
+        schedule = get_object_or_404(Schedule, pk=pk, user=request.user)
+
+    url = request.build_absolute_uri(reverse('manager:schedule:view', kwargs={'pk': schedule.id}))
+    pdf_type = 'table' if only_table else 'log'
+    return get_pdf_response(request,
+                            lambda response: render_schedule_pdf(response,
+                                                                 schedule,
+                                                                 request.user.username,
+                                                                 url,
+                                                                 images=images,
+                                                                 comments=comments,
+                                                                 only_table=only_table),
+                            'Schedule-{0}-{1}.pdf'.format(pk, pdf_type),
+                            'schedule',
+                            schedule.pk,
+                            options=(pdf_type, int(images), int(comments)),
+                            dependencies=[('workout', step.workout_id)
+                                          for step in schedule.schedulestep_set.all()])
 
-    # container for the 'Flowable' objects
-    elements = []
-
-    # Set the title
-    p = Paragraph(u'<para align="center">{0}</para>'.format(schedule), styleSheet["HeaderBold"])
-    elements.append(p)
-    elements.append(Spacer(10 * cm, 0.5 * cm))
 
-    # Iterate through the Workout and render the training days
-    for step in schedule.schedulestep_set.all():
-        p = Paragraph(u'<para>{0} {1}</para>'.format(step.duration, _('Weeks')),
-                      styleSheet["HeaderBold"])
-        elements.append(p)
-        elements.append(Spacer(10 * cm, 0.5 * cm))
-
-        for day in step.workout.canonical_representation['day_list']:
-            elements.append(
-                render_workout_day(day, images=images, comments=comments, nr_of_weeks=7,
-                                   only_table=True))
-            elements.append(Spacer(10 * cm, 0.5 * cm))
+def export_pdf_log(request, pk, images=False, comments=False, uidb64=None, token=None):
+    """
+    Show the workout schedule
+    """
+    return export_pdf(request, pk, images, comments, uidb64, token, only_table=False)
 
-    # Footer, date and info
-    elements.append(Spacer(10 * cm, 0.5 * cm))
-    url = reverse('manager:schedule:view', kwargs={'pk': schedule.id})
-    elements.append(render_footer(request.build_absolute_uri(url)))
 
-    # write the document and send the response to the browser
-    doc.build(elements)
-    response['Content-Disposition'] = 'attachment; filename=Schedule-{0}-table.pdf'.format(pk)
-    response['Content-Length'] = len(response.content)
-    return response
+def export_pdf_table(request, pk, images=False, comments=False, uidb64=None, token=None):
+    """
+    Show the workout schedule
+    """
+    return export_pdf(request, pk, images, comments, uidb64, token, only_table=True)
 
 
 @login_required
@@ -35,6 +35,7 @@ from wger.manager.models import (
     Workout,
     WorkoutSession,
     WorkoutLog,
+    PersonalRecord,
     Schedule,
     Day
 )
@@ -48,6 +49,7 @@ from wger.utils.generic_views import (
     WgerDeleteMixin
 )
 from wger.utils.helpers import make_token
+from wger.utils.reference_data import reference_data
 
 
 logger = logging.getLogger(__name__)
@@ -251,11 +253,16 @@ class WorkoutEditView(WgerFormMixin, LoginRequiredMixin, UpdateView):
 
 class LastWeightHelper:
     """
-    Small helper class to retrieve the last workout log for a certain
+    Small helper class to retrieve the last logged weight for a certain
     user, exercise and repetition combination.
+
+    The weights are read from the personal records of the user, with one
+    query for all exercises. Only logs in repetitions and kg or lb have a
+    record, for the other ones (e.g. in seconds or with body weight) the
+    last log is looked up.
     """
     user = None
-    last_weight_list = {}
+    last_weight_list = None
 
     def __init__(self, user):
         self.user = user
@@ -267,18 +274,27 @@ class LastWeightHelper:
         :param exercise:
         :param reps:
         :param default_weight:
-        :return: WorkoutLog or '' if none is found
+        :return: the last weight, the default weight or '' if none is found
         """
-        key = (self.user.pk, exercise.pk, reps, default_weight)
-        if self.last_weight_list.get(key) is None:
+        if self.last_weight_list is None:
+            self.last_weight_list = {}
+            records = PersonalRecord.objects.filter(user=self.user).order_by('last_date')
+            for exercise_id, record_reps, weight in records.values_list('exercise',
+                                                                        'reps',
+                                                                        'last_weight'):
+                self.last_weight_list[(exercise_id, record_reps)] = weight
+
+        key = (exercise.pk, reps)
+        if key not in self.last_weight_list:
             last_log = WorkoutLog.objects.filter(user=self.user,
                                                  exercise=exercise,
-                                                 reps=reps).order_by('-date')
-            default_weight = '' if default_weight is None else default_weight
-            weight = last_log[0].weight if last_log.exists() else default_weight
-            self.last_weight_list[key] = weight
+                                                 reps=reps).order_by('-date').first()
+            self.last_weight_list[key] = last_log.weight if last_log else None
 
-        return self.last_weight_list.get(key)
+        weight = self.last_weight_list[key]
+        if weight is None:
+            weight = '' if default_weight is None else default_weight
+        return weight
 
 
 @login_required
@@ -385,6 +401,6 @@ def timer(request, day_pk):
     context['workout'] = day.training
     context['session_form'] = session_form
     context['form_action'] = url
-    context['weight_units'] = WeightUnit.objects.all()
-    context['repetition_units'] = RepetitionUnit.objects.all()
+    context['weight_units'] = reference_data.all(WeightUnit)
+    context['repetition_units'] = reference_data.all(RepetitionUnit)
     return render(request, 'workout/timer.html', context)
@@ -29,6 +29,8 @@ from django.views.generic import (
 
 from wger.manager.forms import WorkoutSessionForm
 from wger.manager.models import (
+    PersonalRecord,
+    WeeklyMuscleVolume,
     Workout,
     WorkoutSession,
     WorkoutLog
@@ -138,7 +140,15 @@ class WorkoutSessionDeleteView(WgerDeleteMixin, LoginRequiredMixin, DeleteView):
         Delete the workout session and, if wished, all associated weight logs as well
         """
         if self.kwargs['logs'] == 'logs':
-            WorkoutLog.objects.filter(user=self.request.user, date=self.get_object().date).delete()
+            date = self.get_object().date
+            logs = WorkoutLog.objects.filter(user=self.request.user, date=date)
+
+            # The queryset delete doesn't update the records and the volume
+            # of the logs
+            records = list(logs.order_by().values_list(*PersonalRecord.KEY_FIELDS).distinct())
+            logs.delete()
+            PersonalRecord.objects.refresh(self.request.user.pk, *records)
+            WeeklyMuscleVolume.objects.refresh(self.request.user.pk, date)
 
         return super(WorkoutSessionDeleteView, self).delete(request, *args, **kwargs)
 
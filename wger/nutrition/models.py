@@ -35,7 +35,10 @@ from django.conf import settings
 
 from wger.core.models import Language
 from wger.utils.constants import TWOPLACES
-from wger.utils.cache import cache_mapper
+from wger.utils.cache import (
+    cache_mapper,
+    reset_pdf_version
+)
 from wger.utils.fields import Html5TimeField
 from wger.utils.models import AbstractLicenseModel
 from wger.utils.units import AbstractWeight
@@ -99,6 +102,20 @@ class NutritionPlan(models.Model):
         else:
             return u"{0}".format(_("Nutrition plan"))
 
+    def save(self, *args, **kwargs):
+        """
+        Reset all cached infos
+        """
+        reset_pdf_version('nutritionplan', self.id)
+        super(NutritionPlan, self).save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        """
+        Reset all cached infos
+        """
+        reset_pdf_version('nutritionplan', self.id)
+        super(NutritionPlan, self).delete(*args, **kwargs)
+
     def get_absolute_url(self):
         """
         Returns the canonical URL to view this object
@@ -376,6 +393,16 @@ class Ingredient(AbstractLicenseModel, models.Model):
 
         super(Ingredient, self).save(*args, **kwargs)
         cache.delete(cache_mapper.get_ingredient_key(self.id))
+        reset_pdf_version('ingredients', 'all')
+
+    def delete(self, *args, **kwargs):
+        """
+        Reset the cache, the meal items using the ingredient are deleted too
+        """
+
+        cache.delete(cache_mapper.get_ingredient_key(self.id))
+        super(Ingredient, self).delete(*args, **kwargs)
+        reset_pdf_version('ingredients', 'all')
 
     def __str__(self):
         """
@@ -498,6 +525,20 @@ class IngredientWeightUnit(models.Model):
         """
         return None
 
+    def save(self, *args, **kwargs):
+        """
+        Reset the cached PDFs of the nutrition plans
+        """
+        super(IngredientWeightUnit, self).save(*args, **kwargs)
+        reset_pdf_version('ingredients', 'all')
+
+    def delete(self, *args, **kwargs):
+        """
+        Reset the cached PDFs of the nutrition plans
+        """
+        super(IngredientWeightUnit, self).delete(*args, **kwargs)
+        reset_pdf_version('ingredients', 'all')
+
     def __str__(self):
         """
         Return a more human-readable representation
@@ -534,6 +575,20 @@ class Meal(models.Model):
         """
         return u"{0} Meal".format(self.order)
 
+    def save(self, *args, **kwargs):
+        """
+        Reset all cached infos
+        """
+        reset_pdf_version('nutritionplan', self.plan_id)
+        super(Meal, self).save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        """
+        Reset all cached infos
+        """
+        reset_pdf_version('nutritionplan', self.plan_id)
+        super(Meal, self).delete(*args, **kwargs)
+
     def get_owner_object(self):
         """
         Returns the object that has owner information
@@ -600,6 +655,20 @@ class MealItem(models.Model):
         """
         return u"{0}g ingredient {1}".format(self.amount, self.ingredient_id)
 
+    def save(self, *args, **kwargs):
+        """
+        Reset all cached infos
+        """
+        reset_pdf_version('nutritionplan', self.meal.plan_id)
+        super(MealItem, self).save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        """
+        Reset all cached infos
+        """
+        reset_pdf_version('nutritionplan', self.meal.plan_id)
+        super(MealItem, self).delete(*args, **kwargs)
+
     def get_owner_object(self):
         """
         Returns the object that has owner information
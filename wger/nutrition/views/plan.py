@@ -20,7 +20,6 @@ import datetime
 
 from django.shortcuts import render, get_object_or_404
 from django.http import (
-    HttpResponse,
     HttpResponseForbidden,
     HttpResponseRedirect
 )
@@ -48,6 +47,7 @@ from wger import get_version
 from wger.utils.generic_views import WgerFormMixin, WgerDeleteMixin
 from wger.utils.helpers import check_token, make_token
 from wger.utils.pdf import styleSheet
+from wger.utils.pdf_cache import get_pdf_response
 from wger.utils.language import load_language
 
 
@@ -216,17 +216,41 @@ def export_pdf(request, id, uidb64=None, token=None):
             return HttpResponseForbidden()
         plan = get_object_or_404(NutritionPlan, pk=id, user=request.user)
 
-    plan_data = plan.get_nutritional_values()
+    # The values per body weight depend on the closest weight entry, the
+    # energy percentages on the weight unit of the owner
+    weight_entry = plan.get_closest_weight_entry()
+    extra = [plan.user.userprofile.use_metric]
+    if weight_entry:
+        extra += [weight_entry.pk, weight_entry.weight]
+    url = request.build_absolute_uri(reverse('nutrition:plan:view', kwargs={'id': plan.id}))
+    return get_pdf_response(request,
+                            lambda response: render_plan_pdf(response,
+                                                             plan,
+                                                             request.user.username,
+                                                             url),
+                            'nutritional-plan.pdf',
+                            'nutritionplan',
+                            plan.pk,
+                            dependencies=[('ingredients', 'all')],
+                            extra=extra)
+
+
+def render_plan_pdf(response, plan, username, url):
+    """
+    Writes the PDF of a nutrition plan to the response (or any other file
+    like object)
 
-    # Create the HttpResponse object with the appropriate PDF headers.
-    response = HttpResponse(content_type='application/pdf')
+    :param username: the name of the user the plan is for
+    :param url: the absolute URL of the plan, shown in the footer
+    """
+    plan_data = plan.get_nutritional_values()
 
     # Create the PDF object, using the response object as its "file."
     doc = SimpleDocTemplate(response,
                             pagesize=A4,
                             title=_('Nutrition plan'),
                             author='wger Workout Manager',
-                            subject=_('Nutritional plan %s') % request.user.username)
+                            subject=_('Nutritional plan %s') % username)
 
     # Background colour for header
     # Reportlab doesn't use the HTML hexadecimal format, but has a range of
@@ -363,7 +387,6 @@ def export_pdf(request, id, uidb64=None, token=None):
     # Footer, date and info
     elements.append(Spacer(10 * cm, 0.5 * cm))
     created = datetime.date.today().strftime("%d.%m.%Y")
-    url = reverse('nutrition:plan:view', kwargs={'id': plan.id})
     p = Paragraph('''<para align="left">
                         %(date)s -
                         <a href="%(url)s">%(url)s</a> -
@@ -373,11 +396,7 @@ def export_pdf(request, id, uidb64=None, token=None):
                   {'date': _("Created on the <b>%s</b>") % created,
                    'created': "wger Workout Manager",
                    'version': get_version(),
-                   'url': request.build_absolute_uri(url), },
+                   'url': url, },
                   styleSheet["Normal"])
     elements.append(p)
     doc.build(elements)
-
-    response['Content-Disposition'] = 'attachment; filename=nutritional-plan.pdf'
-    response['Content-Length'] = len(response.content)
-    return response
@@ -45,6 +45,25 @@ MEDIA_URL = '/media/'
 # Allow all hosts to access the application. Change if used in production.
 ALLOWED_HOSTS = '*'
 
+# Cache shared by all processes, frequently used entries (languages,
+# ingredients) are additionally kept in each process' memory
+CACHES = {{
+    'default': {{
+        'BACKEND': 'wger.utils.cache_backends.TieredCache',
+        'TIMEOUT': 30 * 24 * 60 * 60,  # Cache for a month
+        'OPTIONS': {{
+            'SHARED': {{
+                'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': {cache_folder_path},
+                'OPTIONS': {{'MAX_ENTRIES': 10000}},
+            }},
+            'LOCAL_PREFIXES': ('language-', 'ingredient-'),
+            'LOCAL_MAX_ENTRIES': 500,
+            'LOCAL_MAX_AGE': 5,
+        }}
+    }}
+}}
+
 # This might be a good idea if you setup memcached
 #SESSION_ENGINE = "django.contrib.sessions.backends.cache"
 
@@ -57,3 +76,6 @@ WGER_SETTINGS['EMAIL_FROM'] = 'wger Workout Manager <wger@example.com>'
 
 # Your twitter handle, if you have one for this instance.
 #WGER_SETTINGS['TWITTER'] = ''
+
+# Folder to save the generated PDFs in, so unchanged ones are not rendered again
+WGER_SETTINGS['PDF_CACHE_DIR'] = {pdf_cache_folder_path}
@@ -303,6 +303,9 @@ THUMBNAIL_ALIASES = {
 
         'large': {'size': (800, 800), 'quality': 90},
         'large_cropped': {'size': (800, 800), 'crop': 'smart', 'quality': 90},
+
+        # Exercise images in the PDFs, about 2cm wide at 300 dpi
+        'pdf': {'size': (240, 0), 'quality': 85},
     },
 }
 
@@ -368,5 +371,6 @@ WGER_SETTINGS = {
     'ALLOW_REGISTRATION': True,
     'ALLOW_GUEST_USERS': True,
     'EMAIL_FROM': 'wger Workout Manager <wger@example.com>',
-    'TWITTER': False
+    'TWITTER': False,
+    'PDF_CACHE_DIR': None
 }
@@ -95,6 +95,15 @@ router.register(r'day', manager_api_views.DayViewSet, base_name='day')
 router.register(r'set', manager_api_views.SetViewSet, base_name='Set')
 router.register(r'setting', manager_api_views.SettingViewSet, base_name='Setting')
 router.register(r'workoutlog', manager_api_views.WorkoutLogViewSet, base_name='workoutlog')
+router.register(r'workoutmonthsummary',
+                manager_api_views.WorkoutMonthSummaryViewSet,
+                base_name='workoutmonthsummary')
+router.register(r'personalrecord',
+                manager_api_views.PersonalRecordViewSet,
+                base_name='personalrecord')
+router.register(r'weeklymusclevolume',
+                manager_api_views.WeeklyMuscleVolumeViewSet,
+                base_name='weeklymusclevolume')
 
 # Core app
 router.register(r'userprofile', core_api_views.UserProfileViewSet, base_name='userprofile')
@@ -40,7 +40,37 @@ def delete_template_fragment_cache(fragment_name='', *args):
 
 
 def reset_workout_canonical_form(workout_id):
-    cache.delete(cache_mapper.get_workout_canonical(workout_id))
+    cache.delete_many([cache_mapper.get_workout_canonical(workout_id),
+                       cache_mapper.get_pdf_version_key('workout', workout_id)])
+
+
+def reset_pdf_version(kind, *pks):
+    """
+    Invalidates the cached PDFs and iCal files of the given objects, see
+    wger.utils.pdf_cache
+    """
+    cache.delete_many([cache_mapper.get_pdf_version_key(kind, pk) for pk in pks])
+
+
+def reset_gym_admin_ids(*gym_pks):
+    """
+    Resets the cached IDs of the administrators of the given gyms
+    """
+    cache.delete_many([cache_mapper.get_gym_admin_ids(pk) for pk in gym_pks if pk])
+
+
+def reset_trainer_summary(user_pk):
+    """
+    Resets the cached overview of a member shown to trainers
+    """
+    cache.delete(cache_mapper.get_trainer_summary(user_pk))
+
+
+def reset_weight_chart(user_pk):
+    """
+    Resets the cached data of the weight chart of a user
+    """
+    cache.delete(cache_mapper.get_weight_chart_key(user_pk))
 
 
 def reset_workout_log(user_pk, year, month, day=None):
@@ -61,12 +91,22 @@ class CacheKeyMapper(object):
     """
 
     # Keys used by the cache
-    LANGUAGE_CACHE_KEY = 'language-{0}'
     LANGUAGE_CONFIG_CACHE_KEY = 'language-config-{0}-{1}'
     EXERCISE_CACHE_KEY_MUSCLE_BG = 'exercise-muscle-bg-{0}'
     INGREDIENT_CACHE_KEY = 'ingredient-{0}'
     WORKOUT_CANONICAL_REPRESENTATION = 'workout-canonical-representation-{0}'
     WORKOUT_LOG_LIST = 'workout-log-hash-{0}'
+    GYM_ADMIN_IDS = 'gym-admin-ids-{0}'
+    TRAINER_SUMMARY = 'trainer-summary-{0}'
+    GUEST_USER_POOL_MISSES = 'guest-user-pool-misses'
+    REFERENCE_DATA_VERSION = 'reference-data-version'
+    INSTRUMENTATION = 'instrumentation-{0}'
+    INSTRUMENTATION_PROCESSES = 'instrumentation-processes'
+    PDF_VERSION = 'pdf-version-{0}-{1}'
+    PDF_IMAGE = 'pdf-image-{0}'
+    ICAL = 'ical-{0}-{1}'
+    WEIGHT_CHART = 'weight-chart-{0}'
+    WEIGHT_CSV_IMPORT = 'weight-csv-import-{0}-{1}'
 
     def get_pk(self, param):
         """
@@ -85,12 +125,6 @@ class CacheKeyMapper(object):
         """
         return self.EXERCISE_CACHE_KEY_MUSCLE_BG.format(self.get_pk(param))
 
-    def get_language_key(self, param):
-        """
-        Return the language cache key
-        """
-        return self.LANGUAGE_CACHE_KEY.format(self.get_pk(param))
-
     def get_language_config_key(self, param, item):
         """
         Return the language cache key
@@ -115,4 +149,52 @@ class CacheKeyMapper(object):
         """
         return self.WORKOUT_LOG_LIST.format(hash_value)
 
+    def get_gym_admin_ids(self, param):
+        """
+        Return the key for the IDs of the administrators of a gym
+        """
+        return self.GYM_ADMIN_IDS.format(self.get_pk(param))
+
+    def get_trainer_summary(self, param):
+        """
+        Return the key for the overview of a member shown to trainers
+        """
+        return self.TRAINER_SUMMARY.format(self.get_pk(param))
+
+    def get_instrumentation_key(self, pid):
+        """
+        Return the key for the view statistics of a process
+        """
+        return self.INSTRUMENTATION.format(pid)
+
+    def get_pdf_version_key(self, kind, param):
+        """
+        Return the key for the version of the PDFs of an object
+        """
+        return self.PDF_VERSION.format(kind, self.get_pk(param))
+
+    def get_pdf_image_key(self, param):
+        """
+        Return the key for the path of the PDF rendition of an exercise image
+        """
+        return self.PDF_IMAGE.format(self.get_pk(param))
+
+    def get_ical_key(self, kind, param):
+        """
+        Return the key for the serialized iCal file of an object
+        """
+        return self.ICAL.format(kind, self.get_pk(param))
+
+    def get_weight_chart_key(self, param):
+        """
+        Return the key for the data of the weight chart of a user
+        """
+        return self.WEIGHT_CHART.format(self.get_pk(param))
+
+    def get_weight_csv_import_key(self, param, hash_value):
+        """
+        Return the key for the parsed entries of a CSV import of a user
+        """
+        return self.WEIGHT_CSV_IMPORT.format(self.get_pk(param), hash_value)
+
 cache_mapper = CacheKeyMapper()
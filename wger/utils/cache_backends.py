@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+"""
+Custom cache backends
+"""
+
+import collections
+import threading
+import time
+import uuid
+
+from django.core.cache.backends.base import (
+    BaseCache,
+    DEFAULT_TIMEOUT
+)
+from django.utils.module_loading import import_string
+
+
+_MISSING = object()
+
+
+class TieredCache(BaseCache):
+    """
+    Cache with a small LRU cache in process memory in front of a shared backend
+    (e.g. file based), so that all processes see the same entries.
+
+    Only the keys starting with one of the LOCAL_PREFIXES are kept in process
+    memory. They are stored as the objects themselves, so they are served
+    without unpickling and must not be changed by the callers. Every write
+    of such a key stores a new version stamp in the shared backend, the local
+    copy is only used as long as its stamp is the current one. The stamp is
+    read at most every LOCAL_MAX_AGE seconds per key, so changes done in other
+    processes are seen after that time, changes of the same process at once.
+
+    Options:
+
+    * SHARED: configuration of the shared backend, like an entry in CACHES
+    * LOCAL_PREFIXES: prefixes of the keys kept in memory
+    * LOCAL_MAX_ENTRIES: maximum number of keys kept in memory
+    * LOCAL_MAX_AGE: seconds a local copy is used without checking its stamp
+    """
+
+    def __init__(self, location, params):
+        super(TieredCache, self).__init__(params)
+        options = params.get('OPTIONS', {})
+
+        shared = options['SHARED']
+        self._shared = import_string(shared['BACKEND'])(shared.get('LOCATION', ''), shared)
+        self._local_prefixes = tuple(options.get('LOCAL_PREFIXES', ('language-', 'ingredient-')))
+        self._local_max_entries = options.get('LOCAL_MAX_ENTRIES', 500)
+        self._local_max_age = options.get('LOCAL_MAX_AGE', 5)
+        self._local = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def _is_local(self, key):
+        """
+        Whether the key is kept in process memory
+        """
+        return key.startswith(self._local_prefixes)
+
+    def _make_key(self, key, version):
+        """
+        Returns the key for the shared backend, warning about keys that don't
+        work with all backends
+        """
+        full_key = self.make_key(key, version=version)
+        self.validate_key(full_key)
+        return full_key
+
+    def _make_keys(self, key, version):
+        """
+        Returns the key for the value and the one for its version stamp
+        """
+        full_key = self._make_key(key, version)
+        return full_key, 'stamp:{0}'.format(full_key)
+
+    def _get_timeout(self, timeout):
+        """
+        Returns the timeout to pass to the shared backend
+        """
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+    def _set_local(self, full_key, stamp, value):
+        """
+        Saves an entry in process memory, removing the least recently used ones
+        """
+        with self._lock:
+            self._local.pop(full_key, None)
+            self._local[full_key] = (stamp, value, time.time())
+            while len(self._local) > self._local_max_entries:
+                self._local.popitem(last=False)
+
+    def get(self, key, default=None, version=None):
+        if not self._is_local(key):
+            return self._shared.get(self._make_key(key, version), default)
+
+        full_key, stamp_key = self._make_keys(key, version)
+        with self._lock:
+            entry = self._local.get(full_key)
+            if entry is not None and time.time() - entry[2] < self._local_max_age:
+                self._local.pop(full_key)
+                self._local[full_key] = entry
+                return entry[1]
+
+        # Check that the local copy is still the current one
+        stamp = self._shared.get(stamp_key)
+        with self._lock:
+            entry = self._local.pop(full_key, None)
+            if entry is not None and stamp is not None and entry[0] == stamp:
+                self._local[full_key] = (entry[0], entry[1], time.time())
+                return entry[1]
+
+        # Not in memory or changed by another process
+        entry = self._shared.get(full_key, _MISSING)
+        if entry is _MISSING:
+            return default
+        self._set_local(full_key, entry[0], entry[1])
+        return entry[1]
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._get_timeout(timeout)
+        if not self._is_local(key):
+            self._shared.set(self._make_key(key, version), value, timeout)
+            return
+
+        full_key, stamp_key = self._make_keys(key, version)
+        stamp = uuid.uuid4().hex
+        self._shared.set(full_key, (stamp, value), timeout)
+        self._shared.set(stamp_key, stamp, timeout)
+        self._set_local(full_key, stamp, value)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._get_timeout(timeout)
+        if not self._is_local(key):
+            return self._shared.add(self._make_key(key, version), value, timeout)
+
+        full_key, stamp_key = self._make_keys(key, version)
+        stamp = uuid.uuid4().hex
+        if not self._shared.add(full_key, (stamp, value), timeout):
+            return False
+        self._shared.set(stamp_key, stamp, timeout)
+        self._set_local(full_key, stamp, value)
+        return True
+
+    def delete(self, key, version=None):
+        if not self._is_local(key):
+            self._shared.delete(self._make_key(key, version))
+            return
+
+        full_key, stamp_key = self._make_keys(key, version)
+        self._shared.delete(stamp_key)
+        self._shared.delete(full_key)
+        with self._lock:
+            self._local.pop(full_key, None)
+
+    def incr(self, key, delta=1, version=None):
+        if self._is_local(key):
+            return super(TieredCache, self).incr(key, delta, version)
+        return self._shared.incr(self._make_key(key, version), delta)
+
+    def clear(self):
+        self._shared.clear()
+        with self._lock:
+            self._local.clear()
+
+    def close(self, **kwargs):
+        self._shared.close(**kwargs)
@@ -14,7 +14,6 @@
 #
 # You should have received a copy of the GNU Affero General Public License
 
-import os
 import random
 import string
 import logging
@@ -52,6 +51,17 @@ class EmailAuthBackend(object):
             return None
 
 
+class EchoBuffer(object):
+    """
+    Pseudo buffer that simply returns what is written to it
+
+    This is used with csv.writer to produce the rows of a streaming response
+    one at a time instead of writing them all to a single buffer.
+    """
+    def write(self, value):
+        return value
+
+
 class DecimalJsonEncoder(json.JSONEncoder):
     """
     Custom JSON encoder.
@@ -156,11 +166,11 @@ def password_generator(length=15):
     :return: the generated password
     """
     chars = string.ascii_letters + string.digits
-    random.seed = (os.urandom(1024))
     for char in ('I', '1', 'l', 'O', '0', 'o'):
         chars = chars.replace(char, '')
 
-    return ''.join(random.choice(chars) for i in range(length))
+    system_random = random.SystemRandom()
+    return ''.join(system_random.choice(chars) for i in range(length))
 
 
 def check_access(request_user, username=None):
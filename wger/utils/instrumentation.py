@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+"""
+Collects timing and query statistics for each view
+
+The numbers are collected by wger.utils.middleware.InstrumentationMiddleware,
+which has to be added to MIDDLEWARE_CLASSES.
+"""
+
+import copy
+import os
+import threading
+import time
+
+from django.core.cache import (
+    cache,
+    caches
+)
+from django.db import connections
+from django.template.base import Template
+
+from wger.utils.cache import cache_mapper
+
+
+TIME_BUCKETS = (10, 25, 50, 100, 250, 500, 1000, 2500)
+'''Upper limits of the response time histogram, in milliseconds'''
+
+QUERY_BUCKETS = (0, 1, 5, 10, 25, 50, 100)
+'''Upper limits of the query count histogram'''
+
+ORDER_BY = ('time',
+            'avg_time',
+            'max_time',
+            'queries',
+            'avg_queries',
+            'max_queries',
+            'db_time',
+            'template_time',
+            'requests')
+'''Values the slowest views can be sorted by'''
+
+FLUSH_INTERVAL = 10
+'''Seconds between saving the statistics of a process to the cache'''
+
+_MISSING = object()
+_local = threading.local()
+_lock = threading.Lock()
+_views = {}
+_last_flush = [0]
+
+
+def get_bucket(buckets, value):
+    """
+    Returns the index of the histogram bucket for the given value
+    """
+    for i, limit in enumerate(buckets):
+        if value <= limit:
+            return i
+    return len(buckets)
+
+
+def new_view_stats():
+    """
+    Returns the empty statistics of a view
+    """
+    return {'requests': 0,
+            'time': 0.0,
+            'max_time': 0.0,
+            'queries': 0,
+            'max_queries': 0,
+            'db_time': 0.0,
+            'cache_hits': 0,
+            'cache_misses': 0,
+            'template_time': 0.0,
+            'time_histogram': [0] * (len(TIME_BUCKETS) + 1),
+            'query_histogram': [0] * (len(QUERY_BUCKETS) + 1)}
+
+
+def merge_view_stats(stats, other):
+    """
+    Adds the statistics of other to stats
+    """
+    for key, value in other.items():
+        if key.startswith('max_'):
+            stats[key] = max(stats[key], value)
+        elif key.endswith('_histogram'):
+            stats[key] = [a + b for a, b in zip(stats[key], value)]
+        else:
+            stats[key] += value
+
+
+#
+# Measuring
+#
+class Measurement(object):
+    """
+    The numbers collected during one request
+    """
+
+    def __init__(self):
+        self.start = time.time()
+        self.view_name = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.template_time = 0.0
+        self.template_depth = 0
+        self.connections = []
+
+        for connection in connections.all():
+            self.connections.append((connection,
+                                     connection.force_debug_cursor,
+                                     len(connection.queries_log)))
+            connection.force_debug_cursor = True
+
+    def finish(self):
+        """
+        Stops the measurement and returns the number of queries and DB time
+        """
+        queries = 0
+        db_time = 0.0
+        for connection, force_debug_cursor, start in self.connections:
+            connection.force_debug_cursor = force_debug_cursor
+            executed = list(connection.queries_log)[start:]
+            queries += len(executed)
+            db_time += sum(float(query['time']) for query in executed)
+        return queries, db_time
+
+
+def start_measurement():
+    """
+    Starts collecting the numbers for the current request
+    """
+    _instrument_cache()
+    _local.measurement = Measurement()
+    return _local.measurement
+
+
+def stop_measurement():
+    """
+    Stops collecting the numbers for the current request and adds them to
+    the statistics of its view
+    """
+    measurement = getattr(_local, 'measurement', None)
+    _local.measurement = None
+    if measurement is None:
+        return
+
+    queries, db_time = measurement.finish()
+    if measurement.view_name is None:
+        return
+
+    elapsed = (time.time() - measurement.start) * 1000
+    with _lock:
+        stats = _views.setdefault(measurement.view_name, new_view_stats())
+        stats['requests'] += 1
+        stats['time'] += elapsed
+        stats['max_time'] = max(stats['max_time'], elapsed)
+        stats['queries'] += queries
+        stats['max_queries'] = max(stats['max_queries'], queries)
+        stats['db_time'] += db_time * 1000
+        stats['cache_hits'] += measurement.cache_hits
+        stats['cache_misses'] += measurement.cache_misses
+        stats['template_time'] += measurement.template_time * 1000
+        stats['time_histogram'][get_bucket(TIME_BUCKETS, elapsed)] += 1
+        stats['query_histogram'][get_bucket(QUERY_BUCKETS, queries)] += 1
+
+    if time.time() - _last_flush[0] > FLUSH_INTERVAL:
+        flush()
+
+
+def get_measurement():
+    """
+    Returns the measurement of the current request, if any
+    """
+    return getattr(_local, 'measurement', None)
+
+
+def _instrument_cache():
+    """
+    Counts the hits and misses of the default cache of the current thread
+    """
+    backend = caches['default']
+    if getattr(backend, '_wger_instrumented', False):
+        return
+
+    original_get = backend.get
+    original_get_many = backend.get_many
+
+    def get(key, default=None, version=None, **kwargs):
+        value = original_get(key, _MISSING, version=version, **kwargs)
+        measurement = get_measurement()
+        if measurement is not None:
+            if value is _MISSING:
+                measurement.cache_misses += 1
+            else:
+                measurement.cache_hits += 1
+        return default if value is _MISSING else value
+
+    def get_many(keys, version=None, **kwargs):
+        values = original_get_many(keys, version=version, **kwargs)
+        measurement = get_measurement()
+        if measurement is not None:
+            measurement.cache_hits += len(values)
+            measurement.cache_misses += len(keys) - len(values)
+        return values
+
+    backend.get = get
+    backend.get_many = get_many
+    backend._wger_instrumented = True
+
+
+def instrument_templates():
+    """
+    Measures the time spent rendering templates. Included and extended
+    templates are counted as part of the outermost one.
+    """
+    if getattr(Template._render, '_wger_instrumented', False):
+        return
+
+    original_render = Template._render
+
+    def _render(self, context):
+        measurement = get_measurement()
+        if measurement is None:
+            return original_render(self, context)
+
+        measurement.template_depth += 1
+        start = time.time()
+        try:
+            return original_render(self, context)
+        finally:
+            measurement.template_depth -= 1
+            if not measurement.template_depth:
+                measurement.template_time += time.time() - start
+
+    _render._wger_instrumented = True
+    Template._render = _render
+
+
+#
+# Collected statistics
+#
+def get_process_stats():
+    """
+    Returns a copy of the statistics of the current process
+    """
+    with _lock:
+        return copy.deepcopy(_views)
+
+
+def flush():
+    """
+    Saves the statistics of the current process to the cache, so they can
+    be read from the other processes
+    """
+    _last_flush[0] = time.time()
+    pid = os.getpid()
+    cache.set(cache_mapper.get_instrumentation_key(pid), get_process_stats())
+
+    processes = cache.get(cache_mapper.INSTRUMENTATION_PROCESSES, [])
+    if pid not in processes:
+        cache.set(cache_mapper.INSTRUMENTATION_PROCESSES, processes + [pid])
+
+
+def get_stats():
+    """
+    Returns the statistics of all processes, as a dictionary by view name
+    """
+    flush()
+    result = {}
+    for pid in cache.get(cache_mapper.INSTRUMENTATION_PROCESSES, []):
+        views = cache.get(cache_mapper.get_instrumentation_key(pid)) or {}
+        for view_name, stats in views.items():
+            merge_view_stats(result.setdefault(view_name, new_view_stats()), stats)
+    return result
+
+
+def get_slowest_views(order_by='time', count=20):
+    """
+    Returns a list of (view name, statistics) tuples sorted by one of the
+    values in ORDER_BY, slowest first
+    """
+    views = get_stats()
+    for stats in views.values():
+        stats['avg_time'] = stats['time'] / stats['requests']
+        stats['avg_queries'] = float(stats['queries']) / stats['requests']
+    return sorted(views.items(), key=lambda item: item[1][order_by], reverse=True)[:count]
+
+
+def reset_stats():
+    """
+    Deletes the collected statistics of all processes
+    """
+    with _lock:
+        _views.clear()
+    processes = cache.get(cache_mapper.INSTRUMENTATION_PROCESSES, [])
+    cache.delete_many([cache_mapper.get_instrumentation_key(pid) for pid in processes] +
+                      [cache_mapper.INSTRUMENTATION_PROCESSES])
@@ -15,12 +15,12 @@
 import logging
 
 from django.utils import translation
-from django.core.exceptions import ObjectDoesNotExist
 from django.core.cache import cache
 from wger.core.models import Language
 
 from wger.config.models import LanguageConfig
 from wger.utils.cache import cache_mapper
+from wger.utils.reference_data import reference_data
 
 
 logger = logging.getLogger(__name__)
@@ -44,18 +44,11 @@ def load_language(language_code=None):
     else:
         used_language = language_code
 
-    language = cache.get(cache_mapper.get_language_key(used_language))
-    if language:
-        return language
-
     try:
-        language = Language.objects.get(short_name=used_language)
-    except ObjectDoesNotExist:
+        return reference_data.get(Language, short_name=used_language)
+    except Language.DoesNotExist:
         # No luck, load english as our fall-back language
-        language = Language.objects.get(short_name="en")
-
-    cache.set(cache_mapper.get_language_key(language), language)
-    return language
+        return reference_data.get(Language, short_name="en")
 
 
 def load_item_languages(item, language_code=None):
@@ -72,11 +65,11 @@ def load_item_languages(item, language_code=None):
 
         config = LanguageConfig.objects.filter(language=language, item=item, show=True)
         if not config:
-            languages.append(Language.objects.get(short_name="en"))
+            languages.append(reference_data.get(Language, short_name="en"))
             return languages
 
         for i in config:
-            languages.append(i.language_target)
+            languages.append(reference_data.get(Language, pk=i.language_target_id))
 
         cache.set(cache_mapper.get_language_config_key(language, item), languages)
 
@@ -105,6 +98,6 @@ def load_ingredient_languages(request):
 
         # If the user's language is not english and has the preference, add english to the list
         if show_english and language.short_name != 'en':
-            languages = list(set(languages + [Language.objects.get(pk=2)]))
+            languages = list(set(languages + [reference_data.get(Language, pk=2)]))
 
     return languages
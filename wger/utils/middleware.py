@@ -17,13 +17,18 @@ Custom middleware
 """
 
 import logging
+import re
 
 from django.conf import settings
 from django.contrib import auth
 from django.utils.functional import SimpleLazyObject
 from django.contrib.auth import login as django_login
 
-from wger.core.demo import create_temporary_user
+from wger.core.demo import (
+    claim_guest_user,
+    create_temporary_user
+)
+from wger.utils import instrumentation
 
 
 logger = logging.getLogger(__name__)
@@ -31,44 +36,43 @@ logger = logging.getLogger(__name__)
 
 SPECIAL_PATHS = ('dashboard',)
 
+SPECIAL_PATHS_RE = re.compile(r'^/(?:(?:{languages})/)?(?:{paths})$'.format(
+    languages='|'.join(re.escape(language[0]) for language in settings.LANGUAGES),
+    paths='|'.join(re.escape(path) for path in SPECIAL_PATHS)))
+'''
+Matches the 'special' paths, with or without language prefix
+'''
+
 
 def check_current_request(request):
     """
     Simple helper function that checks whether the current request hit one
     of the 'special' paths (paths that need a logged in user).
-    """
-
-    # Don't create guest users for requests that are accessing the site
-    # through the REST API
-    if 'api' in request.path:
-        return False
 
-    # Other paths
-    match = False
-    for path in SPECIAL_PATHS:
-        if path in request.path:
-            match = True
-    return match
+    Requests accessing the site through the REST API never match.
+    """
+    return SPECIAL_PATHS_RE.match(request.path) is not None
 
 
 def get_user(request):
     if not hasattr(request, '_cached_user'):
-
-        create_user = check_current_request(request)
         user = auth.get_user(request)
 
-        # Set the flag in the session
-        if not request.session.get('has_demo_data'):
-            request.session['has_demo_data'] = False
-
-        # Django didn't find a user, so create one now
+        # Django didn't find a user, so create one now. The session is only
+        # written here, so other anonymous requests never create one.
         if settings.WGER_SETTINGS['ALLOW_GUEST_USERS'] and \
                 request.method == 'GET' and \
-                create_user and not user.is_authenticated():
-
-            logger.debug('creating a new guest user now')
-            user = create_temporary_user()
-            django_login(request, user)
+                not user.is_authenticated() and \
+                check_current_request(request):
+
+            user = claim_guest_user()
+            if user:
+                django_login(request, user)
+                request.session['has_demo_data'] = True
+            else:
+                logger.debug('creating a new guest user now')
+                user = create_temporary_user()
+                django_login(request, user)
 
         request._cached_user = user
     return request._cached_user
@@ -120,3 +124,28 @@ class JavascriptAJAXRedirectionMiddleware(object):
             response['X-wger-redirect'] = request.path
             response.content = request.path
         return response
+
+
+class InstrumentationMiddleware(object):
+    """
+    Records the time, SQL queries, cache hits and misses and template render
+    time of each view, see wger.utils.instrumentation.
+
+    This is opt-in, add it to the beginning of MIDDLEWARE_CLASSES so that the
+    other middlewares are measured as well.
+    """
+
+    def __init__(self):
+        instrumentation.instrument_templates()
+
+    def process_request(self, request):
+        instrumentation.start_measurement()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        measurement = instrumentation.get_measurement()
+        if measurement is not None:
+            measurement.view_name = request.resolver_match.view_name
+
+    def process_response(self, request, response):
+        instrumentation.stop_measurement()
+        return response
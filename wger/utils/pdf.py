@@ -13,11 +13,17 @@
 # You should have received a copy of the GNU Affero General Public License
 
 import datetime
+import logging
+import os
 from os.path import join as path_join
 
 from django.conf import settings
+from django.core.cache import cache
 from django.utils import translation
 from django.core.exceptions import ObjectDoesNotExist
+from easy_thumbnails.alias import aliases
+from easy_thumbnails.exceptions import EasyThumbnailsError
+from easy_thumbnails.files import get_thumbnailer
 
 from reportlab.lib.styles import ParagraphStyle, StyleSheet1
 from reportlab.pdfbase.ttfonts import TTFont
@@ -26,6 +32,10 @@ from reportlab.platypus import Paragraph
 
 from wger import get_version
 from wger.core.models import Language
+from wger.utils.cache import cache_mapper
+
+
+logger = logging.getLogger(__name__)
 
 
 # ************************
@@ -98,6 +108,31 @@ def render_footer(url, date=None):
     return p
 
 
+def get_pdf_image(image):
+    """
+    Returns the path of the small rendition of an exercise image used in the PDFs
+
+    The renditions are created with the 'pdf' thumbnail alias when the image is
+    uploaded (or when it is first needed) and their paths are kept in the cache,
+    so embedding them is only a file read. If the rendition can't be created,
+    the original image is used.
+
+    :param image: an ExerciseImage object
+    """
+    key = cache_mapper.get_pdf_image_key(image)
+    path = cache.get(key)
+    if path and os.path.exists(path):
+        return path
+
+    try:
+        path = get_thumbnailer(image.image).get_thumbnail(aliases.get('pdf')).path
+    except (EasyThumbnailsError, IOError) as e:
+        logger.warning('Could not create the PDF rendition of %s: %s', image.image.name, e)
+        return image.image.path
+    cache.set(key, path)
+    return path
+
+
 # register new truetype fonts for reportlab
 pdfmetrics.registerFont(TTFont(
     'OpenSans', path_join(settings.SITE_ROOT, 'core/static/fonts/OpenSans-Light.ttf')))
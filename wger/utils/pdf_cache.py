@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+"""
+Cache for the generated PDFs
+
+The PDFs are saved in WGER_SETTINGS['PDF_CACHE_DIR'], named after a hash of
+everything that goes into them: the versions of the shown objects, the options,
+the language, the date and URL in the footer, etc. The hash is also used as
+ETag, so unchanged PDFs are not even sent again.
+
+The versions are random values kept in the cache. They are deleted with
+reset_pdf_version() (or reset_workout_canonical_form() for workouts) whenever
+the objects change, so the next download gets a new name and is rendered again.
+"""
+
+import datetime
+import glob
+import hashlib
+import logging
+import os
+import shutil
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import (
+    HttpResponse,
+    HttpResponseNotModified
+)
+from django.utils import (
+    six,
+    translation
+)
+from django.utils.cache import patch_cache_control
+from django.utils.encoding import force_bytes
+from django.utils.http import (
+    parse_etags,
+    quote_etag
+)
+
+from wger.utils.cache import cache_mapper
+
+
+logger = logging.getLogger(__name__)
+
+
+def get_version(kind, pk):
+    """
+    Returns the current version of the PDFs of an object
+    """
+    key = cache_mapper.get_pdf_version_key(kind, pk)
+    version = cache.get(key)
+    if version is None:
+        version = uuid.uuid4().hex
+
+        # Another process might have been faster
+        if not cache.add(key, version):
+            version = cache.get(key, version)
+    return version
+
+
+def get_path(kind, pk, variant, etag):
+    """
+    Returns the path of a cached PDF
+    """
+    return os.path.join(settings.WGER_SETTINGS.get('PDF_CACHE_DIR'),
+                        kind,
+                        six.text_type(pk),
+                        u'{0}_{1}.pdf'.format(variant, etag))
+
+
+def read_pdf(path):
+    """
+    Returns the content of a cached PDF or None
+    """
+    try:
+        with open(path, 'rb') as pdf_file:
+            return pdf_file.read()
+    except IOError:
+        return None
+
+
+def save_pdf(path, content):
+    """
+    Saves a PDF to the cache, replacing the outdated files of the same variant
+    """
+    directory, filename = os.path.split(path)
+    variant = filename.rsplit('_', 1)[0]
+    try:
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        for old_path in glob.glob(os.path.join(directory, u'{0}_*.pdf'.format(variant))):
+            os.remove(old_path)
+
+        # Write to a temporary file first, so other processes never read a
+        # partial PDF
+        tmp_path = u'{0}.{1}.tmp'.format(path, uuid.uuid4().hex)
+        with open(tmp_path, 'wb') as pdf_file:
+            pdf_file.write(content)
+        os.rename(tmp_path, path)
+    except (IOError, OSError) as e:
+        logger.warning('Could not save PDF to the cache: %s', e)
+
+
+def clear():
+    """
+    Deletes all cached PDFs
+    """
+    directory = settings.WGER_SETTINGS.get('PDF_CACHE_DIR')
+    if directory:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def get_pdf_response(request, render, filename, kind, pk, options=(), dependencies=(), extra=()):
+    """
+    Returns the PDF of an object, calling render only if it is not cached
+
+    :param request: the current request
+    :param render: function that builds the PDF, gets the response as file object
+    :param filename: the name of the downloaded file
+    :param kind: the kind of object, e.g. 'workout', used for its version
+    :param pk: the object's primary key
+    :param options: the options the PDF was requested with, e.g. images
+    :param dependencies: (kind, pk) tuples of other objects shown in the PDF
+    :param extra: other values the content depends on
+    """
+    variant = u'-'.join([six.text_type(option) for option in options]
+                        + [translation.get_language() or ''])
+    key = [kind, pk, variant, get_version(kind, pk)]
+    key += [get_version(dependency_kind, dependency_pk)
+            for dependency_kind, dependency_pk in dependencies]
+    key += list(extra)
+    key += [datetime.date.today(), request.build_absolute_uri('/'), request.user.username]
+    etag = hashlib.sha1(force_bytes(u':'.join([six.text_type(i) for i in key]))).hexdigest()
+
+    if etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+        response = HttpResponseNotModified()
+    else:
+        path = None
+        content = None
+        if settings.WGER_SETTINGS.get('PDF_CACHE_DIR'):
+            path = get_path(kind, pk, variant, etag)
+            content = read_pdf(path)
+
+        if content is None:
+            response = HttpResponse(content_type='application/pdf')
+            render(response)
+            content = response.content
+            if path:
+                save_pdf(path, content)
+
+        response = HttpResponse(content, content_type='application/pdf')
+        response['Content-Disposition'] = 'attachment; filename={0}'.format(filename)
+        response['Content-Length'] = len(content)
+
+    response['ETag'] = quote_etag(etag)
+    patch_cache_control(response, private=True)
+    return response
@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+"""
+Registry for the (almost) static lookup tables such as units or languages
+"""
+
+import collections
+import threading
+import uuid
+
+from django.apps import apps
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.forms import (
+    ModelChoiceField,
+    ModelMultipleChoiceField
+)
+from django.forms.models import ModelChoiceIterator
+from django.utils import six
+from django.utils.encoding import force_text
+from rest_framework import serializers
+
+from wger.utils.cache import cache_mapper
+
+
+REFERENCE_MODELS = ('core.DaysOfWeek',
+                    'core.RepetitionUnit',
+                    'core.WeightUnit',
+                    'core.License',
+                    'core.Language',
+                    'exercises.Muscle',
+                    'exercises.Equipment',
+                    'exercises.ExerciseCategory')
+'''Models loaded into the registry'''
+
+
+def get_model(model):
+    """
+    Returns the model class for a model or a label such as 'core.Language'
+    """
+    if isinstance(model, six.string_types):
+        return apps.get_model(model)
+    return model
+
+
+class ReferenceData(object):
+    """
+    Keeps the entries of the lookup tables in process memory, so they are
+    only loaded once per process.
+
+    The version of the data is saved in the cache, changing any of the tables
+    sets a new one (see the signals in the core application) and the next
+    access in every process loads the data again. The returned objects are
+    shared, so they must not be changed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._tables = {}
+
+    def get_version(self):
+        """
+        Returns the current version of the data
+        """
+        version = cache.get(cache_mapper.REFERENCE_DATA_VERSION)
+        if version is None:
+            cache.add(cache_mapper.REFERENCE_DATA_VERSION, uuid.uuid4().hex)
+            version = cache.get(cache_mapper.REFERENCE_DATA_VERSION)
+        return version
+
+    def invalidate(self):
+        """
+        Forces all processes to load the data again
+        """
+        cache.set(cache_mapper.REFERENCE_DATA_VERSION, uuid.uuid4().hex)
+
+    def _get_table(self, model):
+        """
+        Returns an ordered dictionary with all the entries of a model by PK
+        """
+        version = self.get_version()
+        with self._lock:
+            if version != self._version:
+                self._version = version
+                self._tables = {}
+            table = self._tables.get(model)
+
+        if table is None:
+            table = collections.OrderedDict((obj.pk, obj) for obj in model._default_manager.all())
+            with self._lock:
+                if version == self._version:
+                    self._tables[model] = table
+        return table
+
+    def all(self, model):
+        """
+        Returns a list with all the entries of a model, in its default ordering
+        """
+        return list(self._get_table(get_model(model)).values())
+
+    def get(self, model, pk=None, **kwargs):
+        """
+        Returns an entry by its PK or by the values of the given fields, like
+        the get() method of a queryset.
+
+        :raise model.DoesNotExist: if there is no such entry
+        """
+        model = get_model(model)
+        table = self._get_table(model)
+        if pk is not None:
+            try:
+                return table[int(pk)]
+            except (KeyError, ValueError, TypeError):
+                pass
+        else:
+            for obj in table.values():
+                if all(getattr(obj, key) == value for key, value in kwargs.items()):
+                    return obj
+
+        raise model.DoesNotExist('{0} matching {1} does not exist'.format(
+            model._meta.object_name, pk if pk is not None else kwargs))
+
+
+reference_data = ReferenceData()
+
+
+#
+# Form fields
+#
+class ReferenceChoiceIterator(ModelChoiceIterator):
+    """
+    Choice iterator that reads the entries from the registry
+    """
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ("", self.field.empty_label)
+        for obj in reference_data.all(self.queryset.model):
+            yield self.choice(obj)
+
+    def __len__(self):
+        return (len(reference_data.all(self.queryset.model)) +
+                (1 if self.field.empty_label is not None else 0))
+
+
+class ReferenceChoiceField(ModelChoiceField):
+    """
+    Model choice field for the lookup tables that doesn't query the database
+
+    Always offers all the entries of the queryset's model, filters on the
+    queryset are not taken into account.
+    """
+
+    def _get_choices(self):
+        if hasattr(self, '_choices'):
+            return self._choices
+        return ReferenceChoiceIterator(self)
+
+    choices = property(_get_choices, ModelChoiceField._set_choices)
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        try:
+            return reference_data.get(self.queryset.model, value)
+        except self.queryset.model.DoesNotExist:
+            raise ValidationError(self.error_messages['invalid_choice'], code='invalid_choice')
+
+
+class ReferenceMultipleChoiceField(ModelMultipleChoiceField):
+    """
+    Model multiple choice field for the lookup tables that doesn't query the
+    database, see ReferenceChoiceField.
+    """
+
+    def _get_choices(self):
+        if hasattr(self, '_choices'):
+            return self._choices
+        return ReferenceChoiceIterator(self)
+
+    choices = property(_get_choices, ModelMultipleChoiceField._set_choices)
+
+    def _check_values(self, value):
+        try:
+            value = frozenset(value)
+        except TypeError:
+            raise ValidationError(self.error_messages['list'], code='list')
+
+        result = []
+        for pk in value:
+            try:
+                result.append(reference_data.get(self.queryset.model, pk))
+            except self.queryset.model.DoesNotExist:
+                raise ValidationError(self.error_messages['invalid_choice'],
+                                      code='invalid_choice',
+                                      params={'value': force_text(pk)})
+        return result
+
+
+#
+# Serializer fields
+#
+class ReferencePrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Primary key field for the lookup tables that doesn't query the database
+    """
+
+    def to_internal_value(self, data):
+        model = self.get_queryset().model
+        try:
+            return reference_data.get(model, data)
+        except model.DoesNotExist:
+            self.fail('does_not_exist', pk_value=data)
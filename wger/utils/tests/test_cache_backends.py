@@ -0,0 +1,161 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+import shutil
+import tempfile
+import warnings
+
+from django.core.cache.backends.base import CacheKeyWarning
+
+from wger.core.tests.base_testcase import WorkoutManagerTestCase
+from wger.utils.cache_backends import TieredCache
+
+
+class TieredCacheTestCase(WorkoutManagerTestCase):
+    """
+    Tests the tiered cache backend
+    """
+
+    def setUp(self):
+        super(TieredCacheTestCase, self).setUp()
+        self.location = tempfile.mkdtemp()
+
+        # Two instances on the same directory behave like two processes
+        self.cache1 = self.get_cache()
+        self.cache2 = self.get_cache()
+
+    def tearDown(self):
+        shutil.rmtree(self.location)
+        super(TieredCacheTestCase, self).tearDown()
+
+    def get_cache(self, max_entries=500, max_age=0):
+        """
+        Helper function that returns a new cache instance
+
+        By default the local copies are checked on every read, so the changes
+        of the other instance are seen at once.
+        """
+        return TieredCache('', {'OPTIONS': {'SHARED': {'BACKEND': 'django.core.cache.backends.'
+                                                                  'filebased.FileBasedCache',
+                                                       'LOCATION': self.location},
+                                            'LOCAL_MAX_ENTRIES': max_entries,
+                                            'LOCAL_MAX_AGE': max_age}})
+
+    def test_local_entries(self):
+        """
+        Test that frequently used entries are served from memory
+        """
+        value = {'short_name': 'de'}
+        self.cache1.set('language-de', value)
+        self.assertIs(self.cache1.get('language-de'), value)
+
+        # The other process has to read it once, then it is in memory as well
+        value2 = self.cache2.get('language-de')
+        self.assertEqual(value2, value)
+        self.assertIsNot(value2, value)
+        self.assertIs(self.cache2.get('language-de'), value2)
+
+    def test_invalidation(self):
+        """
+        Test that changes are seen by other processes
+        """
+        self.cache1.set('ingredient-1', 'old')
+        self.assertEqual(self.cache2.get('ingredient-1'), 'old')
+
+        self.cache1.set('ingredient-1', 'new')
+        self.assertEqual(self.cache2.get('ingredient-1'), 'new')
+
+        self.cache2.delete('ingredient-1')
+        self.assertIsNone(self.cache1.get('ingredient-1'))
+        self.assertEqual(self.cache1.get('ingredient-1', 'default'), 'default')
+
+        self.cache1.set('ingredient-1', 'newer')
+        self.cache2.clear()
+        self.assertIsNone(self.cache1.get('ingredient-1'))
+
+    def test_max_age(self):
+        """
+        Test that the stamps of the local copies are only checked once in a while
+        """
+        cache1 = self.get_cache(max_age=60)
+        cache2 = self.get_cache(max_age=60)
+        cache1.set('ingredient-1', 'old')
+        self.assertEqual(cache2.get('ingredient-1'), 'old')
+
+        # The shared backend is not read while the local copy is recent
+        shared_get = cache2._shared.get
+        cache2._shared.get = None
+        self.assertEqual(cache2.get('ingredient-1'), 'old')
+        cache2._shared.get = shared_get
+
+        # Changes of the same process are seen at once, of others later
+        cache1.set('ingredient-1', 'new')
+        self.assertEqual(cache1.get('ingredient-1'), 'new')
+        self.assertEqual(cache2.get('ingredient-1'), 'old')
+
+        full_key = cache2.make_key('ingredient-1')
+        stamp, value, checked = cache2._local[full_key]
+        cache2._local[full_key] = (stamp, value, checked - 60)
+        self.assertEqual(cache2.get('ingredient-1'), 'new')
+
+    def test_add(self):
+        """
+        Test that adding an existing entry does not overwrite it
+        """
+        self.assertTrue(self.cache1.add('language-config-1-2', [1, 2]))
+        self.assertFalse(self.cache2.add('language-config-1-2', [3]))
+        self.assertEqual(self.cache2.get('language-config-1-2'), [1, 2])
+
+    def test_lru(self):
+        """
+        Test that only the most recently used entries are kept in memory
+        """
+        cache = self.get_cache(max_entries=2)
+        cache.set('language-1', 1)
+        cache.set('language-2', 2)
+        cache.get('language-1')
+        cache.set('language-3', 3)
+
+        self.assertEqual(len(cache._local), 2)
+        self.assertIn(cache.make_key('language-1'), cache._local)
+        self.assertNotIn(cache.make_key('language-2'), cache._local)
+
+        # Entries dropped from memory are still in the shared cache
+        self.assertEqual(cache.get('language-2'), 2)
+
+    def test_other_entries(self):
+        """
+        Test that other entries are only saved in the shared cache
+        """
+        self.cache1.set('workout-log-hash-1', 'hash')
+        self.assertEqual(self.cache1._local, {})
+        self.assertEqual(self.cache2.get('workout-log-hash-1'), 'hash')
+
+        self.cache1.add('guest-user-pool-misses', 0)
+        self.cache1.incr('guest-user-pool-misses')
+        self.assertEqual(self.cache2.incr('guest-user-pool-misses'), 2)
+
+        self.cache2.delete('workout-log-hash-1')
+        self.assertIsNone(self.cache1.get('workout-log-hash-1'))
+
+    def test_key_warning(self):
+        """
+        Test that keys not working with memcached are reported for all entries
+        """
+        for key in ('language-with space', 'workout-with space'):
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter('always')
+                self.cache1.get(key)
+            self.assertTrue(any(issubclass(warning.category, CacheKeyWarning)
+                                for warning in caught))
@@ -0,0 +1,151 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+import json
+
+from django.core.management import call_command
+from django.core.urlresolvers import reverse
+from django.test import modify_settings
+from django.utils.six import StringIO
+
+from wger.core.tests.base_testcase import WorkoutManagerTestCase
+from wger.utils import instrumentation
+
+
+@modify_settings(MIDDLEWARE_CLASSES={
+    'prepend': 'wger.utils.middleware.InstrumentationMiddleware'
+})
+class InstrumentationTestCase(WorkoutManagerTestCase):
+    """
+    Tests the instrumentation middleware and its statistics
+    """
+
+    def setUp(self):
+        super(InstrumentationTestCase, self).setUp()
+        instrumentation.reset_stats()
+
+    def tearDown(self):
+        instrumentation.reset_stats()
+        super(InstrumentationTestCase, self).tearDown()
+
+    def test_histogram_bucket(self):
+        """
+        Test finding the histogram bucket of a value
+        """
+        self.assertEqual(instrumentation.get_bucket((0, 5, 10), 0), 0)
+        self.assertEqual(instrumentation.get_bucket((0, 5, 10), 5), 1)
+        self.assertEqual(instrumentation.get_bucket((0, 5, 10), 7), 2)
+        self.assertEqual(instrumentation.get_bucket((0, 5, 10), 11), 3)
+
+    def test_record_views(self):
+        """
+        Test that the numbers of each view are recorded
+        """
+        self.user_login('test')
+        self.client.get(reverse('core:dashboard'))
+        self.client.get(reverse('core:dashboard'))
+        self.client.get(reverse('manager:workout:view', kwargs={'pk': 1}))
+
+        stats = instrumentation.get_stats()
+        dashboard = stats['core:dashboard']
+        self.assertEqual(dashboard['requests'], 2)
+        self.assertGreater(dashboard['queries'], 0)
+        self.assertGreater(dashboard['time'], 0)
+        self.assertGreater(dashboard['template_time'], 0)
+        self.assertLessEqual(dashboard['template_time'], dashboard['time'])
+        self.assertLessEqual(dashboard['db_time'], dashboard['time'])
+        self.assertGreater(dashboard['cache_hits'] + dashboard['cache_misses'], 0)
+        self.assertEqual(sum(dashboard['time_histogram']), 2)
+        self.assertEqual(sum(dashboard['query_histogram']), 2)
+        self.assertEqual(stats['manager:workout:view']['requests'], 1)
+
+        # Merging the statistics of different processes
+        merged = instrumentation.new_view_stats()
+        instrumentation.merge_view_stats(merged, dashboard)
+        instrumentation.merge_view_stats(merged, dashboard)
+        self.assertEqual(merged['requests'], 4)
+        self.assertEqual(merged['max_queries'], dashboard['max_queries'])
+        self.assertEqual(sum(merged['time_histogram']), 4)
+
+    def test_endpoint(self):
+        """
+        Test that only administrators can access the statistics
+        """
+        url = reverse('core:instrumentation')
+        self.user_login('test')
+        self.client.get(reverse('core:dashboard'))
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 403)
+
+        self.user_login('admin')
+        response = self.client.get(url, {'order_by': 'avg_queries'})
+        self.assertEqual(response.status_code, 200)
+        result = json.loads(response.content.decode('utf8'))
+        self.assertEqual(result['time_buckets'], list(instrumentation.TIME_BUCKETS))
+        views = [view['view'] for view in result['views']]
+        self.assertIn('core:dashboard', views)
+        self.assertIn('core:instrumentation', views)
+
+    def test_command(self):
+        """
+        Test the command that shows the slowest views
+        """
+        out = StringIO()
+        call_command('slowest-views', stdout=out)
+        self.assertIn('No statistics collected', out.getvalue())
+
+        self.user_login('test')
+        self.client.get(reverse('core:dashboard'))
+
+        out = StringIO()
+        call_command('slowest-views', order_by='queries', reset=True, stdout=out)
+        self.assertIn('core:dashboard: 1 requests', out.getvalue())
+        self.assertEqual(instrumentation.get_stats(), {})
+
+
+class QueryBudgetTestCase(WorkoutManagerTestCase):
+    """
+    Checks the number of queries of some of the heavier views
+    """
+
+    def test_workout_view(self):
+        """
+        Test the workout detail view (canonical representation)
+        """
+        self.user_login('test')
+        self.assert_query_budget(reverse('manager:workout:view', kwargs={'pk': 1}), 36)
+
+    def test_log_view(self):
+        """
+        Test the workout log view
+        """
+        self.user_login('admin')
+        self.assert_query_budget(reverse('manager:log:log', kwargs={'pk': 1}), 37)
+
+    def test_gym_member_list(self):
+        """
+        Test the member list of a gym
+        """
+        self.user_login('admin')
+        self.assert_query_budget(reverse('gym:gym:user-list-data', kwargs={'pk': 1}), 7)
+
+    def test_budget_exceeded(self):
+        """
+        Test that exceeding the budget fails
+        """
+        self.user_login('test')
+        self.assertRaises(AssertionError,
+                          self.assert_query_budget,
+                          reverse('core:dashboard'),
+                          1)
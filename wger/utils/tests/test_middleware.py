@@ -12,9 +12,14 @@
 #
 # You should have received a copy of the GNU Affero General Public License
 
+from django.contrib.sessions.models import Session
 from django.core.urlresolvers import reverse
+from django.db import connection
+from django.test.client import RequestFactory
+from django.test.utils import CaptureQueriesContext
 
 from wger.core.tests.base_testcase import WorkoutManagerTestCase
+from wger.utils.middleware import check_current_request
 
 
 class RobotsExclusionMiddlewareTestCase(WorkoutManagerTestCase):
@@ -81,3 +86,43 @@ class RobotsExclusionMiddlewareTestCase(WorkoutManagerTestCase):
 
         response = self.client.get(reverse('exercise:muscle:overview'))
         self.assertFalse(response.get('X-Robots-Tag'))
+
+
+class WgerAuthenticationMiddlewareTestCase(WorkoutManagerTestCase):
+    """
+    Tests the authentication middleware
+    """
+
+    def test_check_current_request(self):
+        """
+        Test the matching of the paths that need a user
+        """
+        factory = RequestFactory()
+        for path in ('/dashboard', '/en/dashboard', '/de/dashboard'):
+            self.assertTrue(check_current_request(factory.get(path)))
+        for path in ('/en/dashboards', '/en/software/dashboard', '/api/v2/dashboard',
+                     '/en/exercise/overview/', '/'):
+            self.assertFalse(check_current_request(factory.get(path)))
+
+    def test_anonymous_requests_no_writes(self):
+        """
+        Benchmark the database writes per anonymous request, there should be none
+        """
+        urls = (reverse('software:features'),
+                reverse('exercise:exercise:overview'),
+                reverse('exercise:exercise:view', kwargs={'id': 1}),
+                reverse('nutrition:ingredient:list'),
+                reverse('core:contact'),
+                '/api/v2/exercise/',
+                '/api/v2/ingredient/1/')
+
+        session_count = Session.objects.count()
+        writes = {}
+        for url in urls:
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(url)
+            writes[url] = len([query for query in queries
+                               if query['sql'].split(' ', 1)[0] in ('INSERT', 'UPDATE', 'DELETE')])
+
+        self.assertEqual(writes, dict((url, 0) for url in urls))
+        self.assertEqual(Session.objects.count(), session_count)
@@ -0,0 +1,190 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.urlresolvers import reverse
+
+from wger.core.tests.base_testcase import WorkoutManagerTestCase
+from wger.manager.models import (
+    Schedule,
+    Setting,
+    Workout
+)
+from wger.nutrition.models import (
+    Ingredient,
+    IngredientWeightUnit,
+    MealItem,
+    NutritionPlan
+)
+
+
+class PdfCacheTestCase(WorkoutManagerTestCase):
+    """
+    Tests the cache for the generated PDFs
+    """
+
+    def setUp(self):
+        super(PdfCacheTestCase, self).setUp()
+        self.pdf_cache_dir = tempfile.mkdtemp()
+        wger_settings = dict(settings.WGER_SETTINGS, PDF_CACHE_DIR=self.pdf_cache_dir)
+        self.settings_override = self.settings(WGER_SETTINGS=wger_settings)
+        self.settings_override.enable()
+        self.user_login('test')
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.pdf_cache_dir, ignore_errors=True)
+        super(PdfCacheTestCase, self).tearDown()
+
+    def get_files(self, kind, pk):
+        """
+        Returns the cached PDFs of an object
+        """
+        try:
+            return sorted(os.listdir(os.path.join(self.pdf_cache_dir, kind, str(pk))))
+        except OSError:
+            return []
+
+    def assert_etag_changes(self, url, change):
+        """
+        Asserts that the PDF is not sent again until change() is called
+        """
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        change()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_workout(self):
+        """
+        Test that workout PDFs are saved and only rendered again after a change
+        """
+        workout = Workout.objects.get(pk=3)
+        url = reverse('manager:workout:pdf-table', kwargs={'id': workout.pk})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertEqual(response['Content-Disposition'],
+                         'attachment; filename=Workout-3-table.pdf')
+        self.assertIn('private', response['Cache-Control'])
+
+        files = self.get_files('workout', workout.pk)
+        self.assertEqual(len(files), 1)
+
+        # The saved file is sent
+        with open(os.path.join(self.pdf_cache_dir, 'workout', '3', files[0]), 'wb') as pdf_file:
+            pdf_file.write(b'cached')
+        response = self.client.get(url)
+        self.assertEqual(response.content, b'cached')
+        self.assertEqual(response['Content-Length'], '6')
+
+        # Other options are different files
+        self.client.get(reverse('manager:workout:pdf-log', kwargs={'id': workout.pk}))
+        self.assertEqual(len(self.get_files('workout', workout.pk)), 2)
+
+        # Changing the workout renders the PDF again and replaces the file
+        setting = Setting.objects.filter(set__exerciseday__training=workout).first()
+        setting.reps = 99
+        setting.save()
+        response = self.client.get(url)
+        self.assertNotEqual(response.content, b'cached')
+        self.assertEqual(len(self.get_files('workout', workout.pk)), 2)
+        self.assertNotIn(files[0], self.get_files('workout', workout.pk))
+
+    def test_etag(self):
+        """
+        Test that unchanged PDFs are not sent again, also without saving them
+        """
+        with self.settings(WGER_SETTINGS=dict(settings.WGER_SETTINGS, PDF_CACHE_DIR=None)):
+            self.assert_etag_changes(reverse('manager:workout:pdf-log', kwargs={'id': 3}),
+                                     lambda: Workout.objects.get(pk=3).save())
+        self.assertEqual(os.listdir(self.pdf_cache_dir), [])
+
+    def test_schedule(self):
+        """
+        Test that schedule PDFs change with their workouts and steps
+        """
+        schedule = Schedule.objects.get(pk=1)
+        url = reverse('manager:schedule:pdf-log', kwargs={'pk': schedule.pk})
+        step = schedule.schedulestep_set.first()
+        self.assert_etag_changes(url, lambda: step.workout.save())
+
+        step.duration = 2
+        self.assert_etag_changes(url, lambda: step.save())
+
+    def test_nutrition_plan(self):
+        """
+        Test that nutrition plan PDFs change with their items and ingredients
+        """
+        plan = NutritionPlan.objects.filter(user__username='test',
+                                            meal__mealitem__isnull=False).first()
+        url = reverse('nutrition:plan:export-pdf', kwargs={'id': plan.pk})
+        item = MealItem.objects.filter(meal__plan=plan).first()
+
+        item.amount = 123
+        self.assert_etag_changes(url, lambda: item.save())
+        self.assert_etag_changes(url, lambda: Ingredient.objects.get(pk=item.ingredient_id).save())
+        self.assertEqual(len(self.get_files('nutritionplan', plan.pk)), 1)
+
+    def test_nutrition_plan_weight_unit(self):
+        """
+        Test that nutrition plan PDFs change with the weight unit of the owner
+        """
+        plan = NutritionPlan.objects.filter(user__username='test',
+                                            meal__mealitem__isnull=False).first()
+        url = reverse('nutrition:plan:export-pdf', kwargs={'id': plan.pk})
+        profile = plan.user.userprofile
+        profile.weight_unit = 'kg' if profile.weight_unit == 'lb' else 'lb'
+        self.assert_etag_changes(url, lambda: profile.save())
+
+    def test_nutrition_plan_units(self):
+        """
+        Test that nutrition plan PDFs change with the weight units and deleted
+        ingredients
+        """
+        plan = NutritionPlan.objects.filter(user__username='test',
+                                            meal__mealitem__isnull=False).first()
+        url = reverse('nutrition:plan:export-pdf', kwargs={'id': plan.pk})
+        unit = IngredientWeightUnit.objects.first()
+
+        unit.gram = 123
+        self.assert_etag_changes(url, lambda: unit.save())
+        self.assert_etag_changes(url, lambda: unit.delete())
+
+        item = MealItem.objects.filter(meal__plan=plan).first()
+        ingredient = Ingredient.objects.get(pk=item.ingredient_id)
+        self.assert_etag_changes(url, lambda: ingredient.delete())
+        self.assertFalse(MealItem.objects.filter(pk=item.pk).exists())
+
+    def test_clear(self):
+        """
+        Test deleting all saved PDFs
+        """
+        self.client.get(reverse('manager:workout:pdf-log', kwargs={'id': 3}))
+        self.assertTrue(os.path.exists(self.pdf_cache_dir))
+
+        call_command('clear-cache', clear_pdf=True)
+        self.assertFalse(os.path.exists(self.pdf_cache_dir))
@@ -0,0 +1,115 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+import datetime
+import re
+import unittest
+
+from django.db import connection
+
+from wger.core.tests.base_testcase import WorkoutManagerTestCase
+from wger.manager.models import (
+    WorkoutLog,
+    WorkoutMonthSummary,
+    WorkoutSession
+)
+from wger.weight.models import WeightEntry
+
+
+@unittest.skipUnless(connection.vendor == 'sqlite', 'The query plans are checked with SQLite')
+class QueryPlanTestCase(WorkoutManagerTestCase):
+    """
+    Checks that the hot queries of the log, session and weight pages are
+    backed by the right indexes
+    """
+
+    def get_plan(self, queryset):
+        """
+        Returns the details of the query plan of a queryset
+        """
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            return [row[-1] for row in cursor.fetchall()]
+
+    def get_index_columns(self, index):
+        """
+        Returns the columns of an index
+        """
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA index_info({0})'.format(connection.ops.quote_name(index)))
+            return tuple(row[2] for row in cursor.fetchall())
+
+    def assertUsesIndex(self, queryset, columns, ordered=False):
+        """
+        Asserts that the query searches the table with an index that starts
+        with the given columns, and optionally that it doesn't sort afterwards
+        """
+        plan = self.get_plan(queryset)
+        indexes = []
+        for detail in plan:
+            match = re.search(r'USING (?:COVERING )?INDEX (\S+)', detail)
+            if match:
+                indexes.append(self.get_index_columns(match.group(1)))
+        self.assertTrue([index for index in indexes if index[:len(columns)] == columns],
+                        'No index on {0} used: {1}'.format(columns, plan))
+        if ordered:
+            self.assertFalse([detail for detail in plan if 'TEMP B-TREE' in detail], plan)
+
+    def test_workout_log(self):
+        """
+        Test the queries for the logs
+        """
+
+        # Logs of an exercise, in date order
+        logs = WorkoutLog.objects.filter(user=1, exercise=1)
+        self.assertUsesIndex(logs, ('user_id', 'exercise_id', 'date', 'reps'), ordered=True)
+
+        # Last weight of an exercise in the log forms
+        logs = WorkoutLog.objects.filter(user=1, exercise=1, reps=8).order_by('-date')
+        self.assertUsesIndex(logs, ('user_id', 'exercise_id', 'date'), ordered=True)
+
+        # Calendar
+        logs = WorkoutLog.objects.filter(user=1, date__year=2012, date__month=10)
+        self.assertUsesIndex(logs, ('user_id', 'date'))
+        logs = WorkoutLog.objects.filter(user=1, date=datetime.date(2012, 10, 1))
+        self.assertUsesIndex(logs, ('user_id', 'date'))
+
+        # Logs of a workout
+        self.assertUsesIndex(WorkoutLog.objects.filter(workout=1), ('workout_id', ))
+
+    def test_workout_session(self):
+        """
+        Test the queries for the sessions
+        """
+        sessions = WorkoutSession.objects.filter(user=1).order_by('date')
+        self.assertUsesIndex(sessions, ('user_id', 'date'), ordered=True)
+        sessions = WorkoutSession.objects.filter(user=1, date__year=2014, date__month=1)
+        self.assertUsesIndex(sessions, ('user_id', 'date'))
+
+    def test_month_summary(self):
+        """
+        Test the query for the month navigation of the calendar
+        """
+        summaries = WorkoutMonthSummary.objects.filter(user=1).values_list('date', flat=True)
+        self.assertUsesIndex(summaries, ('user_id', 'date'), ordered=True)
+
+    def test_weight_entry(self):
+        """
+        Test the queries for the weight entries
+        """
+        entries = WeightEntry.objects.filter(user=1).order_by('-date')
+        self.assertUsesIndex(entries, ('user_id', 'date'), ordered=True)
+        entries = WeightEntry.objects.filter(user=1, date__gte=datetime.date(2012, 1, 1))
+        self.assertUsesIndex(entries, ('user_id', 'date'))
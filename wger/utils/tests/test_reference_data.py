@@ -0,0 +1,112 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+from django.core.urlresolvers import reverse
+from django.db import connection
+from django.forms import Form
+from django.test.utils import CaptureQueriesContext
+
+from wger.core.models import (
+    DaysOfWeek,
+    Language,
+    RepetitionUnit,
+    WeightUnit
+)
+from wger.core.tests.base_testcase import WorkoutManagerTestCase
+from wger.exercises.models import Muscle
+from wger.utils.reference_data import (
+    reference_data,
+    ReferenceChoiceField,
+    ReferenceMultipleChoiceField
+)
+
+
+class ReferenceDataTestCase(WorkoutManagerTestCase):
+    """
+    Tests the registry for the lookup tables
+    """
+
+    def test_load_once(self):
+        """
+        Test that the tables are only loaded once
+        """
+        units = reference_data.all(RepetitionUnit)
+        reference_data.all(Language)
+        self.assertEqual(units, list(RepetitionUnit.objects.all()))
+
+        with self.assertNumQueries(0):
+            self.assertEqual(reference_data.all('core.RepetitionUnit'), units)
+            self.assertEqual(reference_data.get(RepetitionUnit, 1).pk, 1)
+            self.assertEqual(reference_data.get(RepetitionUnit, '1').pk, 1)
+            self.assertEqual(reference_data.get(Language, short_name='de').pk, 1)
+            self.assertRaises(RepetitionUnit.DoesNotExist, reference_data.get, RepetitionUnit, 99)
+            self.assertRaises(RepetitionUnit.DoesNotExist, reference_data.get, RepetitionUnit, 'a')
+            self.assertRaises(Language.DoesNotExist,
+                              reference_data.get,
+                              Language,
+                              short_name='xx')
+
+    def test_invalidation(self):
+        """
+        Test that the tables are loaded again after editing them
+        """
+        count = len(reference_data.all(RepetitionUnit))
+        unit = RepetitionUnit.objects.create(name='Laps')
+        self.assertEqual(len(reference_data.all(RepetitionUnit)), count + 1)
+        self.assertEqual(reference_data.get(RepetitionUnit, unit.pk).name, 'Laps')
+
+        unit.delete()
+        self.assertEqual(len(reference_data.all(RepetitionUnit)), count)
+
+    def test_form_fields(self):
+        """
+        Test the form fields that use the registry
+        """
+
+        class TestForm(Form):
+            unit = ReferenceChoiceField(queryset=WeightUnit.objects.all())
+            muscles = ReferenceMultipleChoiceField(queryset=Muscle.objects.all(), required=False)
+
+        reference_data.all(WeightUnit)
+        reference_data.all(Muscle)
+        with self.assertNumQueries(0):
+            form = TestForm()
+            form.as_p()
+
+            form = TestForm(data={'unit': 2, 'muscles': [1, 2]})
+            self.assertTrue(form.is_valid())
+            self.assertEqual(form.cleaned_data['unit'].pk, 2)
+            self.assertEqual(sorted(m.pk for m in form.cleaned_data['muscles']), [1, 2])
+
+            form = TestForm(data={'unit': 99, 'muscles': [1, 99]})
+            self.assertFalse(form.is_valid())
+            self.assertIn('unit', form.errors)
+            self.assertIn('muscles', form.errors)
+
+    def test_views(self):
+        """
+        Test that the views don't query the lookup tables
+        """
+        self.user_login('test')
+        tables = [model._meta.db_table for model in (DaysOfWeek, RepetitionUnit, WeightUnit)]
+
+        for url in (reverse('core:dashboard'),
+                    reverse('manager:workout:timer', kwargs={'day_pk': 5})):
+            self.client.get(url)
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            for query in context.captured_queries:
+                for table in tables:
+                    self.assertNotIn('FROM "{0}"'.format(table), query['sql'])
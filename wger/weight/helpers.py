@@ -14,6 +14,7 @@
 #
 # You should have received a copy of the GNU Affero General Public License
 
+import bisect
 import logging
 import six
 import datetime
@@ -26,64 +27,94 @@ from django.core.cache import cache
 
 from wger.utils.helpers import DecimalJsonEncoder
 from wger.utils.cache import cache_mapper
+from wger.utils.cache import reset_trainer_summary
+from wger.utils.cache import reset_weight_chart
 from wger.weight.models import WeightEntry
 from wger.manager.models import WorkoutSession
 from wger.manager.models import WorkoutLog
+from wger.manager.models import PersonalRecord
 
 logger = logging.getLogger(__name__)
 
 
+CSV_SNIFF_SIZE = 4096
+'''Number of characters of the CSV input used to detect its dialect'''
+
+CSV_BATCH_SIZE = 1000
+'''Number of weight entries inserted per query when importing a CSV file'''
+
+
 def parse_weight_csv(request, cleaned_data):
+    """
+    Parses the weight entries of a CSV input, with the date in the first
+    column and the weight in the second one
+
+    The rows are processed one by one and the existing dates of the user
+    are read with a single query, so large exports e.g. of scales or
+    wearables can be imported at once.
 
+    :return: a (weight_list, error_list) tuple, with the new WeightEntry
+             objects and the rows that could not be converted or whose
+             date already exists
+    """
+    csv_input = cleaned_data['csv_input']
+    sample = csv_input[:CSV_SNIFF_SIZE]
+    if len(csv_input) > CSV_SNIFF_SIZE and '\n' in sample:
+        sample = sample[:sample.rindex('\n')]
     try:
-        dialect = csv.Sniffer().sniff(cleaned_data['csv_input'])
+        dialect = csv.Sniffer().sniff(sample)
     except csv.Error:
         dialect = 'excel'
 
     # csv.reader expects a file-like object, so use StringIO
-    parsed_csv = csv.reader(six.StringIO(cleaned_data['csv_input']),
-                            dialect)
-    distinct_weight_entries = []
-    entry_dates = set()
+    parsed_csv = csv.reader(six.StringIO(csv_input), dialect)
+    entry_dates = set(WeightEntry.objects.filter(user=request.user)
+                                         .values_list('date', flat=True))
     weight_list = []
     error_list = []
-    MAX_ROW_COUNT = 1000
-    row_count = 0
 
-    # Process the CSV items first
     for row in parsed_csv:
         try:
-            parsed_date = datetime.datetime.strptime(row[0], cleaned_data['date_format'])
+            parsed_date = datetime.datetime.strptime(row[0], cleaned_data['date_format']).date()
             parsed_weight = decimal.Decimal(row[1].replace(',', '.'))
-            duplicate_date_in_db = WeightEntry.objects.filter(date=parsed_date,
-                                                              user=request.user).exists()
-            # within the list there are no duplicate dates
-            unique_among_csv = parsed_date not in entry_dates
-
-            # there is no existing weight entry in the database for that date
-            unique_in_db = not duplicate_date_in_db
-
-            if unique_among_csv and unique_in_db and parsed_weight:
-                distinct_weight_entries.append((parsed_date, parsed_weight))
-                entry_dates.add(parsed_date)
-            else:
-                error_list.append(row)
-
         except (ValueError, IndexError, decimal.InvalidOperation):
             error_list.append(row)
-        row_count += 1
-        if row_count > MAX_ROW_COUNT:
-            break
+            continue
 
-    # Create the valid weight entries
-    for date, weight in distinct_weight_entries:
-        weight_list.append(WeightEntry(date=date,
-                                       weight=weight,
-                                       user=request.user))
+        # Neither duplicate dates within the list nor already in the database
+        if parsed_date not in entry_dates and parsed_weight:
+            weight_list.append(WeightEntry(date=parsed_date,
+                                           weight=parsed_weight,
+                                           user=request.user))
+            entry_dates.add(parsed_date)
+        else:
+            error_list.append(row)
 
     return weight_list, error_list
 
 
+def save_weight_entries(user, entries):
+    """
+    Saves the weight entries of a CSV import, in batches
+
+    Dates that were added after the preview of the import are skipped. The
+    caches normally reset by the signals of the entries are reset here, since
+    bulk_create doesn't send them.
+
+    :param entries: a list of (date, weight) tuples
+    :return: the number of saved entries
+    """
+    existing_dates = set(WeightEntry.objects.filter(user=user).values_list('date', flat=True))
+    weight_list = [WeightEntry(date=date, weight=weight, user=user)
+                   for date, weight in entries if date not in existing_dates]
+    # Passed as batch_size, the backend's own limit (e.g. sqlite) would be ignored
+    for start in range(0, len(weight_list), CSV_BATCH_SIZE):
+        WeightEntry.objects.bulk_create(weight_list[start:start + CSV_BATCH_SIZE])
+    reset_weight_chart(user.pk)
+    reset_trainer_summary(user.pk)
+    return len(weight_list)
+
+
 def group_log_entries(user, year, month, day=None):
     """
     Processes and regroups a list of log entries so they can be more easily
@@ -149,6 +180,28 @@ def group_log_entries(user, year, month, day=None):
     return out
 
 
+def mark_personal_records(user, grouped_log_entries):
+    """
+    Sets the is_record attribute of the logs grouped by group_log_entries
+
+    This is not done in the cached entries themselves, since a record can
+    be broken by a log on any other day.
+    """
+    if not grouped_log_entries:
+        return
+
+    records = set(PersonalRecord.objects.filter(user=user, date__in=list(grouped_log_entries))
+                  .values_list('exercise', 'reps', 'weight_unit', 'weight', 'date'))
+    for value in grouped_log_entries.values():
+        for logs in value['logs'].values():
+            for log in logs:
+                log.is_record = (log.exercise_id,
+                                 log.reps,
+                                 log.weight_unit_id,
+                                 log.weight,
+                                 log.date) in records
+
+
 def process_log_entries(logs):
     """
     Processes and regroups a list of log entries so they can be rendered
@@ -228,3 +281,141 @@ def get_last_entries(user, amount=5):
         last_entries_details.append((curr_entry, weight_diff, day_diff))
 
     return last_entries_details
+
+
+TREND_DAYS = (7, 30)
+'''Number of days of the moving averages of the weight chart'''
+
+
+def get_moving_average(dates, values, days):
+    """
+    Calculates the trailing moving average over a number of days
+
+    The entries don't need to be daily, every value is the average of the
+    entries of the given number of days up to its date.
+
+    :param dates: the dates of the entries, in ascending order
+    :param values: the values of the entries
+    :param days: the number of days of the window
+    :return: a list with one average per entry
+    """
+    averages = []
+    start = 0
+    total = 0
+    for i, (date, value) in enumerate(zip(dates, values)):
+        total += value
+        while dates[start] <= date - datetime.timedelta(days=days):
+            total -= values[start]
+            start += 1
+        averages.append(round(total / (i - start + 1), 2))
+    return averages
+
+
+def get_chart_series(user):
+    """
+    Returns the weight entries of a user and their moving averages
+
+    The series are cached until the next change of the user's entries.
+
+    :return: a dictionary with the ISO dates of the entries as 'date', and
+             one list of values per series: 'weight' and 'trend_<days>'
+             for the moving averages
+    """
+    key = cache_mapper.get_weight_chart_key(user)
+    series = cache.get(key)
+    if series is None:
+        entries = WeightEntry.objects.filter(user=user).order_by('date')\
+            .values_list('date', 'weight')
+        dates = [date for date, weight in entries]
+        weights = [float(weight) for date, weight in entries]
+        series = {'date': [date.isoformat() for date in dates], 'weight': weights}
+        for days in TREND_DAYS:
+            series['trend_{0}'.format(days)] = get_moving_average(dates, weights, days)
+        cache.set(key, series)
+    return series
+
+
+def downsample_lttb(x, y, threshold):
+    """
+    Selects the points that keep the shape of a line best, with the
+    "Largest Triangle Three Buckets" algorithm by Sveinn Steinarsson
+
+    The first and last points are always kept, from the other ones, split
+    into buckets, the one forming the largest triangle with the point
+    selected in the previous bucket and the average of the next one is
+    selected.
+
+    :param x: the x values, in ascending order
+    :param y: the y values
+    :param threshold: the number of points to select
+    :return: the indexes of the selected points
+    """
+    length = len(x)
+    if threshold >= length or threshold < 3:
+        return list(range(length))
+
+    indexes = [0]
+    bucket_size = (length - 2) / float(threshold - 2)
+    selected = 0
+    for i in range(threshold - 2):
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+
+        next_end = min(int((i + 2) * bucket_size) + 1, length)
+        avg_x = sum(x[end:next_end]) / float(next_end - end)
+        avg_y = sum(y[end:next_end]) / float(next_end - end)
+
+        max_area = -1
+        for j in range(start, end):
+            area = abs((x[selected] - avg_x) * (y[j] - y[selected])
+                       - (x[selected] - x[j]) * (avg_y - y[selected]))
+            if area > max_area:
+                max_area = area
+                next_selected = j
+        indexes.append(next_selected)
+        selected = next_selected
+
+    indexes.append(length - 1)
+    return indexes
+
+
+def get_chart_data(user, date_min=None, date_max=None, points=None):
+    """
+    Returns the series of the weight chart for a date range, optionally
+    downsampled
+
+    :param date_min: ISO date of the first entry, optional
+    :param date_max: ISO date of the last entry, optional
+    :param points: maximum number of points per series, optional
+    :return: a list of (name, points) tuples, points being lists of
+             (ISO date, value) tuples
+    """
+    series = get_chart_series(user)
+    dates = series['date']
+    start = bisect.bisect_left(dates, date_min) if date_min else 0
+    end = bisect.bisect_right(dates, date_max) if date_max else len(dates)
+    dates = dates[start:end]
+    ordinals = [datetime.date(*map(int, date.split('-'))).toordinal() for date in dates]
+
+    result = []
+    for name in ['weight'] + ['trend_{0}'.format(days) for days in TREND_DAYS]:
+        values = series[name][start:end]
+        indexes = downsample_lttb(ordinals, values, points) if points else range(len(dates))
+        result.append((name, [(dates[i], values[i]) for i in indexes]))
+    return result
+
+
+def stream_chart_data(chart_data, chunk_size=500):
+    """
+    Serializes the result of get_chart_data to JSON in chunks, as object of
+    lists of {"date": ..., "weight": ...} points
+    """
+    yield '{'
+    for i, (name, points) in enumerate(chart_data):
+        yield '{0}{1}: ['.format(', ' if i else '', json.dumps(name))
+        for start in range(0, len(points), chunk_size):
+            yield '{0}{1}'.format(', ' if start else '',
+                                  ', '.join(json.dumps({'date': date, 'weight': value})
+                                            for date, value in points[start:start + chunk_size]))
+        yield ']'
+    yield '}'
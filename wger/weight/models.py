@@ -22,6 +22,8 @@ from django.contrib.auth.models import User
 from django.utils.encoding import python_2_unicode_compatible
 from django.utils.translation import ugettext_lazy as _
 
+from wger.utils.cache import reset_weight_chart
+
 
 @python_2_unicode_compatible
 class WeightEntry(models.Model):
@@ -53,6 +55,7 @@ class WeightEntry(models.Model):
         ordering = ["date", ]
         get_latest_by = "date"
         unique_together = ("date", "user")
+        index_together = ("user", "date")
 
     def __str__(self):
         """
@@ -65,3 +68,17 @@ class WeightEntry(models.Model):
         Returns the object that has owner information
         """
         return self
+
+    def save(self, *args, **kwargs):
+        """
+        Reset the cached chart data
+        """
+        reset_weight_chart(self.user_id)
+        super(WeightEntry, self).save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        """
+        Reset the cached chart data
+        """
+        reset_weight_chart(self.user_id)
+        super(WeightEntry, self).delete(*args, **kwargs)
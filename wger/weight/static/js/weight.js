@@ -15,28 +15,21 @@
  */
 'use strict';
 
-function modifyTimePeriod(data, pastNumberDays) {
-  var filtered;
+function getChartUrl(username, pastNumberDays, points) {
   var date;
-  if (data.length) {
-    if (pastNumberDays !== 'all') {
-      date = new Date();
-      date.setDate(date.getDate() - pastNumberDays);
-      filtered = MG.clone(data).filter(function (value) {
-        return value.date >= date;
-      });
-      return filtered;
-    }
+  var url = '/weight/api/chart-data/' + username + '?points=' + points;
+  if (pastNumberDays !== 'all') {
+    date = new Date();
+    date.setDate(date.getDate() - pastNumberDays);
+    url += '&date_min=' + date.toISOString().substring(0, 10);
   }
-  return data;
+  return url;
 }
 
 $(document).ready(function () {
-  var url;
   var username;
+  var points;
   var chartParams;
-  var weightChart;
-  weightChart = {};
   chartParams = {
     animate_on_load: true,
     full_width: true,
@@ -49,34 +42,30 @@ $(document).ready(function () {
     x_accessor: 'date',
     y_accessor: 'weight',
     min_y_from_data: true,
-    colors: ['#3465a4']
+    colors: ['#3465a4', '#cc0000']
   };
 
   username = $('#current-username').data('currentUsername');
-  url = '/weight/api/get_weight_data/' + username;
 
-  d3.json(url, function (json) {
-    var data;
-    if (json.length) {
-      data = MG.convert.date(json, 'date');
-      weightChart.data = data;
+  // The server reduces the entries to about one point every two pixels
+  points = Math.max(Math.round($(chartParams.target).width() / 2), 50);
 
-      // Plot the data
-      chartParams.data = data;
-      MG.data_graphic(chartParams);
-    }
-  });
+  function drawChart(pastNumberDays) {
+    d3.json(getChartUrl(username, pastNumberDays, points), function (json) {
+      if (json.weight.length) {
+        // The weight and its moving average over 30 days
+        chartParams.data = [MG.convert.date(json.weight, 'date'),
+                            MG.convert.date(json.trend_30, 'date')];
+        MG.data_graphic(chartParams);
+      }
+    });
+  }
 
-  $('.modify-time-period-controls button').click(function () {
-    var pastNumberDays = $(this).data('time_period');
-    var data = modifyTimePeriod(weightChart.data, pastNumberDays);
+  drawChart('all');
 
+  $('.modify-time-period-controls button').click(function () {
     // change button state
     $(this).addClass('active').siblings().removeClass('active');
-    if (data.length) {
-      chartParams.data = data;
-      MG.data_graphic(chartParams);
-    }
+    drawChart($(this).data('time_period'));
   });
 });
-
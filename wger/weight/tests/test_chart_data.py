@@ -0,0 +1,176 @@
+# This file is part of wger Workout Manager.
+#
+# wger Workout Manager is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# wger Workout Manager is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+
+import datetime
+import json
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.urlresolvers import reverse
+
+from wger.core.tests.base_testcase import WorkoutManagerTestCase
+from wger.utils.cache import cache_mapper
+from wger.weight.helpers import (
+    downsample_lttb,
+    get_moving_average
+)
+from wger.weight.models import WeightEntry
+
+
+class WeightChartHelperTestCase(WorkoutManagerTestCase):
+    """
+    Tests the helpers calculating the series of the weight chart
+    """
+
+    def test_moving_average(self):
+        """
+        Test the trailing moving average over a number of days
+        """
+        dates = [datetime.date(2016, 1, 1),
+                 datetime.date(2016, 1, 2),
+                 datetime.date(2016, 1, 4),
+                 datetime.date(2016, 1, 10)]
+        values = [80.0, 82.0, 84.0, 90.0]
+        self.assertEqual(get_moving_average(dates, values, 1), values)
+        self.assertEqual(get_moving_average(dates, values, 3), [80, 81, 83, 90])
+        self.assertEqual(get_moving_average(dates, values, 30), [80, 81, 82, 84])
+
+    def test_downsample(self):
+        """
+        Test that the downsampling keeps the first and last points and peaks
+        """
+        x = list(range(100))
+        y = [1.0] * 100
+        y[42] = 10.0
+
+        indexes = downsample_lttb(x, y, 10)
+        self.assertEqual(len(indexes), 10)
+        self.assertEqual(indexes[0], 0)
+        self.assertEqual(indexes[-1], 99)
+        self.assertIn(42, indexes)
+        self.assertEqual(indexes, sorted(indexes))
+
+    def test_downsample_few_points(self):
+        """
+        Test that nothing is removed if there are less points than requested
+        """
+        self.assertEqual(downsample_lttb([1, 2, 3], [1, 2, 3], 5), [0, 1, 2])
+        self.assertEqual(downsample_lttb([1, 2, 3], [1, 2, 3], 2), [0, 1, 2])
+
+
+class WeightChartDataTestCase(WorkoutManagerTestCase):
+    """
+    Tests the data endpoint of the weight chart
+    """
+
+    def get_data(self, username=None, **params):
+        """
+        Helper function returning the decoded JSON of the endpoint
+        """
+        kwargs = {'username': username} if username else {}
+        response = self.client.get(reverse('weight:chart-data', kwargs=kwargs), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        return json.loads(b''.join(response.streaming_content).decode('utf-8'))
+
+    def test_series(self):
+        """
+        Test the entries and the moving averages
+        """
+        self.user_login('test')
+        data = self.get_data()
+        self.assertEqual(sorted(data.keys()), ['trend_30', 'trend_7', 'weight'])
+        self.assertEqual([point['weight'] for point in data['weight']],
+                         [77, 77.2, 80.6, 80, 81, 82, 83])
+        self.assertEqual(data['weight'][0]['date'], '2012-10-01')
+
+        # No two entries are less than 7 days apart
+        self.assertEqual(data['trend_7'], data['weight'])
+        self.assertEqual([point['weight'] for point in data['trend_30']],
+                         [77, 77.1, 78.9, 80, 80.5, 81, 81.5])
+
+    def test_range(self):
+        """
+        Test limiting the entries to a date range
+        """
+        self.user_login('test')
+        data = self.get_data(date_min='2012-10-10', date_max='2013-01-10')
+        self.assertEqual([point['date'] for point in data['weight']],
+                         ['2012-10-10', '2012-11-01', '2013-01-01', '2013-01-10'])
+
+        # The averages still include the entries before the range
+        self.assertEqual(data['trend_30'][0]['weight'], 77.1)
+
+        data = self.get_data(date_min='2014-01-01')
+        self.assertEqual(data['weight'], [])
+
+    def test_points(self):
+        """
+        Test reducing the number of points
+        """
+        self.user_login('test')
+        data = self.get_data(points=3)
+        for name in ('weight', 'trend_7', 'trend_30'):
+            self.assertEqual(len(data[name]), 3)
+        self.assertEqual(data['weight'][0]['date'], '2012-10-01')
+        self.assertEqual(data['weight'][-1]['date'], '2013-01-30')
+
+        self.assertEqual(len(self.get_data(points='abc')['weight']), 7)
+
+    def test_few_points(self):
+        """
+        Test that less than 3 requested points are raised to 3
+        """
+        self.user_login('test')
+        for points in (1, 2):
+            data = self.get_data(points=points)
+            for name in ('weight', 'trend_7', 'trend_30'):
+                self.assertEqual(len(data[name]), 3)
+        self.assertEqual(len(self.get_data(points=0)['weight']), 7)
+
+    def test_cache(self):
+        """
+        Test that the series are cached until the entries change
+        """
+        user = User.objects.get(username='test')
+        key = cache_mapper.get_weight_chart_key(user)
+        self.user_login('test')
+        self.assertFalse(cache.get(key))
+
+        self.get_data()
+        self.assertEqual(len(cache.get(key)['weight']), 7)
+
+        entry = WeightEntry.objects.create(user=user, weight=84, date=datetime.date(2013, 2, 5))
+        self.assertFalse(cache.get(key))
+        self.assertEqual(self.get_data()['weight'][-1], {'date': '2013-02-05', 'weight': 84})
+
+        entry.delete()
+        self.assertFalse(cache.get(key))
+        self.assertEqual(len(self.get_data()['weight']), 7)
+
+    def test_access(self):
+        """
+        Test that the data of other users is only available if they share it
+        """
+        self.user_login('test')
+        self.assertEqual(self.get_data('test')['weight'][0]['weight'], 77)
+        self.assertEqual(self.get_data('admin')['weight'], [])
+
+        self.user_login('admin')
+        response = self.client.get(reverse('weight:chart-data', kwargs={'username': 'test'}))
+        self.assertEqual(response.status_code, 404)
+
+        self.user_logout()
+        response = self.client.get(reverse('weight:chart-data'))
+        self.assertEqual(response.status_code, 404)
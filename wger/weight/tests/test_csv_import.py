@@ -12,11 +12,18 @@
 #
 # You should have received a copy of the GNU Affero General Public License
 
+import datetime
 import logging
 
+from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.urlresolvers import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from wger.core.tests.base_testcase import WorkoutManagerTestCase
+from wger.gym.helpers import get_trainer_summary
+from wger.utils.cache import cache_mapper
 from wger.weight.models import WeightEntry
 
 logger = logging.getLogger(__name__)
@@ -76,3 +83,85 @@ class WeightCsvImportTestCase(WorkoutManagerTestCase):
 
         self.user_login('test')
         self.import_csv()
+
+    def test_import_large_file(self):
+        """
+        Test importing many entries, without one query per row
+        """
+        self.user_login('test')
+        user = User.objects.get(username='test')
+        start = datetime.date(1900, 1, 1)
+        rows = ['{0:%Y-%m-%d};{1}'.format(start + datetime.timedelta(days=i), 70 + i % 10)
+                for i in range(20000)]
+        rows.append('2012-10-01;80')
+        csv_input = '\n'.join(rows)
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(reverse('weight:import-csv'),
+                                        {'stage': 1,
+                                         'csv_input': csv_input,
+                                         'date_format': '%Y-%m-%d'})
+        self.assertEqual(response.status_code, 200)
+        self.assertLess(len(context.captured_queries), 20)
+        self.assertEqual(len(response.context['weight_list']), 20000)
+
+        # The existing entry of the user is not imported again
+        self.assertEqual(response.context['error_list'], [['2012-10-01', '80']])
+        hash_value = response.context['hash_value']
+        key = cache_mapper.get_weight_csv_import_key(user, hash_value)
+        self.assertEqual(len(cache.get(key)), 20000)
+
+        count_before = WeightEntry.objects.filter(user=user).count()
+        response = self.client.post(reverse('weight:import-csv'),
+                                    {'stage': 2,
+                                     'hash': hash_value,
+                                     'csv_input': csv_input,
+                                     'date_format': '%Y-%m-%d'})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(WeightEntry.objects.filter(user=user).count(), count_before + 20000)
+        self.assertFalse(cache.get(key))
+
+    def test_import_without_preview_data(self):
+        """
+        Test that the entries are parsed again if the preview ones are gone
+        """
+        self.user_login('test')
+        csv_input = '01.02.2010;69\n02.02.2010;70\n01.10.2012;71'
+        response = self.client.post(reverse('weight:import-csv'),
+                                    {'stage': 1,
+                                     'csv_input': csv_input,
+                                     'date_format': '%d.%m.%Y'})
+        self.assertEqual(len(response.context['weight_list']), 2)
+        cache.clear()
+
+        count_before = WeightEntry.objects.count()
+        response = self.client.post(reverse('weight:import-csv'),
+                                    {'stage': 2,
+                                     'hash': response.context['hash_value'],
+                                     'csv_input': csv_input,
+                                     'date_format': '%d.%m.%Y'})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(WeightEntry.objects.count(), count_before + 2)
+
+    def test_import_resets_trainer_summary(self):
+        """
+        Test that the overview shown to trainers includes the imported entries
+        """
+        self.user_login('test')
+        user = User.objects.get(username='test')
+        self.assertEqual(get_trainer_summary(user)['weight_entries'][0].date,
+                         datetime.date(2013, 1, 30))
+
+        csv_input = '2030-01-01;80'
+        response = self.client.post(reverse('weight:import-csv'),
+                                    {'stage': 1,
+                                     'csv_input': csv_input,
+                                     'date_format': '%Y-%m-%d'})
+        self.client.post(reverse('weight:import-csv'),
+                         {'stage': 2,
+                          'hash': response.context['hash_value'],
+                          'csv_input': csv_input,
+                          'date_format': '%Y-%m-%d'})
+        self.assertFalse(cache.get(cache_mapper.get_trainer_summary(user)))
+        self.assertEqual(get_trainer_summary(user)['weight_entries'][0].date,
+                         datetime.date(2030, 1, 1))
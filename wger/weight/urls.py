@@ -49,4 +49,10 @@ urlpatterns = [
     url(r'^api/get_weight_data/$',  # JS
         views.get_weight_data,
         name='weight-data'),
+    url(r'^api/chart-data/(?P<username>[\w.@+-]+)$',  # JS
+        views.get_chart_data,
+        name='chart-data'),
+    url(r'^api/chart-data/$',  # JS
+        views.get_chart_data,
+        name='chart-data'),
 ]
@@ -18,8 +18,10 @@ import logging
 import csv
 import datetime
 
+from django.core.cache import cache
 from django.shortcuts import render
 from django.http import HttpResponse
+from django.http import StreamingHttpResponse
 from django.http import HttpResponseRedirect
 from django.core.urlresolvers import reverse
 from django.core.urlresolvers import reverse_lazy
@@ -40,12 +42,16 @@ from formtools.preview import FormPreview
 from wger.weight.forms import WeightForm
 from wger.weight.models import WeightEntry
 from wger.weight import helpers
+from wger.utils.cache import cache_mapper
 from wger.utils.helpers import check_access
 from wger.utils.generic_views import WgerFormMixin
 
 
 logger = logging.getLogger(__name__)
 
+CSV_IMPORT_TIMEOUT = 60 * 60
+'''Seconds the entries of a CSV import are kept between preview and import'''
+
 
 class WeightAddView(WgerFormMixin, CreateView):
     """
@@ -178,16 +184,41 @@ def get_weight_data(request, username=None):
     else:
         weights = WeightEntry.objects.filter(user=user)
 
-    chart_data = []
-
-    for i in weights:
-        chart_data.append({'date': i.date,
-                           'weight': i.weight})
+    chart_data = [{'date': date, 'weight': weight}
+                  for date, weight in weights.values_list('date', 'weight')]
 
     # Return the results to the client
     return Response(chart_data)
 
 
+def get_chart_data(request, username=None):
+    """
+    Returns the weight entries and their moving averages for the chart
+
+    The entries can be limited to a range with the date_min and date_max
+    parameters (ISO dates) and reduced to a number of points per series
+    with the points parameter, keeping the shape of the lines. The series
+    are calculated once per user and cached, the JSON is streamed.
+    """
+    is_owner, user = check_access(request.user, username)
+
+    try:
+        points = max(int(request.GET.get('points', 0)), 0)
+    except ValueError:
+        points = 0
+
+    # The downsampling keeps at least the first, last and one other point
+    if points:
+        points = max(points, 3)
+
+    chart_data = helpers.get_chart_data(user,
+                                        date_min=request.GET.get('date_min'),
+                                        date_max=request.GET.get('date_max'),
+                                        points=points)
+    return StreamingHttpResponse(helpers.stream_chart_data(chart_data),
+                                 content_type='application/json')
+
+
 class WeightCsvImportFormPreview(FormPreview):
     preview_template = 'import_csv_preview.html'
     form_template = 'import_csv_form.html'
@@ -202,13 +233,30 @@ class WeightCsvImportFormPreview(FormPreview):
                 'state': self.state,
                 'form_action': reverse('weight:import-csv')}
 
+    def get_cache_key(self, request, hash_value):
+        """
+        Key of the entries parsed for the preview, valid for the same input
+        """
+        return cache_mapper.get_weight_csv_import_key(request.user, hash_value)
+
     def process_preview(self, request, form, context):
-        context['weight_list'], context['error_list'] = helpers.parse_weight_csv(request,
-                                                                                 form.cleaned_data)
+        weight_list, error_list = helpers.parse_weight_csv(request, form.cleaned_data)
+        context['weight_list'], context['error_list'] = weight_list, error_list
+
+        # Keep the entries for the import, so they are not parsed again
+        cache.set(self.get_cache_key(request, self.security_hash(request, form)),
+                  [(entry.date, entry.weight) for entry in weight_list],
+                  CSV_IMPORT_TIMEOUT)
         return context
 
     def done(self, request, cleaned_data):
-        weight_list, error_list = helpers.parse_weight_csv(request, cleaned_data)
-        WeightEntry.objects.bulk_create(weight_list)
+        key = self.get_cache_key(request, request.POST.get(self.unused_name('hash'), ''))
+        entries = cache.get(key)
+        if entries is None:
+            weight_list, error_list = helpers.parse_weight_csv(request, cleaned_data)
+            entries = [(entry.date, entry.weight) for entry in weight_list]
+        cache.delete(key)
+
+        helpers.save_weight_entries(request.user, entries)
         return HttpResponseRedirect(reverse('weight:overview',
                                             kwargs={'username': request.user.username}))